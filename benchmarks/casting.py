@@ -0,0 +1,88 @@
+"""Time of casting the values of large .env and ini files, by trying the
+casters in turn, and by the compiled casters with and without memoization,
+and the time of loading the files
+
+    python benchmarks/casting.py
+    python benchmarks/casting.py --values 100000 --casted 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+from simpleconf import Config
+from simpleconf.caster import CompiledCasters, _cast_value, cast
+from simpleconf.utils import get_loader
+
+
+def make_values(n_values: int, casted: float) -> Dict[str, str]:
+    """Make the values, with a fraction of them to be casted"""
+    rng = random.Random(8525)
+    literals = ["@int:1", "@int:8080", "@bool:true", "@bool:false", "@none",
+                "@float:0.5", '@json:["a", "b"]']
+    return {
+        f"key{i}": rng.choice(literals) if rng.random() < casted else f"value {i}"
+        for i in range(n_values)
+    }
+
+
+def best_time(func: Callable[[], object], number: int) -> float:
+    """Get the best time (ms) of a call"""
+    return min(timeit.repeat(func, repeat=5, number=number)) / number * 1000.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=50000)
+    parser.add_argument("--casted", type=float, default=0.2)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    values = make_values(args.values, args.casted)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = {
+            "env": Path(tmpdir, "config.env"),
+            "ini": Path(tmpdir, "config.ini"),
+        }
+        files["env"].write_text(
+            "\n".join(f"{key}='{value}'" for key, value in values.items())
+        )
+        files["ini"].write_text(
+            "[default]\n"
+            + "\n".join(f"{key} = {value}" for key, value in values.items())
+        )
+
+        print(f"{args.values} values, {args.casted:.0%} to be casted")
+        print(
+            f"{'':<6}{'in turn':>12}{'compiled':>12}{'memoized':>12}{'load':>12}"
+        )
+        for ext, path in files.items():
+            loader = get_loader(ext)
+            casters = loader.CASTERS
+            in_turn = best_time(
+                lambda: [_cast_value(value, casters) for value in values.values()],
+                args.number,
+            )
+            compiled = best_time(
+                lambda: cast(dict(values), CompiledCasters(casters, memo_size=0)),
+                args.number,
+            )
+            memoized = best_time(
+                lambda: cast(dict(values), CompiledCasters(casters)),
+                args.number,
+            )
+            load = best_time(lambda: Config.load(path), args.number)
+            print(
+                f"{ext:<6}{in_turn:9.1f} ms{compiled:9.1f} ms"
+                f"{memoized:9.1f} ms{load:9.1f} ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
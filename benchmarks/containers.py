@@ -0,0 +1,130 @@
+"""Load time and memory use of the configurations loaded into each container
+(`Config.load(..., container=...)`)
+
+Each container is measured in a fresh interpreter, so that the peak RSS of
+one does not hide the other ones.
+
+    python benchmarks/containers.py
+    python benchmarks/containers.py --sections 200 --keys 100
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict
+
+from diot import Diot
+
+from simpleconf import Config
+
+
+class Settings(dict):
+    """A user factory of the mappings"""
+
+
+CONTAINERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "Diot": Diot,
+    "dict": dict,
+    "MappingProxyType": MappingProxyType,
+    "factory": Settings,
+}
+
+
+def make_config(n_sections: int, n_keys: int) -> dict:
+    """Make a config of sections with nested tables of int and str values"""
+    return {
+        f"section{s}": {
+            f"key{k}": {"value": k, "name": f"value {k}"} if k % 5 == 0 else k
+            for k in range(n_keys)
+        }
+        for s in range(n_sections)
+    }
+
+
+def max_rss() -> float:
+    """Get the peak RSS (MiB) of the process"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on Linux
+    return rss / 1024.0 / (1024.0 if sys.platform == "darwin" else 1.0)
+
+
+def run_one(name: str, paths: list, number: int) -> Dict[str, float]:
+    """Measure the container in this process"""
+    container = CONTAINERS[name]
+    before = max_rss()
+    confs = [Config.load(*paths, container=container) for _ in range(number)]
+    rss = (max_rss() - before) / number
+    del confs
+
+    tracemalloc.start()
+    conf = Config.load(*paths, container=container)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert conf["section1"]["key10"]["name"] == "value 10"
+
+    times = timeit.repeat(
+        lambda: Config.load(*paths, container=container), repeat=5, number=number
+    )
+    return {
+        "time": min(times) / number * 1000.0,
+        "memory": size / 1024.0,
+        "rss": rss,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--one", help=argparse.SUPPRESS)
+    parser.add_argument("--paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        print(json.dumps(run_one(args.one, args.paths, args.number)))
+        return 0
+
+    data = make_config(args.sections, args.keys)
+    override = {f"section{s}": {"key1": -1} for s in range(0, args.sections, 2)}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [Path(tmpdir, "config.json"), Path(tmpdir, "override.json")]
+        paths[0].write_text(json.dumps(data))
+        paths[1].write_text(json.dumps(override))
+
+        print(f"{args.sections} sections of {args.keys} keys, 2 files")
+        print(f"{'':<18}{'load':>12}{'memory':>14}{'RSS':>14}")
+        for name in CONTAINERS:
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--one",
+                    name,
+                    "--number",
+                    str(args.number),
+                    "--paths",
+                    *map(str, paths),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            res = json.loads(out.stdout)
+            print(
+                f"{name:<18}{res['time']:9.2f} ms"
+                f"{res['memory']:10.1f} KiB{res['rss']:10.2f} MiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Memory use and attribute-read latency of FrozenConfig compared with Diot
+
+    python benchmarks/frozen.py
+    python benchmarks/frozen.py --sections 100 --keys 100
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from diot import Diot
+
+from simpleconf.frozen import freeze
+
+
+def make_config(n_sections: int, n_keys: int) -> dict:
+    """Make a plain dict config with sections of nested tables"""
+    return {
+        f"section{s}": {
+            f"key{k}": {"value": k, "tags": ["a", "b"]} if k % 10 == 0 else k
+            for k in range(n_keys)
+        }
+        for s in range(n_sections)
+    }
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, float]:
+    """Build the object and get the memory (KiB) allocated for it"""
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size / 1024.0
+
+
+def read_latency(conf: Any, number: int) -> float:
+    """Get the best latency (ns) of reading a nested value by attributes"""
+    timer = timeit.Timer("conf.section1.key10.value", globals={"conf": conf})
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    data = make_config(args.sections, args.keys)
+    diot, diot_mem = measure(lambda: Diot(data))
+    frozen, frozen_mem = measure(lambda: freeze(data))
+    assert frozen == diot
+
+    diot_read = read_latency(diot, args.number)
+    frozen_read = read_latency(frozen, args.number)
+
+    print(f"{args.sections} sections of {args.keys} keys")
+    print(f"{'':<14}{'memory':>12}{'attr read':>14}")
+    print(f"{'Diot':<14}{diot_mem:9.1f} KiB{diot_read:10.1f} ns")
+    print(f"{'FrozenConfig':<14}{frozen_mem:9.1f} KiB{frozen_read:10.1f} ns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
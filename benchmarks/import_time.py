@@ -0,0 +1,126 @@
+"""Import-time benchmark of simpleconf
+
+It measures the import time of simpleconf with `python -X importtime`, and
+checks that the heavy dependencies are not imported until they are used.
+It exits with a non-zero status when a budget is exceeded, so that it can be
+used in CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 20 --budget-import 5 --budget-api 60
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+
+# The modules that should not be imported by `import simpleconf`
+# or `from simpleconf import Config`
+LAZY_MODULES = [
+    "panpath",
+    "asyncio",
+    "concurrent.futures",
+    "importlib.metadata",
+    "pathlib",
+    "pickle",
+    "hashlib",
+    "tempfile",
+    "json",
+    "ast",
+    "yaml",
+    "rtoml",
+    "tomllib",
+    "tomli",
+    "jinja2",
+    "liquid",
+]
+
+SCENARIOS = {
+    "import": "import simpleconf",
+    "api": "from simpleconf import Config, ProfileConfig",
+}
+
+
+def import_time(stmt: str) -> float:
+    """Get the cumulative import time (ms) of the top-level simpleconf
+    modules imported by the statement"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        # nested imports are indented under the package importing them
+        parts = line.split("|")
+        if (
+            len(parts) == 3
+            and parts[2].startswith(" simpleconf")
+            and parts[1].strip().isdigit()
+        ):
+            total += int(parts[1])
+
+    if not total:
+        raise RuntimeError(f"Failed to measure the import time of: {stmt}")
+    return total / 1000.0
+
+
+def lazily_imported(stmt: str) -> list:
+    """Get the modules in LAZY_MODULES that are imported by the statement"""
+    code = (
+        "import sys; before = set(sys.modules); "
+        f"{stmt}; "
+        f"print(' '.join(m for m in {LAZY_MODULES!r} "
+        "if m in sys.modules and m not in before))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return proc.stdout.split()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Number of runs for each scenario, the best one is reported",
+    )
+    parser.add_argument(
+        "--budget-import",
+        type=float,
+        default=5.0,
+        help="Budget (ms) for `import simpleconf`",
+    )
+    parser.add_argument(
+        "--budget-api",
+        type=float,
+        default=60.0,
+        help="Budget (ms) for `from simpleconf import Config, ProfileConfig`",
+    )
+    args = parser.parse_args()
+    budgets = {"import": args.budget_import, "api": args.budget_api}
+
+    failed = False
+    for name, stmt in SCENARIOS.items():
+        best = min(import_time(stmt) for _ in range(args.runs))
+        status = "ok" if best <= budgets[name] else "OVER BUDGET"
+        failed = failed or best > budgets[name]
+        print(f"{stmt:<50} {best:8.2f} ms  (budget {budgets[name]} ms) {status}")
+
+        eager = lazily_imported(stmt)
+        if eager:
+            failed = True
+            print(f"  imported eagerly: {', '.join(eager)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Peak memory and time of loading large json/yaml files, with and without
+the large-file mode
+
+    python benchmarks/large_files.py
+    python benchmarks/large_files.py --routes 100000
+
+The peak memory is measured by tracemalloc, which slows the loading down,
+so the times are measured in separate runs.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+from simpleconf import loaders
+from simpleconf.utils import get_loader
+
+
+def make_routes(n_routes: int) -> dict:
+    """Make a routing table"""
+    return {
+        f"route{i}": {
+            "path": f"/api/v1/resource{i}",
+            "methods": ["GET", "POST"],
+            "weight": i * 0.5,
+            "enabled": i % 2 == 0,
+        }
+        for i in range(n_routes)
+    }
+
+
+def measure(load: Callable[[], Any]) -> Tuple[float, float, float]:
+    """Get the time (ms), the peak memory (MiB) and the memory held by the
+    loaded objects (MiB)"""
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    loaded = load()  # noqa: F841
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000.0, peak / 1024.0 / 1024.0, size / 1024.0 / 1024.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=20000)
+    args = parser.parse_args()
+
+    import yaml
+
+    data = make_routes(args.routes)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = {
+            "json": Path(tmpdir, "routes.json"),
+            "yaml": Path(tmpdir, "routes.yaml"),
+        }
+        files["json"].write_text(json.dumps(data))
+        files["yaml"].write_text(yaml.safe_dump(data))
+
+        print(f"{args.routes} routes")
+        print(f"{'':<14}{'size':>10}{'time':>12}{'peak':>12}{'objects':>12}")
+        for fmt, path in files.items():
+            loader = get_loader(fmt)
+            file_size = path.stat().st_size / 1024.0 / 1024.0
+            for mode, threshold in (("", sys.maxsize), (" large", 0)):
+                loaders.LARGE_FILE_SIZE = threshold
+                elapsed, peak, size = measure(
+                    lambda: loader.loading(loaders.LocalFile(path), False)
+                )
+                print(
+                    f"{fmt + mode:<14}{file_size:6.1f} MiB{elapsed:9.1f} ms"
+                    f"{peak:8.1f} MiB{size:8.1f} MiB"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
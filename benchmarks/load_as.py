@@ -0,0 +1,105 @@
+"""Load time, memory use and attribute-read latency of the configurations
+loaded as dataclasses (`Config.load_as()`) compared with Diot
+
+    python benchmarks/load_as.py
+    python benchmarks/load_as.py --sections 100 --keys 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from collections import namedtuple
+from dataclasses import make_dataclass
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+from simpleconf import Config
+
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def make_config(n_sections: int, n_keys: int) -> dict:
+    """Make a config of sections with int and str values"""
+    return {
+        f"section{s}": {
+            f"key{k}": k if k % 2 else f"value {k}" for k in range(n_keys)
+        }
+        for s in range(n_sections)
+    }
+
+
+def make_types(n_sections: int, n_keys: int) -> Tuple[type, type]:
+    """Make the slots dataclass and the namedtuple classes of the config"""
+    fields = [(f"key{k}", int if k % 2 else str) for k in range(n_keys)]
+    section_dc = make_dataclass("Section", fields, **SLOTS)
+    config_dc = make_dataclass(
+        "AppConfig",
+        [(f"section{s}", section_dc) for s in range(n_sections)],
+        **SLOTS,
+    )
+
+    section_nt = namedtuple("Section", [name for name, _ in fields])
+    section_nt.__annotations__ = dict(fields)
+    config_nt = namedtuple("AppConfig", [f"section{s}" for s in range(n_sections)])
+    config_nt.__annotations__ = {f"section{s}": section_nt for s in range(n_sections)}
+    return config_dc, config_nt
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, float]:
+    """Build the object and get the memory (KiB) allocated for it"""
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size / 1024.0
+
+
+def best_time(func: Callable[[], object], number: int) -> float:
+    """Get the best time (ms) of a call"""
+    return min(timeit.repeat(func, repeat=5, number=number)) / number * 1000.0
+
+
+def read_latency(conf: Any, number: int) -> float:
+    """Get the best latency (ns) of reading a nested value by attributes"""
+    timer = timeit.Timer("conf.section1.key10", globals={"conf": conf})
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--reads", type=int, default=200000)
+    args = parser.parse_args()
+
+    data = make_config(args.sections, args.keys)
+    config_dc, config_nt = make_types(args.sections, args.keys)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir, "config.json")
+        path.write_text(json.dumps(data))
+
+        loads = {
+            "Diot": lambda: Config.load(path),
+            "dataclass": lambda: Config.load_as(config_dc, path),
+            "namedtuple": lambda: Config.load_as(config_nt, path),
+        }
+        print(f"{args.sections} sections of {args.keys} keys")
+        print(f"{'':<12}{'load':>12}{'memory':>14}{'attr read':>14}")
+        for name, load in loads.items():
+            # the classes compiled on the first load are not counted
+            load()
+            conf, mem = measure(load)
+            assert conf.section1.key10 == "value 10"
+            time = best_time(load, args.number)
+            read = read_latency(conf, args.reads)
+            print(f"{name:<12}{time:9.2f} ms{mem:10.1f} KiB{read:10.1f} ns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Time of loading a configuration file of each format: parsing the content
+already read (`loader.loading()`), and the whole loading from reading the
+file to the loaded Diot object (`Config.load_one()`)
+
+    python benchmarks/loaders.py
+    python benchmarks/loaders.py --sections 100 --keys 20 --number 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+from simpleconf import Config
+from simpleconf.loaders import preload
+from simpleconf.utils import get_loader
+
+
+def make_config(n_sections: int, n_keys: int) -> Dict[str, Dict[str, str]]:
+    """Make a config of sections with string values, so that it can be
+    written in all the formats"""
+    return {
+        f"section{s}": {f"key{k}": f"value {s} {k} é" for k in range(n_keys)}
+        for s in range(n_sections)
+    }
+
+
+def write_files(data: Dict[str, Dict[str, str]], tmpdir: str) -> Dict[str, Path]:
+    """Write the config in all the formats"""
+    import yaml
+
+    contents = {
+        "json": json.dumps(data, ensure_ascii=False),
+        "yaml": yaml.safe_dump(data, allow_unicode=True),
+        "toml": "\n".join(
+            f"[{section}]\n"
+            + "\n".join(f'{key} = "{value}"' for key, value in values.items())
+            for section, values in data.items()
+        ),
+        "ini": "[default]\n"
+        + "\n".join(
+            f"{section}_{key} = {value}"
+            for section, values in data.items()
+            for key, value in values.items()
+        ),
+        "env": "\n".join(
+            f'{section}_{key}="{value}"'
+            for section, values in data.items()
+            for key, value in values.items()
+        ),
+    }
+    files = {}
+    for ext, content in contents.items():
+        files[ext] = Path(tmpdir, f"config.{ext}")
+        files[ext].write_text(content, encoding="utf-8")
+    return files
+
+
+def best_time(func: Callable[[], object], number: int) -> float:
+    """Get the best time (ms) of a call"""
+    return min(timeit.repeat(func, repeat=5, number=number)) / number * 1000.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    data = make_config(args.sections, args.keys)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = write_files(data, tmpdir)
+        print(f"{args.sections} sections of {args.keys} keys")
+        print(f"{'loader':<10}{'size':>12}{'parse':>12}{'load':>12}")
+        for ext, path in files.items():
+            size = path.stat().st_size / 1024.0
+            loader = get_loader(ext)
+            preloaded = preload(path)
+            parse = best_time(lambda: loader.loading(preloaded, False), args.number)
+            load = best_time(lambda: Config.load_one(path), args.number)
+            print(f"{ext:<10}{size:8.1f} KiB{parse:9.2f} ms{load:9.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
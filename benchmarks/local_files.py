@@ -0,0 +1,105 @@
+"""Per-file overhead of loading local configuration files
+
+It loads a number of small local files with the sync and the async loaders,
+once with local files accessed through PanPath (as before the fast path),
+and once with the local-filesystem fast path, and reports the time per file:
+
+    python benchmarks/local_files.py
+    python benchmarks/local_files.py --files 500 --runs 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+from simpleconf import loaders
+from simpleconf.utils import get_loader
+
+
+@contextmanager
+def through_panpath() -> Iterator[None]:
+    """Access the local files through PanPath, as before the fast path"""
+    from panpath import PanPath
+
+    to_path = loaders._to_path
+    loaders._to_path = PanPath  # type: ignore[assignment]
+    try:
+        yield
+    finally:
+        loaders._to_path = to_path
+
+
+def make_files(directory: Path, n: int) -> List[str]:
+    """Create n small toml files"""
+    files = []
+    for i in range(n):
+        path = directory / f"conf{i}.toml"
+        path.write_text(f'a = {i}\nb = "x{i}"\n[c]\nd = [1, 2, 3]\n')
+        files.append(str(path))
+    return files
+
+
+def load_sync(files: List[str]) -> None:
+    loader = get_loader("toml")
+    for file in files:
+        loader.load(file)
+
+
+def load_async(files: List[str]) -> None:
+    loader = get_loader("toml")
+
+    async def _load() -> None:
+        for file in files:
+            await loader.a_load(file)
+
+    asyncio.run(_load())
+
+
+def per_file(func: Callable[[List[str]], None], files: List[str], runs: int) -> float:
+    """Get the best time (us) per file of the runs"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(files)
+        best = min(best, time.perf_counter() - start)
+    return best / len(files) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200, help="Number of files")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of runs, the best one is reported",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = make_files(Path(tmpdir), args.files)
+        # warm up the imports
+        load_sync(files[:1])
+        load_async(files[:1])
+
+        print(f"{'loader':<8} {'PanPath':>12} {'fast path':>12} {'speedup':>8}")
+        for name, func in (("sync", load_sync), ("async", load_async)):
+            with through_panpath():
+                before = per_file(func, files, args.runs)
+            after = per_file(func, files, args.runs)
+            print(
+                f"{name:<8} {before:9.1f} us {after:9.1f} us "
+                f"{before / after:7.2f}x"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Benchmark of merging the layers of configurations
+
+It merges a stack of overlay layers over a base configuration, the way
+`Config.load()` merges the loaded files, by updating an empty Diot with the
+layers one by one (as before), and with `merge_layers()`, in place (as
+`Config.load()` does) and with the layers kept unchanged:
+
+    python benchmarks/merge.py
+    python benchmarks/merge.py --layers 20 --keys 10000 --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from functools import partial
+from typing import Callable, List
+
+from diot import Diot
+
+from simpleconf.utils import merge_layers
+
+
+def make_layers(n_layers: int, n_keys: int, seed: int = 8525) -> List[Diot]:
+    """Make the base layer with n_keys leaves in sections of 100 keys, and the
+    overlays, each overriding 1% of the keys in some of the sections"""
+    rng = random.Random(seed)
+    n_sections = max(n_keys // 100, 1)
+    base = Diot(
+        {
+            f"section{s}": {
+                f"key{k}": {"value": k, "enabled": True} if k % 10 == 0 else k
+                for k in range(100)
+            }
+            for s in range(n_sections)
+        }
+    )
+    layers = [base]
+    for _ in range(n_layers - 1):
+        overlay: dict = {}
+        for _ in range(max(n_keys // 100, 1)):
+            section = f"section{rng.randrange(n_sections)}"
+            k = rng.randrange(100)
+            value = {"value": -k} if k % 10 == 0 else -k
+            overlay.setdefault(section, {})[f"key{k}"] = value
+        layers.append(Diot(overlay))
+    return layers
+
+
+def fold(layers: List[Diot]) -> Diot:
+    """Merge the layers one by one, as before"""
+    out = Diot()
+    for layer in layers:
+        out.update_recursively(layer)
+    return out
+
+
+def best_of(func: Callable[[List[Diot]], Diot], layers: Callable, runs: int):
+    """Get the best time (ms) of the runs and the result, with new layers
+    for each run, as they may be modified"""
+    best = float("inf")
+    for _ in range(runs):
+        lyrs = layers()
+        start = time.perf_counter()
+        result = func(lyrs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layers", type=int, default=20, help="Number of layers")
+    parser.add_argument(
+        "--keys",
+        type=int,
+        default=10000,
+        help="Number of keys in the base layer",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of runs, the best one is reported",
+    )
+    args = parser.parse_args()
+
+    def layers() -> List[Diot]:
+        return make_layers(args.layers, args.keys)
+
+    before, folded = best_of(fold, layers, args.runs)
+    inplace, merged = best_of(merge_layers, layers, args.runs)
+    copied, merged_copy = best_of(
+        partial(merge_layers, copy=True),
+        layers,
+        args.runs,
+    )
+    if merged != folded or merged_copy != folded:
+        print("The merged configurations are different!")
+        return 1
+
+    print(f"{args.layers} layers of {args.keys} keys")
+    print(f"update_recursively:        {before:9.2f} ms")
+    print(f"merge_layers:              {inplace:9.2f} ms  ({before / inplace:.2f}x)")
+    print(f"merge_layers(copy=True):   {copied:9.2f} ms  ({before / copied:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
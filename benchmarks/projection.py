@@ -0,0 +1,78 @@
+"""Time and peak memory of loading a large shared configuration, in full and
+projected with `only=`
+
+    python benchmarks/projection.py
+    python benchmarks/projection.py --sections 500 --keys 50 --only section1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+from simpleconf import Config
+
+
+def make_config(n_sections: int, n_keys: int) -> dict:
+    """Make a plain dict config with sections of nested tables"""
+    return {
+        f"section{s}": {
+            f"key{k}": {"value": k, "tags": ["a", "b"]} if k % 10 == 0 else k
+            for k in range(n_keys)
+        }
+        for s in range(n_sections)
+    }
+
+
+def measure(load: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """Get the best time (ms) and the peak memory (KiB) of loading"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000.0, peak / 1024.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--only", nargs="+", default=["section1", "section2.key10"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_config(args.sections, args.keys)
+
+    import yaml
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = {
+            "json": Path(tmpdir, "shared.json"),
+            "yaml": Path(tmpdir, "shared.yaml"),
+        }
+        files["json"].write_text(json.dumps(data))
+        files["yaml"].write_text(yaml.safe_dump(data))
+
+        print(f"{args.sections} sections of {args.keys} keys, only={args.only}")
+        print(f"{'':<14}{'time':>12}{'peak memory':>16}")
+        for fmt, path in files.items():
+            full = measure(lambda: Config.load(path), args.repeat)
+            only = measure(lambda: Config.load(path, only=args.only), args.repeat)
+            print(f"{fmt + ' full':<14}{full[0]:9.1f} ms{full[1]:12.1f} KiB")
+            print(f"{fmt + ' only':<14}{only[0]:9.1f} ms{only[1]:12.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Time of reloading templated configuration files (jinja2 and liquid), with
+and without the caches of the compiled templates
+
+The `bytecode` column is the time with only the bytecode cache on disk, as
+in new processes. The `plain` files contain no template syntax, so they are
+not rendered at all.
+
+    python benchmarks/templates.py
+    python benchmarks/templates.py --sections 100 --number 20
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+from simpleconf import Config
+from simpleconf.cache import bytecode_cache, template_cache
+from simpleconf.utils import get_loader
+
+
+def write_files(n_sections: int, tmpdir: str) -> Dict[str, Path]:
+    """Write a yaml jinja2 template and a toml liquid template, and the
+    plain files with the same content rendered"""
+    yaml_j2 = "\n".join(
+        f"section{s}:\n"
+        "{% for k in range(10) %}"
+        f"  key{{{{ k }}}}: {{{{ k * {s} }}}}\n"
+        "{% endfor %}"
+        for s in range(n_sections)
+    )
+    toml_liq = "\n".join(
+        f"[section{s}]\n"
+        "{% for k in range(10) %}"
+        f"key{{{{ k }}}} = {{{{ k | plus: {s} }}}}\n"
+        "{% endfor %}"
+        for s in range(n_sections)
+    )
+    files = {
+        "yaml.j2": Path(tmpdir, "config.yaml.j2"),
+        "toml.liq": Path(tmpdir, "config.toml.liq"),
+    }
+    files["yaml.j2"].write_text(yaml_j2)
+    files["toml.liq"].write_text(toml_liq)
+    for ext in ("yaml.j2", "toml.liq"):
+        files[f"{ext} plain"] = Path(tmpdir, f"plain.{ext}")
+        files[f"{ext} plain"].write_text(
+            get_loader(ext)._modifier(files[ext].read_bytes())
+        )
+    return files
+
+
+def best_time(func: Callable[[], object], number: int) -> float:
+    """Get the best time (ms) of a call"""
+    return min(timeit.repeat(func, repeat=5, number=number)) / number * 1000.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=50)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = write_files(args.sections, tmpdir)
+        print(f"{args.sections} sections")
+        print(f"{'loader':<16}{'uncached':>12}{'bytecode':>12}{'cached':>12}")
+        for ext, path in files.items():
+            template_cache.disable()
+            uncached = best_time(lambda: Config.load(path), args.number)
+            bytecode_cache.enable(Path(tmpdir, "bytecode"))
+            bytecode = best_time(lambda: Config.load(path), args.number)
+            bytecode_cache.disable()
+            template_cache.enable()
+            cached = best_time(lambda: Config.load(path), args.number)
+            print(
+                f"{ext:<16}{uncached:9.2f} ms{bytecode:9.2f} ms{cached:9.2f} ms"
+            )
+        print(
+            f"rendered: {template_cache.renders}, "
+            f"not rendered: {template_cache.skips}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,23 @@
-from .config import Config, ProfileConfig
+# Avoid importing typing, which is most of the import time otherwise
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any
+    from .config import Config, LazyConfig, ProfileConfig
 
-__all__ = ["Config", "ProfileConfig"]
+__all__ = ["Config", "LazyConfig", "ProfileConfig"]
 
 __version__ = "0.9.3"
+
+
+def __getattr__(name: str) -> "Any":
+    """Import the APIs on first use, so that `import simpleconf` is cheap"""
+    if name in __all__:
+        from . import config
+
+        return getattr(config, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,310 @@
+"""Parser backends of the json, yaml and toml loaders
+
+Each format has the backends registered in the order of preference, the
+fastest first. The first one that is installed is used, unless another one
+is chosen explicitly. The ones that reject or change what the default ones
+accept (`orjson` and `ujson` for NaN, Infinity and integers beyond 64 bits,
+`SafeLoader` and `CSafeLoader` for the python tags) are only used when they
+are chosen::
+
+    from simpleconf.backends import use_backend
+    use_backend("yaml", "FullLoader")
+
+or by the `SIMPLECONF_<FORMAT>_BACKEND` environment variables, e.g.
+`SIMPLECONF_JSON_BACKEND=json`.
+
+The throughput of the installed backends can be compared on your own files
+with::
+
+    python -m simpleconf.backends config.yaml config.json ...
+"""
+from __future__ import annotations
+
+import os
+import sys
+from functools import partial
+from importlib import import_module
+from threading import Lock
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence
+
+
+class Backend(NamedTuple):
+    """A parser backend of a format"""
+
+    name: str
+    # Parse the content into python objects
+    loads: Callable[[Any], Any]
+    # Whether loads() takes bytes. Otherwise, it is given str.
+    binary: bool
+    # The module, or the Loader class for yaml
+    parser: Any
+
+
+def _json_backend(name: str) -> Backend:
+    module = import_module(name)
+    # orjson and json decode bytes themselves, ujson takes str only
+    return Backend(name, module.loads, name != "ujson", module)
+
+
+def _yaml_backend(name: str) -> Backend:
+    yaml = import_module("yaml")
+    loader = getattr(yaml, name, None)
+    if loader is None:
+        # CFullLoader, CSafeLoader without libyaml
+        raise ImportError(f"yaml.{name} is not available (libyaml missing).")
+    return Backend(name, partial(yaml.load, Loader=loader), True, loader)
+
+
+def _toml_backend(name: str) -> Backend:
+    module = import_module(name)
+    # tomllib and tomli take str only, so does rtoml
+    return Backend(name, module.loads, False, module)
+
+
+# The backends of each format, in the order of preference.
+# CLoader and UnsafeLoader of yaml are not registered, since they construct
+# arbitrary python objects.
+BACKENDS: Dict[str, Dict[str, Callable[[], Backend]]] = {
+    "json": {
+        "orjson": partial(_json_backend, "orjson"),
+        "ujson": partial(_json_backend, "ujson"),
+        "json": partial(_json_backend, "json"),
+    },
+    "yaml": {
+        "CFullLoader": partial(_yaml_backend, "CFullLoader"),
+        "FullLoader": partial(_yaml_backend, "FullLoader"),
+        "CSafeLoader": partial(_yaml_backend, "CSafeLoader"),
+        "SafeLoader": partial(_yaml_backend, "SafeLoader"),
+    },
+    "toml": {
+        "rtoml": partial(_toml_backend, "rtoml"),
+        "tomllib": partial(_toml_backend, "tomllib"),
+        "tomli": partial(_toml_backend, "tomli"),
+    },
+}
+
+# The backends chosen explicitly, by format
+_CHOSEN: Dict[str, str] = {}
+# The backends in use, by format
+_BACKENDS: Dict[str, Backend] = {}
+# The backends that are not automatically chosen, since their results
+# differ from the default ones (e.g. python tags, NaN or big integers not
+# supported)
+_NOT_AUTO = {"orjson", "ujson", "CSafeLoader", "SafeLoader"}
+_LOCK = Lock()
+
+
+def register_backend(
+    fmt: str,
+    name: str,
+    factory: Callable[[], Backend],
+    first: bool = False,
+) -> None:
+    """Register a parser backend
+
+    Args:
+        fmt: The format, `json`, `yaml` or `toml`
+        name: The name of the backend
+        factory: A function to create the Backend object, raising
+            ImportError if the backend is not installed
+        first: Whether to prefer it over the registered backends
+    """
+    backends = BACKENDS.setdefault(fmt, {})
+    backends.pop(name, None)
+    if first:
+        BACKENDS[fmt] = {name: factory, **backends}
+    else:
+        backends[name] = factory
+    _BACKENDS.pop(fmt, None)
+
+
+def use_backend(fmt: str, name: str | None) -> Backend | None:
+    """Choose the backend of a format explicitly
+
+    Args:
+        fmt: The format, `json`, `yaml` or `toml`
+        name: The name of the backend. None to choose it automatically.
+
+    Returns:
+        The backend chosen, or None if it is to be chosen automatically
+
+    Raises:
+        ValueError: If the backend is not registered
+        ImportError: If the backend is not installed
+    """
+    with _LOCK:
+        _BACKENDS.pop(fmt, None)
+        if name is None:
+            _CHOSEN.pop(fmt, None)
+            return None
+
+        if name not in BACKENDS.get(fmt, {}):
+            raise ValueError(f"Unknown {fmt} backend: {name!r}")
+        backend = BACKENDS[fmt][name]()
+        _CHOSEN[fmt] = name
+        _BACKENDS[fmt] = backend
+        return backend
+
+
+def available_backends(fmt: str) -> List[Backend]:
+    """Get the installed backends of a format, in the order of preference
+
+    Args:
+        fmt: The format, `json`, `yaml` or `toml`
+
+    Returns:
+        The Backend objects
+    """
+    out = []
+    for factory in BACKENDS.get(fmt, {}).values():
+        try:
+            out.append(factory())
+        except ImportError:
+            pass
+    return out
+
+
+def _choose_backend(fmt: str) -> Backend:
+    """Choose the backend of a format, explicitly or automatically"""
+    name = _CHOSEN.get(fmt) or os.environ.get(f"SIMPLECONF_{fmt.upper()}_BACKEND")
+    if name:
+        if name not in BACKENDS.get(fmt, {}):
+            raise ValueError(f"Unknown {fmt} backend: {name!r}")
+        return BACKENDS[fmt][name]()
+
+    for name, factory in BACKENDS.get(fmt, {}).items():
+        if name in _NOT_AUTO:
+            continue
+        try:
+            return factory()
+        except ImportError:
+            pass
+
+    raise ImportError(
+        f"None of the {fmt} backends is installed: "
+        f"{', '.join(BACKENDS.get(fmt, {}))}"
+    )
+
+
+def get_backend(fmt: str) -> Backend:
+    """Get the backend in use of a format
+
+    Args:
+        fmt: The format, `json`, `yaml` or `toml`
+
+    Returns:
+        The Backend object
+
+    Raises:
+        ImportError: If none of the backends is installed
+    """
+    try:
+        return _BACKENDS[fmt]
+    except KeyError:
+        pass
+
+    with _LOCK:
+        if fmt not in _BACKENDS:
+            _BACKENDS[fmt] = _choose_backend(fmt)
+        return _BACKENDS[fmt]
+
+
+def _file_format(path: str) -> str | None:
+    """Get the format of the file to benchmark by its extension"""
+    from .utils import config_to_ext
+
+    ext = config_to_ext(path).split(".")[0]
+    return {"yml": "yaml"}.get(ext, ext) if ext in (*BACKENDS, "yml") else None
+
+
+def benchmark(paths: Sequence[str], number: int = 0) -> List[Dict[str, Any]]:
+    """Measure the throughput of the installed backends on the files
+
+    The content is read before timing, and the time to decode it is
+    included for the backends that take str.
+
+    Args:
+        paths: The files. The formats are detected by the extensions.
+        number: How many times to parse each file. 0 to decide by the
+            time of the first parse.
+
+    Returns:
+        The results, with the keys `path`, `format`, `backend`, `chosen`
+        (whether it is the backend in use) and `mbps` (MB/s), or `error`
+        if the backend fails to parse the file.
+    """
+    import timeit
+
+    results: List[Dict[str, Any]] = []
+    for path in paths:
+        fmt = _file_format(path)
+        if fmt is None:
+            raise ValueError(f"No backends for file: {path}")
+
+        with open(path, "rb") as fh:
+            content = fh.read()
+        chosen = get_backend(fmt).name
+        for backend in available_backends(fmt):
+            result = {
+                "path": path,
+                "format": fmt,
+                "backend": backend.name,
+                "chosen": backend.name == chosen,
+            }
+            loads = backend.loads
+            if backend.binary:
+                func = partial(loads, content)
+            else:
+                func = lambda loads=loads: loads(content.decode())  # noqa: E731
+            timer = timeit.Timer(func)
+            try:
+                n = number or timer.autorange()[0]
+                best = min(timer.repeat(repeat=3, number=n)) / n
+            except Exception as exc:
+                result["error"] = f"{type(exc).__name__}: {exc}"
+            else:
+                result["mbps"] = len(content) / best / 1e6
+            results.append(result)
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry of the benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m simpleconf.backends",
+        description="Compare the throughput of the installed parser "
+        "backends on the configuration files. "
+        "The backend in use is marked with *.",
+    )
+    parser.add_argument("files", nargs="+", help="json, yaml or toml files")
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=0,
+        help="How many times to parse each file (default: decided by timing)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        results = benchmark(args.files, args.number)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    path = None
+    for result in results:
+        if result["path"] != path:
+            path = result["path"]
+            print(f"{path} ({result['format']})")
+        mark = "*" if result["chosen"] else " "
+        if "error" in result:
+            print(f"  {mark} {result['backend']:<14}{result['error']}")
+        else:
+            print(f"  {mark} {result['backend']:<14}{result['mbps']:10.2f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
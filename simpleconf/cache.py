@@ -0,0 +1,541 @@
+"""Caches of loaded configuration files
+
+Two caches are provided, both disabled by default:
+
+- `load_cache`, an in-process LRU cache::
+
+    from simpleconf.cache import load_cache
+    load_cache.enable(maxsize=128)
+
+  The entries are keyed by the resolved path, the stat signature
+  (mtime_ns, size, inode) of the file, and the loader class, so a modified
+  file is loaded again automatically.
+
+- `disk_cache`, a persistent cache shared by processes::
+
+    from simpleconf.cache import disk_cache
+    disk_cache.enable("/path/to/cache/dir", max_size=64 * 1024 * 1024)
+
+  It can also be enabled by the `SIMPLECONF_CACHE_DIR` environment variable.
+  The entries are keyed by the content of the file, the loader class and the
+  version of simpleconf.
+
+Only local configuration files are cached.
+
+The compiled templates of the jinja2 and liquid loaders are cached in
+`template_cache`, which is enabled by default, since the entries are keyed by
+the content of the templates::
+
+    from simpleconf.cache import template_cache
+    template_cache.enable(maxsize=256)  # or disable()
+
+The code of the compiled templates can also be cached on disk, so that new
+processes don't need to compile them again. It is disabled by default::
+
+    from simpleconf.cache import bytecode_cache
+    bytecode_cache.enable("/path/to/cache/dir", max_size=64 * 1024 * 1024)
+
+It can also be enabled by the `SIMPLECONF_BYTECODE_CACHE_DIR` environment
+variable. The entries are keyed by the content of the templates, the loader
+class, the options and version of the template engine, and the versions of
+python and simpleconf.
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Any, BinaryIO, Hashable, NamedTuple, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+
+def _is_local_file(conf: Any) -> bool:
+    """Check if the configuration is a local file path"""
+    return isinstance(conf, (str, os.PathLike)) and "://" not in str(conf)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the cache"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LoadCache:
+    """A LRU cache for the loaded configurations
+
+    The cached configurations (plain dicts) are handed out without copying,
+    and must not be modified. The loaders build them into new containers
+    on every hit, like the freshly parsed ones, so the callers are still
+    free to modify what they get.
+
+    Args:
+        maxsize: The maximum number of entries. 0 to disable the cache.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache is enabled"""
+        return self.maxsize > 0
+
+    def enable(self, maxsize: int = 128) -> None:
+        """Enable the cache
+
+        Args:
+            maxsize: The maximum number of entries
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def disable(self) -> None:
+        """Disable the cache and clear all the entries"""
+        with self._lock:
+            self.maxsize = 0
+            self._data.clear()
+
+    def info(self) -> CacheInfo:
+        """Get the statistics of the cache"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def key(self, conf: Any, loader: type, kind: str) -> Tuple | None:
+        """Compose the key for a configuration file
+
+        Args:
+            conf: The configuration file
+            loader: The loader class
+            kind: What is loaded, `load` or `profiles`
+
+        Returns:
+            The key, or None if the configuration can't be cached (the cache
+            is disabled, it is not a local file, or it does not exist)
+        """
+        if not self.enabled or not _is_local_file(conf):
+            return None
+
+        # Taken when the file was read (a `PreloadedPath`), so that the
+        # content is not cached under the signature of a newer version
+        signature = getattr(conf, "signature", None)
+        try:
+            path = os.path.realpath(conf)
+            if signature is None:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+        return (path, *signature, loader, kind)
+
+    def get(self, key: Hashable) -> Any:
+        """Get the cached value, which must not be modified
+
+        Args:
+            key: The key by `key()`
+
+        Returns:
+            The cached value, or None if it is not cached
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache the value, which must not be modified afterwards
+
+        Args:
+            key: The key by `key()`
+            value: The loaded configuration
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, conf: Any = None) -> None:
+        """Remove the cached entries
+
+        Args:
+            conf: The configuration file to remove the entries for.
+                If not given, all the entries are removed.
+        """
+        with self._lock:
+            if conf is None:
+                self._data.clear()
+                return
+
+            path = os.path.realpath(str(conf))
+            for key in [key for key in self._data if key[0] == path]:
+                del self._data[key]
+
+    def _evict(self) -> None:
+        """Evict the least recently used entries beyond maxsize"""
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class DiskCache:
+    """A persistent cache for the loaded configurations
+
+    The loaded configurations are pickled into files in the cache directory.
+    The files are written to a temporary file first and then renamed, so
+    that concurrent processes never see partially written entries.
+    When the total size of the entries exceeds `max_size`, the least recently
+    used ones are removed.
+
+    Note that the entries are unpickled when read, so the cache directory
+    must only be writable by trusted users.
+
+    Args:
+        directory: The cache directory. None to disable the cache.
+        max_size: The maximum total size of the entries, in bytes.
+            0 for no limit.
+    """
+
+    SUFFIX = ".pickle"
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.directory: Path | None = None
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            self.enable(directory, max_size)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache is enabled"""
+        return self.directory is not None
+
+    def enable(
+        self,
+        directory: str | Path,
+        max_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Enable the cache
+
+        Args:
+            directory: The cache directory, created if it does not exist
+            max_size: The maximum total size of the entries, in bytes.
+                0 for no limit.
+        """
+        from pathlib import Path
+
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def disable(self) -> None:
+        """Disable the cache. The entries on disk are kept."""
+        self.directory = None
+
+    def info(self) -> CacheInfo:
+        """Get the statistics of the cache"""
+        currsize = len(self._entries()) if self.enabled else 0
+        return CacheInfo(self.hits, self.misses, self.max_size, currsize)
+
+    def key(
+        self,
+        conf: Any,
+        loader: type,
+        kind: str,
+        content: bytes | None = None,
+    ) -> str | None:
+        """Compose the key for a configuration file
+
+        Args:
+            conf: The configuration file
+            loader: The loader class
+            kind: What is loaded, `load` or `profiles`
+            content: The content of the file, if it has been read already
+
+        Returns:
+            The key, or None if the configuration can't be cached (the cache
+            is disabled, it is not a local file, or it can't be read)
+        """
+        if not self.enabled or not _is_local_file(conf):
+            return None
+
+        import hashlib
+        from . import __version__
+
+        if content is None:
+            # Hashed in chunks, as the file may be too large to read at once
+            hasher = hashlib.sha256()
+            try:
+                with open(conf, "rb") as fh:
+                    for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                        hasher.update(chunk)
+            except OSError:
+                return None
+        else:
+            hasher = hashlib.sha256(content)
+        hasher.update(
+            f"\0{loader.__module__}.{loader.__qualname__}\0{kind}"
+            f"\0{__version__}".encode()
+        )
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Get the cached value
+
+        Args:
+            key: The key by `key()`
+
+        Returns:
+            The cached value, or None if it is not cached
+        """
+        path = self.directory / f"{key}{self.SUFFIX}"  # type: ignore[operator]
+        try:
+            with open(path, "rb") as fh:
+                value = self._read(fh)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Corrupted or incompatible entry
+            self.misses += 1
+            self._remove(path)
+            return None
+
+        try:
+            # Mark it as recently used
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache the value
+
+        Args:
+            key: The key by `key()`
+            value: The loaded configuration
+        """
+        import tempfile
+
+        directory = self.directory
+        tmpfile = None
+        try:
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)  # type: ignore
+            fd, tmpfile = tempfile.mkstemp(
+                dir=directory,
+                prefix=f".{key}.",
+                suffix=".tmp",
+            )
+            with os.fdopen(fd, "wb") as fh:
+                self._write(value, fh)
+            os.replace(tmpfile, directory / f"{key}{self.SUFFIX}")  # type: ignore
+        except Exception:
+            # The cache should never break loading
+            if tmpfile is not None:
+                self._remove(tmpfile)
+            return
+
+        self._evict()
+
+    @staticmethod
+    def _read(fh: BinaryIO) -> Any:
+        """Read a value from an entry file"""
+        import pickle
+
+        return pickle.load(fh)
+
+    @staticmethod
+    def _write(value: Any, fh: BinaryIO) -> None:
+        """Write a value into an entry file"""
+        import pickle
+
+        pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def clear(self) -> None:
+        """Remove all the entries"""
+        if self.enabled:
+            for path, _ in self._entries():
+                self._remove(path)
+
+    def _entries(self) -> list:
+        """Get the entries with their stats, least recently used first"""
+        entries = []
+        try:
+            paths = list(self.directory.glob(f"*{self.SUFFIX}"))  # type: ignore
+        except OSError:  # pragma: no cover
+            return entries
+
+        for path in paths:
+            try:
+                entries.append((path, path.stat()))
+            except OSError:  # pragma: no cover
+                # removed by another process
+                continue
+        entries.sort(key=lambda entry: entry[1].st_mtime_ns)
+        return entries
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries beyond max_size"""
+        if not self.max_size:
+            return
+
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= stat.st_size
+
+    @staticmethod
+    def _remove(path: str | Path) -> None:
+        """Remove a file, ignoring errors"""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class TemplateCache(LoadCache):
+    """A LRU cache for the compiled templates
+
+    It also counts the contents of the templated files that are rendered
+    (`renders`) and the ones that are passed through as they are, since they
+    contain no template syntax (`skips`).
+
+    Args:
+        maxsize: The maximum number of entries. 0 to disable the cache.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.renders = 0
+        self.skips = 0
+
+    def count(self, rendered: bool) -> None:
+        """Count a content of the templated files
+
+        Args:
+            rendered: Whether it is rendered, or passed through as it is
+        """
+        with self._lock:
+            if rendered:
+                self.renders += 1
+            else:
+                self.skips += 1
+
+    def key(  # type: ignore[override]
+        self,
+        loader: type,
+        options: str,
+        content: str | bytes,
+    ) -> Tuple | None:
+        """Compose the key for a template
+
+        Args:
+            loader: The loader class
+            options: The options of the template engine, as a string
+            content: The content of the template
+
+        Returns:
+            The key, or None if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+
+        import hashlib
+
+        if isinstance(content, str):
+            content = content.encode()
+        return (loader, options, hashlib.sha256(content).digest())
+
+
+class BytecodeCache(DiskCache):
+    """A persistent cache for the compiled templates
+
+    The code objects of the compiled templates are marshalled into files in
+    the cache directory, written and evicted the same way as the entries of
+    `DiskCache`.
+
+    Note that the code objects are executed when the templates are rendered,
+    so the cache directory must only be writable by trusted users.
+
+    Args:
+        directory: The cache directory. None to disable the cache.
+        max_size: The maximum total size of the entries, in bytes.
+            0 for no limit.
+    """
+
+    SUFFIX = ".bytecode"
+
+    def key(  # type: ignore[override]
+        self,
+        loader: type,
+        options: str,
+        engine: str,
+        content: str | bytes,
+    ) -> str | None:
+        """Compose the key for a template
+
+        Args:
+            loader: The loader class
+            options: The options of the template engine, as a string
+            engine: The name and version of the template engine
+            content: The content of the template
+
+        Returns:
+            The key, or None if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+
+        import hashlib
+        import sys
+        from . import __version__
+
+        if isinstance(content, str):
+            content = content.encode()
+        hasher = hashlib.sha256(content)
+        # The code objects are specific to the python version
+        hasher.update(
+            f"\0{loader.__module__}.{loader.__qualname__}\0{options}\0{engine}"
+            f"\0{sys.implementation.cache_tag}\0{__version__}".encode()
+        )
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _read(fh: BinaryIO) -> Any:
+        """Read a code object from an entry file"""
+        import marshal
+
+        return marshal.load(fh)
+
+    @staticmethod
+    def _write(value: Any, fh: BinaryIO) -> None:
+        """Write a code object into an entry file"""
+        import marshal
+
+        marshal.dump(value, fh)
+
+
+load_cache = LoadCache()
+template_cache = TemplateCache(128)
+bytecode_cache = BytecodeCache(os.environ.get("SIMPLECONF_BYTECODE_CACHE_DIR") or None)
+disk_cache = DiskCache(os.environ.get("SIMPLECONF_CACHE_DIR") or None)
@@ -1,11 +1,25 @@
+"""Casters of the string values of the configurations
+
+A caster casts a string with its prefix (e.g. `@int:1`) and raises an error
+if the string does not have the prefix or can't be casted. The casters made
+by `type_caster()` carry their prefixes, so that a sequence of them can be
+compiled into a `CompiledCasters` object, which dispatches a string to the
+casters by its prefix, instead of trying all of them in turn.
+"""
 from __future__ import annotations
 
-import json
-from typing import Any, Callable, Dict, Sequence, TypeVar
-from ast import literal_eval
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+from .projection import ANY
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .schema import SchemaNode
 
 T = TypeVar("T", bound=Dict[str, Any])
+# The maximum number of the casted values to memoize for each compiled casters
+MEMO_SIZE = 4096
+# The types of the casted values that can be shared, so that they are memoized
+_IMMUTABLE = (str, int, float, bool, type(None))
 
 
 def type_caster(prefix: str, cast_fun: Callable) -> Any:
@@ -15,7 +29,7 @@ def type_caster(prefix: str, cast_fun: Callable) -> Any:
         """Cast value to base type"""
         if not value.startswith(prefix):
             if fail_raises:
-                raise ValueError(f"Expect `@int:` prefix, got `{value}`")
+                raise ValueError(f"Expect `{prefix}` prefix, got `{value}`")
             return value
         to_be_casted = value[len(prefix) :]
         try:
@@ -25,6 +39,9 @@ def type_caster(prefix: str, cast_fun: Callable) -> Any:
                 raise
             return value
 
+    # For CompiledCasters to dispatch by the prefix
+    _caster.prefix = prefix  # type: ignore[attr-defined]
+    _caster.cast_fun = cast_fun  # type: ignore[attr-defined]
     return _caster
 
 
@@ -45,12 +62,25 @@ def _cast_bool(value: str) -> bool:
     raise ValueError(f"Expect `@bool:true` or `@bool:false`, got `{value}`")
 
 
+def _cast_python(value: str) -> Any:
+    """Cast python literal"""
+    from ast import literal_eval
+
+    return literal_eval(value)
+
+
+def _cast_json(value: str) -> Any:
+    """Cast json string"""
+    import json
+
+    return json.loads(value)
+
+
 def _cast_toml(value: str) -> Any:
     """Cast toml string"""
-    from .utils import require_package
+    from .backends import get_backend
 
-    toml = require_package("rtoml", "tomllib", "tomli")
-    return toml.loads(value)
+    return get_backend("toml").loads(value)
 
 
 int_caster = type_caster("@int:", lambda x: int(float(x)))
@@ -58,16 +88,125 @@ float_caster = type_caster("@float:", float)
 bool_caster = type_caster("@bool:", _cast_bool)
 none_caster = type_caster("@none", _cast_none)
 null_caster = type_caster("null", _cast_none)
-python_caster = type_caster("@python:", literal_eval)
-py_caster = type_caster("@py:", literal_eval)
-json_caster = type_caster("@json:", json.loads)
+python_caster = type_caster("@python:", _cast_python)
+py_caster = type_caster("@py:", _cast_python)
+json_caster = type_caster("@json:", _cast_json)
 toml_caster = type_caster("@toml:", _cast_toml)
 
 
-def cast_value(value: Any, casters: Sequence[Callable]) -> Any:
-    """Cast a single value"""
-    if not isinstance(value, str):
+class CompiledCasters:
+    """The casters compiled into a dispatcher by their prefixes
+
+    The strings that don't start with the first character of any prefix are
+    rejected right away. Otherwise, the casters are looked up by the leading
+    characters of the strings, and tried in the order they are given, without
+    raising an exception for each mismatch. The results that can be shared
+    (e.g. `int`, `bool` and `None`) are memoized, as the same literals are
+    usually repeated in a configuration.
+
+    If any of the casters is not made by `type_caster()`, all the casters
+    are tried in turn.
+
+    Args:
+        casters: The casters
+        memo_size: The maximum number of the casted values to memoize.
+            0 to disable memoization.
+    """
+
+    __slots__ = (
+        "casters",
+        "memo_size",
+        "_generic",
+        "_table",
+        "_lengths",
+        "_firsts",
+        "_memo",
+    )
+
+    def __init__(self, casters: Sequence[Callable], memo_size: int = MEMO_SIZE):
+        self.casters = tuple(casters)
+        self.memo_size = memo_size
+        self._memo: Dict[str, Any] = {}
+        self._table: Dict[str, List[Tuple[int, int, Callable]]] = {}
+        self._generic = not all(
+            getattr(caster, "prefix", None) for caster in self.casters
+        )
+        if not self._generic:
+            for index, caster in enumerate(self.casters):
+                prefix = caster.prefix  # type: ignore[attr-defined]
+                self._table.setdefault(prefix, []).append(
+                    (index, len(prefix), caster.cast_fun)  # type: ignore
+                )
+        self._lengths = sorted({len(prefix) for prefix in self._table})
+        self._firsts = frozenset(prefix[0] for prefix in self._table)
+
+    def __call__(self, value: Any) -> Any:
+        """Cast a single value"""
+        if not isinstance(value, str):
+            return value
+        if self._generic:
+            return _cast_value(value, self.casters)
+        if value[:1] not in self._firsts:
+            return value
+
+        memo = self._memo
+        try:
+            return memo[value]
+        except KeyError:
+            pass
+
+        out = self._dispatch(value)
+        if self.memo_size and isinstance(out, _IMMUTABLE):
+            if len(memo) >= self.memo_size:
+                memo.clear()
+            memo[value] = out
+        return out
+
+    def _dispatch(self, value: str) -> Any:
+        """Cast a string by the casters with matching prefixes"""
+        matches: List[Tuple[int, int, Callable]] = []
+        for length in self._lengths:
+            entries = self._table.get(value[:length])
+            if entries:
+                matches.extend(entries)
+        if len(matches) > 1:
+            matches.sort()
+
+        for _, length, cast_fun in matches:
+            try:
+                return cast_fun(value[length:])
+            except Exception:
+                continue
         return value
+
+
+# The compiled casters, by the casters
+_COMPILED: Dict[Tuple[Callable, ...], CompiledCasters] = {}
+
+
+def compile_casters(
+    casters: Sequence[Callable] | CompiledCasters,
+) -> CompiledCasters:
+    """Compile the casters, or get the ones compiled already
+
+    Args:
+        casters: The casters
+
+    Returns:
+        The CompiledCasters object
+    """
+    if isinstance(casters, CompiledCasters):
+        return casters
+
+    key = tuple(casters)
+    try:
+        return _COMPILED[key]
+    except KeyError:
+        return _COMPILED.setdefault(key, CompiledCasters(key))
+
+
+def _cast_value(value: str, casters: Sequence[Callable]) -> Any:
+    """Cast a single value by trying the casters in turn"""
     for caster in casters:
         try:
             return caster(value)
@@ -76,11 +215,100 @@ def cast_value(value: Any, casters: Sequence[Callable]) -> Any:
     return value
 
 
-def cast(conf: T, casters: Sequence[Callable]) -> T:
-    """Cast the configuration"""
+def cast_value(value: Any, casters: Sequence[Callable] | CompiledCasters) -> Any:
+    """Cast a single value"""
+    return compile_casters(casters)(value)
+
+
+def _cast(conf: T, caster: CompiledCasters) -> T:
+    """Cast the configuration by the compiled casters"""
     for key, value in conf.items():
         if isinstance(value, dict):
-            conf[key] = cast(value, casters)  # type: ignore[arg-type]
+            conf[key] = _cast(value, caster)  # type: ignore[arg-type]
+        elif isinstance(value, str):
+            casted = caster(value)
+            # Setting items of Diot objects is expensive
+            if casted is not value:
+                conf[key] = casted
+    return conf
+
+
+def _cast_schema(
+    conf: T,
+    caster: CompiledCasters | None,
+    nodes: Dict[Any, SchemaNode],
+    path: Tuple[str, ...],
+) -> T:
+    """Cast the configuration by the compiled casters, and the values of the
+    keys in the schema by their types
+
+    The dicts converted from strings (e.g. by `@json:`) are walked as well,
+    with only the values of the keys in the schema converted (caster=None).
+    The values of the nodes to validate (see `simpleconf.validation`) are
+    converted and checked by them, with their subtrees walked on the way.
+    """
+    any_node = nodes.get(ANY)
+    for key, value in conf.items():
+        node = nodes.get(key, any_node)
+        if node is not None and node.check is not None:
+            casted = node.check(node, value, (*path, key), caster)
+            if casted is not value:
+                conf[key] = casted
+            continue
+
+        if isinstance(value, dict):
+            if node is not None and node.children is not None:
+                conf[key] = _cast_schema(  # type: ignore[arg-type]
+                    value, caster, node.children, (*path, key)
+                )
+            elif caster is not None:
+                conf[key] = _cast(value, caster)  # type: ignore[arg-type]
+            continue
+
+        if not isinstance(value, str):
+            continue
+        if node is None or node.convert is None:
+            casted = value if caster is None else caster(value)
         else:
-            conf[key] = cast_value(value, casters)
+            try:
+                casted = node.convert(value)
+            except Exception as exc:
+                keypath = ".".join(map(str, (*path, key)))
+                raise ValueError(
+                    f"Failed to convert {keypath!r} to {node.type!r}: {exc}"
+                ) from exc
+
+        if node is not None and node.children and isinstance(casted, dict):
+            casted = _cast_schema(casted, None, node.children, (*path, key))
+        if casted is not value:
+            conf[key] = casted
     return conf
+
+
+def cast(
+    conf: T,
+    casters: Sequence[Callable] | CompiledCasters | None,
+    schema: Dict[Any, SchemaNode] | SchemaNode | None = None,
+) -> T:
+    """Cast the configuration
+
+    Args:
+        conf: The configuration
+        casters: The casters, None for not to cast by the prefixes
+        schema: The nodes of a compiled schema (see `simpleconf.schema`),
+            to convert the values of the keys in it by their types instead,
+            or the root node to validate the configuration by
+            (see `simpleconf.validation`)
+
+    Returns:
+        The configuration casted in place
+    """
+    caster = compile_casters(casters) if casters else None
+    if isinstance(schema, tuple):
+        # the root node
+        if schema.check is not None:
+            return schema.check(schema, conf, (), caster)
+        schema = schema.children
+    if schema:
+        return _cast_schema(conf, caster, schema, ())
+    return conf if caster is None else _cast(conf, caster)
@@ -1,14 +1,321 @@
 from __future__ import annotations
 
+from collections.abc import Mapping as MappingABC, MutableMapping
 from contextlib import contextmanager
-from typing import Any, List, Generator, Union, Sequence
+from functools import partial
+from threading import RLock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Generator,
+    Mapping,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    Sequence,
+)
 
 from diot import Diot
 
-from .utils import config_to_ext, detect_loader_directive, get_loader, POOL_KEY, META_KEY
-from .loaders import Loader
+from .utils import (
+    config_to_ext,
+    detect_loader_directive,
+    gather_limited,
+    get_loader,
+    merge_layers,
+    run_parallel,
+    _normalize_loaders,
+    INDEX_ATTR,
+    POOL_KEY,
+    META_KEY,
+)
+from .cache import load_cache
+from .container import Container, merge_dicts, to_container
+from .loaders import Loader, a_preload, preload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
+    from .frozen import FrozenConfig
+    from .index import ConfigIndex
+    from .handle import ConfigHandle
+    from .schema import Schema
 
 LoaderType = Union[str, Loader, None]
+T = TypeVar("T")
+
+# Configurations with these extensions are not files to read
+_NON_FILE_EXTS = ("dict", "osenv")
+
+
+def _cacheable(conf: Any) -> bool:
+    """Whether the configuration may be found in the load cache"""
+    return load_cache.enabled and "://" not in str(conf)
+
+
+def _resolve_loader(conf: Any, loader: LoaderType) -> Tuple[Any, Loader]:
+    """Resolve the loader for the configuration
+
+    When the loader is detected from the configuration file, the file is read
+    here (only once), so that the loader directive in the first line can be
+    checked, and the content is reused by the loader.
+
+    With the load cache enabled, only the first line of a local file is
+    read here, so that the loader looks it up in the cache before reading
+    the file.
+
+    Args:
+        conf: The configuration
+        loader: The loader to use. None to detect it.
+
+    Returns:
+        The configuration (maybe with its content read) and the loader
+    """
+    if loader is not None:
+        return conf, get_loader(loader)
+
+    if hasattr(conf, "read"):
+        raise ValueError("'loader' must be specified for stream")
+
+    ext = config_to_ext(conf)
+    if ext in _NON_FILE_EXTS:
+        return conf, get_loader(ext)
+
+    if _cacheable(conf):
+        return conf, get_loader(detect_loader_directive(conf, ext))
+
+    conf = preload(conf)
+    ext = detect_loader_directive(conf, ext)
+    return conf, get_loader(ext)
+
+
+async def _a_resolve_loader(conf: Any, loader: LoaderType) -> Tuple[Any, Loader]:
+    """Asynchronously resolve the loader for the configuration
+
+    See `_resolve_loader()` for details.
+    """
+    if loader is not None:
+        return conf, get_loader(loader)
+
+    if hasattr(conf, "read"):
+        raise ValueError("'loader' must be specified for stream")
+
+    ext = config_to_ext(conf)
+    if ext in _NON_FILE_EXTS:
+        return conf, get_loader(ext)
+
+    if _cacheable(conf):
+        return conf, get_loader(detect_loader_directive(conf, ext))
+
+    conf = await a_preload(conf)
+    ext = detect_loader_directive(conf, ext)
+    return conf, get_loader(ext)
+
+
+def _load_with_profiles(
+    conf: Any,
+    loader: LoaderType,
+    ignore_nonexist: bool,
+    only: Sequence[str] | None = None,
+    schema: Schema | None = None,
+    container: Container = Diot,
+) -> Any:
+    """Resolve the loader and load the configuration with profiles"""
+    conf, lder = _resolve_loader(conf, loader)
+    return lder.load_with_profiles(conf, ignore_nonexist, only, schema, container)
+
+
+async def _a_load_with_profiles(
+    conf: Any,
+    loader: LoaderType,
+    ignore_nonexist: bool,
+    only: Sequence[str] | None = None,
+    schema: Schema | None = None,
+    container: Container = Diot,
+) -> Any:
+    """Resolve the loader and load the configuration with profiles
+    asynchronously"""
+    conf, lder = await _a_resolve_loader(conf, loader)
+    return await lder.a_load_with_profiles(
+        conf, ignore_nonexist, only, schema, container
+    )
+
+
+def _group_profiles(loaded: Sequence[Mapping[str, Any]]) -> Dict[str, List[Any]]:
+    """Group the configurations loaded with profiles by the profiles,
+    with the profile names lowercased"""
+    profiles: Dict[str, List[Any]] = {}
+    for ld in loaded:
+        for profile, value in ld.items():
+            profiles.setdefault(profile.lower(), []).append(value)
+    return profiles
+
+
+def _merge_profiles(
+    loaded: Sequence[Mapping[str, Any]],
+    container: Container = Diot,
+) -> Any:
+    """Merge the configurations loaded with profiles into the pool,
+    with the profile names lowercased, into dicts if the container is not
+    Diot"""
+    if container is not Diot:
+        return {
+            profile: merge_dicts(values)
+            for profile, values in _group_profiles(loaded).items()
+        }
+    return Diot(
+        [
+            (profile, merge_layers(values))
+            for profile, values in _group_profiles(loaded).items()
+        ]
+    )
+
+
+def _build_profile(
+    type_: Type[T],
+    loaded: Sequence[Mapping[str, Any]],
+    profile: str | None,
+    base: str,
+    allow_missing_base: bool,
+) -> T:
+    """Build the instance of the class from the configurations loaded with
+    profiles, for the profile based on the base profile"""
+    from .exceptions import NoSuchProfile
+    from .typed import build
+
+    profiles = _group_profiles(loaded)
+    if base and base not in profiles and not allow_missing_base:
+        raise ValueError(f"Base profile '{base}' not found")
+
+    profile = profile or base
+    if profile not in profiles:
+        raise NoSuchProfile(f"Profile '{profile}' not found")
+
+    layers = profiles[profile]
+    if base and base != profile and base in profiles:
+        layers = profiles[base] + layers
+    return build(type_, layers)
+
+
+class _ProfileMeta(dict):
+    """The meta information of a configuration object with profiles that
+    is not a Diot object, with the container kept as an attribute to switch
+    the profiles with, so that it is not an item of the configuration"""
+
+    __slots__ = ("container",)
+
+    def __init__(
+        self,
+        current_profile: str | None,
+        base_profile: str | None,
+        container: Container,
+    ) -> None:
+        super().__init__(current_profile=current_profile, base_profile=base_profile)
+        self.container = container
+
+
+def _meta_container(conf: Mapping[str, Any]) -> Container:
+    """Get the container to switch the profiles of a configuration object
+    that is not a Diot object with"""
+    return getattr(conf[META_KEY], "container", dict)
+
+
+def _profile_config(
+    pool: Dict[str, Any],
+    base: str,
+    allow_missing_base: bool,
+    container: Container,
+) -> Any:
+    """Build the configuration object with the pool of the profiles,
+    switched to the base profile"""
+    if base and base not in pool and not allow_missing_base:
+        raise ValueError(f"Base profile '{base}' not found")
+
+    if container is Diot:
+        out = Diot({POOL_KEY: pool})
+        out[META_KEY] = {
+            "current_profile": None,
+            "base_profile": None,
+        }
+        if base and base in pool:
+            out = ProfileConfig.use_profile(out, base, base=base)
+        return out
+
+    meta = _ProfileMeta(None, None, container)
+    pool = {profile: to_container(conf, container) for profile, conf in pool.items()}
+    current: Mapping[str, Any] = {}
+    if base and base in pool:
+        meta["current_profile"] = meta["base_profile"] = base
+        # not sharing the values with the pool
+        current = to_container(pool[base], container, copy=True)
+    return container({POOL_KEY: container(pool), META_KEY: meta, **current})
+
+
+def _use_profile_container(
+    conf: Mapping[str, Any],
+    profile: str,
+    base: str,
+    layers: List[Mapping[str, Any]],
+    copy: bool,
+) -> Any:
+    """Switch the profile of a configuration object that is not a Diot
+    object, see `ProfileConfig.use_profile()`"""
+    meta = conf[META_KEY]
+    container = _meta_container(conf)
+    # the subtrees not overridden are shared with the pool by merge_dicts()
+    merged = to_container(merge_dicts(layers), container, copy=True)
+    if copy:
+        meta = _ProfileMeta(profile, base, container)
+        return container({POOL_KEY: conf[POOL_KEY], META_KEY: meta, **merged})
+
+    if not isinstance(conf, MutableMapping):
+        raise TypeError(
+            f"Can't switch the profile of a {type(conf).__name__} object "
+            "in place, use copy=True instead."
+        )
+    for key in list(conf):
+        if key not in (POOL_KEY, META_KEY):
+            del conf[key]
+    conf.update(merged)
+    meta["current_profile"] = profile
+    meta["base_profile"] = base
+    return conf
+
+
+def _attach_index(conf: Diot) -> ConfigIndex:
+    """Build the index of the configuration and attach it to the object"""
+    from .index import ConfigIndex
+
+    index = ConfigIndex(conf)
+    # Not an item, so that it is not seen as a configuration item
+    conf.__dict__[INDEX_ATTR] = index
+    return index
+
+
+def _check_index_frozen(index: bool, frozen: bool) -> None:
+    """An index can't be attached to a frozen configuration"""
+    if index and frozen:
+        raise ValueError(
+            "'index' can't be used with 'frozen', "
+            "use simpleconf.index.ConfigIndex(conf) instead."
+        )
+
+
+def _check_container(container: Container, index: bool, frozen: bool) -> None:
+    """An index can only be attached to a Diot object, and a frozen
+    configuration is a FrozenConfig object"""
+    if container is Diot:
+        return
+    if index:
+        raise ValueError(
+            "'index' can only be used with the Diot container, "
+            "use simpleconf.index.ConfigIndex(conf) instead."
+        )
+    if frozen:
+        raise ValueError("'container' can't be used with 'frozen'.")
 
 
 class Config:
@@ -20,7 +327,15 @@ class Config:
         *configs: Any,
         loader: LoaderType | Sequence[LoaderType] = None,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+        frozen: bool = False,
+        index: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        validate: Schema | None = None,
+        container: Container = Diot,
+    ) -> Diot | FrozenConfig:
         """Load the configuration from the files, or other configurations
 
         Args:
@@ -31,37 +346,258 @@ class Config:
                 same length as configs.
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
+            parallel: Whether to load the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+                The configurations are still merged in the given order.
+            executor: An executor to load the configurations with.
+                Implies `parallel`.
+            frozen: Whether to return an immutable FrozenConfig object,
+                which is safe to share across threads.
+                See `simpleconf.frozen.freeze()`.
+            index: Whether to build a flattened index by dotted paths,
+                available by `Config.index(conf)`.
+            only: The dotted paths of the subtrees to load,
+                e.g. `["database", "cache.redis"]`. Other subtrees are
+                pruned right after parsing, before the values are casted
+                and the configurations are merged. None to load all.
+            schema: A mapping of the keys (or dotted paths) to the types, or
+                a dataclass or TypedDict class, to convert the string values
+                by, instead of casting them by the prefixes.
+                See `simpleconf.schema`.
+            validate: A dataclass or TypedDict class, or a JSON Schema, to
+                validate the configurations against, with the string values
+                converted to the types as they are loaded, and the values
+                checked on the merged configuration. Raises
+                ValidationError with the path of the value if it does not
+                match.
+                See `simpleconf.validation`.
+            container: The type of the mappings to build the configuration
+                into, `Diot`, `dict`, `types.MappingProxyType`, or a factory
+                that takes a dict. The configurations are loaded into dicts
+                and merged, and then built into the container directly.
+                See `simpleconf.container`.
 
         Returns:
-            A Diot object with the loaded configurations
+            The loaded configurations in the container, or a FrozenConfig
+            object if `frozen` is True
         """
-        if not isinstance(loader, Sequence) or isinstance(loader, str):
-            loader = [loader] * len(configs)
+        loader = _normalize_loaders(configs, loader)
+        _check_index_frozen(index, frozen)
+        _check_container(container, index, frozen)
+
+        if validate is not None:
+            from .validation import compile_validator
+
+            # converted by the loaders on the way of casting, and checked
+            # after the configurations are merged
+            schema = compile_validator(validate, schema, lenient=True)
+        # the layers in dicts to merge for the containers other than Diot
+        layer_container = Diot if container is Diot else dict
+        loaded = run_parallel(
+            [
+                partial(
+                    Config.load_one,
+                    conf,
+                    loader[i],
+                    ignore_nonexist,
+                    only,
+                    schema,
+                    layer_container,
+                )
+                for i, conf in enumerate(configs)
+            ],
+            parallel,
+            executor,
+        )
+
+        out = merge_layers(loaded) if container is Diot else merge_dicts(loaded)
+        if validate is not None:
+            from .validation import validate as validate_config
+
+            validate_config(out, validate)
+        out = to_container(out, container)
+        if frozen:
+            from .frozen import freeze
+
+            return freeze(out)
+        if index:
+            _attach_index(out)
+        return out
 
-        if len(loader) != len(configs):
-            raise ValueError(
-                f"Length of loader ({len(loader)}) does not match "
-                f"length of configs ({len(configs)})"
-            )
+    @classmethod
+    async def a_load(
+        cls,
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        concurrency: int | None = 16,
+        frozen: bool = False,
+        index: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        validate: Schema | None = None,
+        container: Container = Diot,
+    ) -> Diot | FrozenConfig:
+        """Asynchronously load the configuration from the files, or other
+        configurations
 
-        out = Diot()
-        for i, conf in enumerate(configs):
-            loaded = Config.load_one(conf, loader[i], ignore_nonexist)
-            out.update_recursively(loaded)
+        The configurations are fetched and parsed concurrently, and then
+        merged in the order they are given.
 
+        Args:
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same keys recursively.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            concurrency: The maximum number of configurations to load at
+                the same time. None or 0 for no limit.
+            frozen: Whether to return an immutable FrozenConfig object,
+                which is safe to share across threads.
+            index: Whether to build a flattened index by dotted paths,
+                available by `Config.index(conf)`.
+            only: The dotted paths of the subtrees to load,
+                e.g. `["database", "cache.redis"]`. Other subtrees are
+                pruned right after parsing, before the values are casted
+                and the configurations are merged. None to load all.
+            schema: A mapping of the keys (or dotted paths) to the types, or
+                a dataclass or TypedDict class, to convert the string values
+                by, instead of casting them by the prefixes.
+                See `simpleconf.schema`.
+            validate: A dataclass or TypedDict class, or a JSON Schema, to
+                validate the configurations against, with the string values
+                converted to the types as they are loaded, and the values
+                checked on the merged configuration. Raises
+                ValidationError with the path of the value if it does not
+                match.
+                See `simpleconf.validation`.
+            container: The type of the mappings to build the configuration
+                into, `Diot`, `dict`, `types.MappingProxyType`, or a factory
+                that takes a dict. The configurations are loaded into dicts
+                and merged, and then built into the container directly.
+                See `simpleconf.container`.
+
+        Returns:
+            The loaded configurations in the container, or a FrozenConfig
+            object if `frozen` is True
+        """
+        loader = _normalize_loaders(configs, loader)
+        _check_index_frozen(index, frozen)
+        _check_container(container, index, frozen)
+
+        if validate is not None:
+            from .validation import compile_validator
+
+            # converted by the loaders on the way of casting, and checked
+            # after the configurations are merged
+            schema = compile_validator(validate, schema, lenient=True)
+        # the layers in dicts to merge for the containers other than Diot
+        layer_container = Diot if container is Diot else dict
+        loaded = await gather_limited(
+            [
+                partial(
+                    cls.a_load_one,
+                    conf,
+                    loader[i],
+                    ignore_nonexist,
+                    only,
+                    schema,
+                    layer_container,
+                )
+                for i, conf in enumerate(configs)
+            ],
+            concurrency,
+        )
+
+        out = merge_layers(loaded) if container is Diot else merge_dicts(loaded)
+        if validate is not None:
+            from .validation import validate as validate_config
+
+            validate_config(out, validate)
+        out = to_container(out, container)
+        if frozen:
+            from .frozen import freeze
+
+            return freeze(out)
+        if index:
+            _attach_index(out)
         return out
 
     @classmethod
-    async def a_load(
+    def load_as(
         cls,
+        type_: Type[T],
         *configs: Any,
         loader: LoaderType | Sequence[LoaderType] = None,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+    ) -> T:
+        """Load the configuration from the files, or other configurations,
+        as an instance of a dataclass or a namedtuple
+
+        The instance, with the nested dataclasses or namedtuples, is built
+        directly from the loaded configurations, without merging them into
+        a Diot object. The keys that are not fields are pruned, and the
+        string values are converted by the types of the fields.
+        See `simpleconf.typed`.
+
+        Args:
+            type_: The dataclass or namedtuple class, e.g. a dataclass with
+                `slots=True` for smaller objects and faster attribute access
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same keys recursively.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            parallel: Whether to load the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+            executor: An executor to load the configurations with.
+                Implies `parallel`.
+
+        Returns:
+            The instance of the class
+
+        Raises:
+            ValidationError: If any required field is missing
+        """
+        from .typed import build, field_paths
+
+        loader = _normalize_loaders(configs, loader)
+
+        only = field_paths(type_)
+        loaded = run_parallel(
+            [
+                partial(
+                    Config.load_one, conf, loader[i], ignore_nonexist, only, type_, dict
+                )
+                for i, conf in enumerate(configs)
+            ],
+            parallel,
+            executor,
+        )
+        return build(type_, loaded)
+
+    @classmethod
+    async def a_load_as(
+        cls,
+        type_: Type[T],
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        concurrency: int | None = 16,
+    ) -> T:
         """Asynchronously load the configuration from the files, or other
-        configurations
+        configurations, as an instance of a dataclass or a namedtuple
+
+        See `load_as()` for details.
 
         Args:
+            type_: The dataclass or namedtuple class
             *configs: The configuration files or other configurations to load
                 Latter ones will override the former ones for items with the
                 same keys recursively.
@@ -69,29 +605,91 @@ class Config:
                 same length as configs.
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
+            concurrency: The maximum number of configurations to load at
+                the same time. None or 0 for no limit.
 
         Returns:
-            A Diot object with the loaded configurations
+            The instance of the class
         """
-        if not isinstance(loader, Sequence) or isinstance(loader, str):
-            loader = [loader] * len(configs)
+        from .typed import build, field_paths
+
+        loader = _normalize_loaders(configs, loader)
+
+        only = field_paths(type_)
+        loaded = await gather_limited(
+            [
+                partial(
+                    cls.a_load_one, conf, loader[i], ignore_nonexist, only, type_, dict
+                )
+                for i, conf in enumerate(configs)
+            ],
+            concurrency,
+        )
+        return build(type_, loaded)
 
-        if len(loader) != len(configs):
-            raise ValueError(
-                f"Length of loader ({len(loader)}) does not match "
-                f"length of configs ({len(configs)})"
-            )
+    @staticmethod
+    def index(conf: Mapping[str, Any]) -> ConfigIndex:
+        """Get the flattened index of the configuration by dotted paths
 
-        out = Diot()
-        for i, conf in enumerate(configs):
-            loaded = await cls.a_load_one(
-                conf,
-                loader[i],
-                ignore_nonexist,
-            )
-            out.update_recursively(loaded)
+        The index built by `load(..., index=True)` is returned. Otherwise,
+        it is built and attached to the configuration (if it is a Diot
+        object), so that it is kept updated by `ProfileConfig.use_profile()`.
 
-        return out
+        Args:
+            conf: The configuration object
+
+        Returns:
+            The ConfigIndex object
+        """
+        from .index import ConfigIndex
+
+        attrs = getattr(conf, "__dict__", None)
+        if attrs is None:
+            return ConfigIndex(conf)
+        if INDEX_ATTR in attrs:
+            return attrs[INDEX_ATTR]
+        return _attach_index(conf)  # type: ignore[arg-type]
+
+    @classmethod
+    def watch(
+        cls,
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+    ) -> ConfigHandle:
+        """Load the configuration into a handle that can be reloaded
+
+        `handle.config` is the loaded configuration, the same as by
+        `Config.load()`. `handle.reload()` parses only the sources that
+        changed since the last load, and returns the changed keys.
+
+        Args:
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same keys recursively.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            parallel: Whether to parse the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+            executor: An executor to parse the configurations with.
+                Implies `parallel`.
+
+        Returns:
+            The ConfigHandle object
+        """
+        from .handle import ConfigHandle
+
+        return ConfigHandle(
+            configs,
+            loader=loader,
+            ignore_nonexist=ignore_nonexist,
+            parallel=parallel,
+            executor=executor,
+        )
 
     @classmethod
     def load_one(
@@ -99,7 +697,10 @@ class Config:
         config,
         loader: str | Loader | None = None,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Load the configuration from the file
 
         Args:
@@ -107,21 +708,17 @@ class Config:
             loader: The loader to use
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
+            only: The dotted paths of the subtrees to load. None to load all.
+            schema: The schema to convert the string values by.
+                See `simpleconf.schema`.
+            container: The type of the mappings to build the configuration
+                into. See `simpleconf.container`.
 
         Returns:
-            A Diot object with the loaded configuration
+            The loaded configuration in the container
         """
-        if loader is None:
-            if hasattr(config, "read"):
-                raise ValueError("'loader' must be specified for stream")
-
-            ext = config_to_ext(config)
-            ext = detect_loader_directive(config, ext)
-            loader = get_loader(ext)
-        else:
-            loader = get_loader(loader)
-
-        return loader.load(config, ignore_nonexist)
+        config, lder = _resolve_loader(config, loader)
+        return lder.load(config, ignore_nonexist, only, schema, container)
 
     @classmethod
     async def a_load_one(
@@ -129,7 +726,10 @@ class Config:
         config,
         loader: str | Loader | None = None,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Asynchronously load the configuration from the file
 
         Args:
@@ -137,21 +737,142 @@ class Config:
             loader: The loader to use
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
+            only: The dotted paths of the subtrees to load. None to load all.
+            schema: The schema to convert the string values by.
+                See `simpleconf.schema`.
+            container: The type of the mappings to build the configuration
+                into. See `simpleconf.container`.
 
         Returns:
-            A Diot object with the loaded configuration
+            The loaded configuration in the container
         """
-        if loader is None:
-            if hasattr(config, "read"):
-                raise ValueError("'loader' must be specified for stream")
-
-            ext = config_to_ext(config)
-            ext = detect_loader_directive(config, ext)
-            loader = get_loader(ext)
-        else:
-            loader = get_loader(loader)
-
-        return await loader.a_load(config, ignore_nonexist)
+        config, lder = await _a_resolve_loader(config, loader)
+        return await lder.a_load(config, ignore_nonexist, only, schema, container)
+
+
+class LazyConfig(MappingABC):
+    """A configuration that is loaded on access
+
+    The sources are recorded, and only loaded when a key is accessed for
+    the first time. Lookups check the sources from the last one (with the
+    highest precedence) down, and stop at the first one that has the key
+    with a value that is not a dict. The values of the top-level keys are
+    merged and cached one at a time, so it behaves like the Diot object by
+    `Config.load()` with the same arguments.
+
+    Iterating over the keys, `len()` and `to_diot()` load all the sources.
+    Errors (e.g. non-existent files) are raised when the sources are loaded.
+
+    Args:
+        *configs: The configuration files or other configurations to load
+            Latter ones will override the former ones for items with the
+            same keys recursively.
+        loader: The loader to use. If a list is given, it must have the
+            same length as configs.
+        ignore_nonexist: Whether to ignore non-existent files
+            Otherwise, will raise errors
+    """
+
+    def __init__(
+        self,
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+    ) -> None:
+        loader = _normalize_loaders(configs, loader)
+
+        self._configs = configs
+        self._loaders = loader
+        self._ignore_nonexist = ignore_nonexist
+        self._layers: List[Diot | None] = [None] * len(configs)
+        self._values: Dict[str, Any] = {}
+        self._lock = RLock()
+
+    def _layer(self, i: int) -> Diot:
+        """Get the i-th source, loaded on first use"""
+        layer = self._layers[i]
+        if layer is None:
+            with self._lock:
+                layer = self._layers[i]
+                if layer is None:
+                    layer = self._layers[i] = Config.load_one(
+                        self._configs[i],
+                        self._loaders[i],
+                        self._ignore_nonexist,
+                    )
+        return layer
+
+    @property
+    def loaded(self) -> List[bool]:
+        """Whether each of the sources is loaded"""
+        return [layer is not None for layer in self._layers]
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key in self._values:  # pragma: no cover, set by other thread
+                return self._values[key]
+
+            values = []
+            for i in range(len(self._configs) - 1, -1, -1):
+                layer = self._layer(i)
+                if key not in layer:
+                    continue
+                value = layer[key]
+                values.append(value)
+                if not isinstance(value, dict):
+                    break
+
+            if not values:
+                raise KeyError(key)
+
+            # the subtrees of the key are not used elsewhere,
+            # so they are merged in place
+            value = merge_layers([{key: val} for val in reversed(values)])[key]
+            self._values[key] = value
+            return value
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self.__class__.__name__} object has no attribute {name!r}"
+            ) from None
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._values:
+            return True
+        return any(
+            key in self._layer(i) for i in range(len(self._configs) - 1, -1, -1)
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        keys: Dict[str, None] = {}
+        for i in range(len(self._configs)):
+            keys.update(dict.fromkeys(self._layer(i)))
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        loaded = sum(self.loaded)
+        return (
+            f"<{self.__class__.__name__} "
+            f"({loaded}/{len(self._configs)} sources loaded, "
+            f"{len(self._values)} keys merged)>"
+        )
+
+    def to_diot(self) -> Diot:
+        """Load and merge everything into a Diot object"""
+        return Diot([(key, self[key]) for key in self])
 
 
 class ProfileConfig:
@@ -165,6 +886,13 @@ class ProfileConfig:
         ignore_nonexist: bool = False,
         base: str = "default",
         allow_missing_base: bool = False,
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+        index: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        validate: Schema | None = None,
+        container: Container = Diot,
     ) -> Diot:
         """Load the configuration from the files, or other configurations
 
@@ -180,118 +908,346 @@ class ProfileConfig:
             allow_missing_base: Whether to allow missing base profile
                 If False, will raise errors when the base profile is not found
                 in the loaded profiles.
+            parallel: Whether to load the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+                The configurations are still merged in the given order.
+            executor: An executor to load the configurations with.
+                Implies `parallel`.
+            index: Whether to build a flattened index by dotted paths,
+                available by `Config.index(conf)`. It is rebuilt when the
+                profile is switched by `use_profile()`.
+            only: The dotted paths of the subtrees to load under each
+                profile, e.g. `["database", "cache.redis"]`. Other subtrees
+                are pruned right after parsing, before the values are casted
+                and the profiles are merged. None to load all.
+            schema: A mapping of the keys (or dotted paths) to the types, or
+                a dataclass or TypedDict class, to convert the string values
+                under each profile by, instead of casting them by the
+                prefixes. See `simpleconf.schema`.
+            validate: A dataclass or TypedDict class, or a JSON Schema, to
+                validate the configuration of each profile (merged with the
+                base profile) against. See `simpleconf.validation`.
+            container: The type of the mappings to build the configuration
+                into, `Diot`, `dict`, `types.MappingProxyType`, or a factory
+                that takes a dict. The configurations of the profiles are
+                loaded into dicts and merged, and then built into the
+                container directly.
+                It must be mutable to switch the profiles in place.
+                See `simpleconf.container`.
         """
-        if not isinstance(loader, Sequence) or isinstance(loader, str):
-            loader = [loader] * len(configs)
+        loader = _normalize_loaders(configs, loader)
 
-        if len(loader) != len(configs):
-            raise ValueError(
-                f"Length of loader ({len(loader)}) does not match "
-                f"length of configs ({len(configs)})"
+        _check_container(container, index, False)
+
+        if validate is not None:
+            from .validation import compile_validator
+
+            # converted by the loaders on the way of casting, and checked
+            # after the configurations are merged
+            schema = compile_validator(validate, schema, lenient=True)
+        # the profiles in dicts to merge for the containers other than Diot
+        layer_container = Diot if container is Diot else dict
+        funcs = [
+            partial(
+                _load_with_profiles,
+                conf,
+                loader[i],
+                ignore_nonexist,
+                only,
+                schema,
+                layer_container,
             )
+            for i, conf in enumerate(configs)
+        ]
+        pool = _merge_profiles(run_parallel(funcs, parallel, executor), container)
+        if validate is not None:
+            from .validation import validate_profiles
+
+            validate_profiles(pool, base, validate)
+        out = _profile_config(pool, base, allow_missing_base, container)
+        if index:
+            _attach_index(out)
+        return out
 
-        out = Diot({POOL_KEY: Diot()})
-        pool = out[POOL_KEY]
-        out[META_KEY] = {
-            "current_profile": None,
-            "base_profile": None,
-        }
-        for i, conf in enumerate(configs):
-            lder = loader[i]
+    @classmethod
+    async def a_load(
+        cls,
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        base: str = "default",
+        allow_missing_base: bool = False,
+        concurrency: int | None = 16,
+        index: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        validate: Schema | None = None,
+        container: Container = Diot,
+    ) -> Diot:
+        """Asynchronously load the configuration from the files, or other
+        configurations
 
-            if lder is None and hasattr(conf, "read"):
-                raise ValueError("'loader' must be specified for stream")
+        The configurations are fetched and parsed concurrently, and then
+        merged in the order they are given.
 
-            if lder is None:
-                ext = config_to_ext(conf)
-                ext = detect_loader_directive(conf, ext)
-                lder = get_loader(ext)
-            else:
-                lder = get_loader(lder)
+        Args:
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same profile and keys recursively.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            base: The default profile to use after loading
+            allow_missing_base: Whether to allow missing base profile
+                If False, will raise errors when the base profile is not found
+                in the loaded profiles.
+            concurrency: The maximum number of configurations to load at
+                the same time. None or 0 for no limit.
+            index: Whether to build a flattened index by dotted paths,
+                available by `Config.index(conf)`. It is rebuilt when the
+                profile is switched by `use_profile()`.
+            only: The dotted paths of the subtrees to load under each
+                profile, e.g. `["database", "cache.redis"]`. Other subtrees
+                are pruned right after parsing, before the values are casted
+                and the profiles are merged. None to load all.
+            schema: A mapping of the keys (or dotted paths) to the types, or
+                a dataclass or TypedDict class, to convert the string values
+                under each profile by, instead of casting them by the
+                prefixes. See `simpleconf.schema`.
+            validate: A dataclass or TypedDict class, or a JSON Schema, to
+                validate the configuration of each profile (merged with the
+                base profile) against. See `simpleconf.validation`.
+            container: The type of the mappings to build the configuration
+                into, `Diot`, `dict`, `types.MappingProxyType`, or a factory
+                that takes a dict. The configurations of the profiles are
+                loaded into dicts and merged, and then built into the
+                container directly.
+                It must be mutable to switch the profiles in place.
+                See `simpleconf.container`.
 
-            loaded = lder.load_with_profiles(conf, ignore_nonexist)
-            for profile, value in loaded.items():
-                profile = profile.lower()
-                pool.setdefault(profile, Diot())
-                pool[profile].update_recursively(value)
+        Returns:
+            The loaded configurations in the container
+        """
+        loader = _normalize_loaders(configs, loader)
 
-        if base and base not in pool and not allow_missing_base:
-            raise ValueError(f"Base profile '{base}' not found")
+        _check_container(container, index, False)
 
-        if base and base in pool:
-            out = ProfileConfig.use_profile(out, base, base=base)
+        if validate is not None:
+            from .validation import compile_validator
 
+            # converted by the loaders on the way of casting, and checked
+            # after the configurations are merged
+            schema = compile_validator(validate, schema, lenient=True)
+        # the profiles in dicts to merge for the containers other than Diot
+        layer_container = Diot if container is Diot else dict
+        funcs = [
+            partial(
+                _a_load_with_profiles,
+                conf,
+                loader[i],
+                ignore_nonexist,
+                only,
+                schema,
+                layer_container,
+            )
+            for i, conf in enumerate(configs)
+        ]
+        pool = _merge_profiles(await gather_limited(funcs, concurrency), container)
+        if validate is not None:
+            from .validation import validate_profiles
+
+            validate_profiles(pool, base, validate)
+        out = _profile_config(pool, base, allow_missing_base, container)
+        if index:
+            _attach_index(out)
         return out
 
     @classmethod
-    async def a_load(
+    def load_as(
         cls,
+        type_: Type[T],
         *configs: Any,
+        profile: str | None = None,
         loader: LoaderType | Sequence[LoaderType] = None,
         ignore_nonexist: bool = False,
         base: str = "default",
         allow_missing_base: bool = False,
-    ) -> Diot:
-        """Asynchronously load the configuration from the files, or other
-        configurations
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+    ) -> T:
+        """Load the configuration of a profile from the files, or other
+        configurations, as an instance of a dataclass or a namedtuple
+
+        The instance is built directly from the configurations of the
+        profile and the base profile, without merging them into the pool.
+        See `Config.load_as()`.
 
         Args:
+            type_: The dataclass or namedtuple class
             *configs: The configuration files or other configurations to load
                 Latter ones will override the former ones for items with the
                 same profile and keys recursively.
+            profile: The profile to build. None for the base profile.
             loader: The loader to use. If a list is given, it must have the
                 same length as configs.
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
-            base: The default profile to use after loading
+            base: The base profile
             allow_missing_base: Whether to allow missing base profile
                 If False, will raise errors when the base profile is not found
                 in the loaded profiles.
+            parallel: Whether to load the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+            executor: An executor to load the configurations with.
+                Implies `parallel`.
 
         Returns:
-            A Diot object with the loaded configurations
+            The instance of the class
+
+        Raises:
+            NoSuchProfile: If the profile is not found
+            ValidationError: If any required field is missing
         """
-        if not isinstance(loader, Sequence) or isinstance(loader, str):
-            loader = [loader] * len(configs)
+        from .typed import field_paths
 
-        if len(loader) != len(configs):
-            raise ValueError(
-                f"Length of loader ({len(loader)}) does not match "
-                f"length of configs ({len(configs)})"
+        loader = _normalize_loaders(configs, loader)
+
+        only = field_paths(type_)
+        funcs = [
+            partial(
+                _load_with_profiles,
+                conf,
+                loader[i],
+                ignore_nonexist,
+                only,
+                type_,
+                dict,
             )
+            for i, conf in enumerate(configs)
+        ]
+        return _build_profile(
+            type_,
+            run_parallel(funcs, parallel, executor),
+            profile,
+            base,
+            allow_missing_base,
+        )
 
-        out = Diot({POOL_KEY: Diot()})
-        pool = out[POOL_KEY]
-        out[META_KEY] = {
-            "current_profile": None,
-            "base_profile": None,
-        }
-        for i, conf in enumerate(configs):
-            lder = loader[i]
+    @classmethod
+    async def a_load_as(
+        cls,
+        type_: Type[T],
+        *configs: Any,
+        profile: str | None = None,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        base: str = "default",
+        allow_missing_base: bool = False,
+        concurrency: int | None = 16,
+    ) -> T:
+        """Asynchronously load the configuration of a profile from the
+        files, or other configurations, as an instance of a dataclass or a
+        namedtuple
 
-            if lder is None and hasattr(conf, "read"):
-                raise ValueError("'loader' must be specified for stream")
+        See `load_as()` for details.
 
-            if lder is None:
-                ext = config_to_ext(conf)
-                ext = detect_loader_directive(conf, ext)
-                lder = get_loader(ext)
-            else:
-                lder = get_loader(lder)
+        Args:
+            type_: The dataclass or namedtuple class
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same profile and keys recursively.
+            profile: The profile to build. None for the base profile.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            base: The base profile
+            allow_missing_base: Whether to allow missing base profile
+                If False, will raise errors when the base profile is not found
+                in the loaded profiles.
+            concurrency: The maximum number of configurations to load at
+                the same time. None or 0 for no limit.
 
-            loaded = await lder.a_load_with_profiles(conf, ignore_nonexist)
-            for profile, value in loaded.items():
-                profile = profile.lower()
-                pool.setdefault(profile, Diot())
-                pool[profile].update_recursively(value)
+        Returns:
+            The instance of the class
+        """
+        from .typed import field_paths
 
-        if base and base not in pool and not allow_missing_base:
-            raise ValueError(f"Base profile '{base}' not found")
+        loader = _normalize_loaders(configs, loader)
 
-        if base and base in pool:
-            out = ProfileConfig.use_profile(out, base, base=base)
+        only = field_paths(type_)
+        funcs = [
+            partial(
+                _a_load_with_profiles,
+                conf,
+                loader[i],
+                ignore_nonexist,
+                only,
+                type_,
+                dict,
+            )
+            for i, conf in enumerate(configs)
+        ]
+        return _build_profile(
+            type_,
+            await gather_limited(funcs, concurrency),
+            profile,
+            base,
+            allow_missing_base,
+        )
 
-        return out
+    @classmethod
+    def watch(
+        cls,
+        *configs: Any,
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        base: str = "default",
+        allow_missing_base: bool = False,
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+    ) -> ConfigHandle:
+        """Load the configuration with profiles into a handle that can be
+        reloaded
+
+        `handle.config` is the loaded configuration, the same as by
+        `ProfileConfig.load()`. `handle.reload()` parses only the sources
+        that changed since the last load, keeps the profile switched to,
+        and returns the changed keys, prefixed with the profile names.
+
+        Args:
+            *configs: The configuration files or other configurations to load
+                Latter ones will override the former ones for items with the
+                same profile and keys recursively.
+            loader: The loader to use. If a list is given, it must have the
+                same length as configs.
+            ignore_nonexist: Whether to ignore non-existent files
+                Otherwise, will raise errors
+            base: The default profile to use after loading
+            allow_missing_base: Whether to allow missing base profile
+                If False, will raise errors when the base profile is not found
+                in the loaded profiles.
+            parallel: Whether to parse the configurations on a thread pool.
+                An integer is used as the maximum number of threads.
+            executor: An executor to parse the configurations with.
+                Implies `parallel`.
+
+        Returns:
+            The ConfigHandle object
+        """
+        from .handle import ConfigHandle
+
+        return ConfigHandle(
+            configs,
+            loader=loader,
+            ignore_nonexist=ignore_nonexist,
+            profiles=True,
+            base=base,
+            allow_missing_base=allow_missing_base,
+            parallel=parallel,
+            executor=executor,
+        )
 
     @classmethod
     def load_one(
@@ -301,7 +1257,10 @@ class ProfileConfig:
         ignore_nonexist: bool = False,
         base: str = "default",
         allow_missing_base: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Load the configuration from the file
 
         Args:
@@ -310,41 +1269,23 @@ class ProfileConfig:
             ignore_nonexist: Whether to ignore non-existent files
                 Otherwise, will raise errors
             base: The default profile to use after loading
+            only: The dotted paths of the subtrees to load under each
+                profile. None to load all.
+            schema: The schema to convert the string values under each
+                profile by. See `simpleconf.schema`.
+            container: The type of the mappings to build the configuration
+                into. See `simpleconf.container`.
 
         Returns:
-            A Diot object with the loaded configuration
+            The loaded configuration in the container
         """
 
-        out = Diot({POOL_KEY: Diot()})
-        pool = out[POOL_KEY]
-        out[META_KEY] = {
-            "current_profile": None,
-            "base_profile": None,
-        }
-
-        if loader is None:
-            if hasattr(conf, "read"):
-                raise ValueError("'loader' must be specified for stream")
-
-            ext = config_to_ext(conf)
-            ext = detect_loader_directive(conf, ext)
-            loader = get_loader(ext)
-        else:
-            loader = get_loader(loader)
-
-        loaded = loader.load_with_profiles(conf, ignore_nonexist)
-        for profile, value in loaded.items():
-            profile = profile.lower()
-            pool.setdefault(profile, Diot())
-            pool[profile].update_recursively(value)
-
-        if base and base not in pool and not allow_missing_base:
-            raise ValueError(f"Base profile '{base}' not found")
-
-        if base and base in pool:
-            out = ProfileConfig.use_profile(out, base, base=base)
-
-        return out
+        layer_container = Diot if container is Diot else dict
+        loaded = _load_with_profiles(
+            conf, loader, ignore_nonexist, only, schema, layer_container
+        )
+        pool = _merge_profiles([loaded], container)
+        return _profile_config(pool, base, allow_missing_base, container)
 
     @classmethod
     async def a_load_one(
@@ -354,7 +1295,10 @@ class ProfileConfig:
         ignore_nonexist: bool = False,
         base: str = "default",
         allow_missing_base: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Asynchronously load the configuration from the file
 
         Args:
@@ -366,41 +1310,23 @@ class ProfileConfig:
             allow_missing_base: Whether to allow missing base profile
                 If False, will raise errors when the base profile is not found
                 in the loaded profiles.
+            only: The dotted paths of the subtrees to load under each
+                profile. None to load all.
+            schema: The schema to convert the string values under each
+                profile by. See `simpleconf.schema`.
+            container: The type of the mappings to build the configuration
+                into. See `simpleconf.container`.
 
         Returns:
-            A Diot object with the loaded configuration
+            The loaded configuration in the container
         """
 
-        out = Diot({POOL_KEY: Diot()})
-        pool = out[POOL_KEY]
-        out[META_KEY] = {
-            "current_profile": None,
-            "base_profile": None,
-        }
-
-        if loader is None:
-            if hasattr(conf, "read"):
-                raise ValueError("'loader' must be specified for stream")
-
-            ext = config_to_ext(conf)
-            ext = detect_loader_directive(conf, ext)
-            loader = get_loader(ext)
-        else:
-            loader = get_loader(loader)
-
-        loaded = await loader.a_load_with_profiles(conf, ignore_nonexist)
-        for profile, value in loaded.items():
-            profile = profile.lower()
-            pool.setdefault(profile, Diot())
-            pool[profile].update_recursively(value)
-
-        if base and base not in pool and not allow_missing_base:
-            raise ValueError(f"Base profile '{base}' not found")
-
-        if base and base in pool:
-            out = ProfileConfig.use_profile(out, base, base=base)
-
-        return out
+        layer_container = Diot if container is Diot else dict
+        loaded = await _a_load_with_profiles(
+            conf, loader, ignore_nonexist, only, schema, layer_container
+        )
+        pool = _merge_profiles([loaded], container)
+        return _profile_config(pool, base, allow_missing_base, container)
 
     @staticmethod
     def use_profile(
@@ -428,18 +1354,30 @@ class ProfileConfig:
         Returns:
             The configuration object with the switched profile if copy is True
             Otherwise None (updated in-place)
+
+        Raises:
+            TypeError: If the container of the configuration object is not
+                mutable and copy is False
         """
         pool = conf[POOL_KEY]
         if base and base not in pool and not allow_missing_base:
             raise ValueError(f"Base profile '{base}' not found")
 
+        layers = [pool[profile]]
+        if base is not None and base != profile and base in pool:
+            layers.insert(0, pool[base])
+
+        if not isinstance(conf, Diot):
+            return _use_profile_container(conf, profile, base, layers, copy)
+
+        merged = merge_layers(layers, copy=True)
         if copy:
             out = Diot({POOL_KEY: pool, META_KEY: conf[META_KEY].copy()})
-            if base is not None and base != profile:
-                out.update_recursively(pool.get(base, {}))
             out[META_KEY]["current_profile"] = profile
             out[META_KEY]["base_profile"] = base
-            out.update_recursively(pool[profile])
+            out.update(merged)
+            if INDEX_ATTR in conf.__dict__:
+                _attach_index(out)
             return out
 
         # copy = False
@@ -448,11 +1386,11 @@ class ProfileConfig:
                 continue
             del conf[key]
 
-        if base is not None and base != profile:
-            conf.update_recursively(pool.get(base, {}))
-        conf.update_recursively(pool[profile])
+        conf.update(merged)
         conf[META_KEY]["current_profile"] = profile
         conf[META_KEY]["base_profile"] = base
+        if INDEX_ATTR in conf.__dict__:
+            conf.__dict__[INDEX_ATTR].rebuild()
 
         return conf
 
@@ -478,6 +1416,16 @@ class ProfileConfig:
         Returns:
             The configurations with the current profile
         """
+        if not isinstance(conf, Diot):
+            container = _meta_container(conf)
+            return container(
+                {
+                    key: val
+                    for key, val in conf.items()
+                    if key not in (POOL_KEY, META_KEY)
+                }
+            )
+
         out = Diot()
         for key in conf:
             if key in (POOL_KEY, META_KEY):
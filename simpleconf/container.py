@@ -0,0 +1,143 @@
+"""Containers of the loaded configurations
+
+The configurations are loaded into Diot objects by default. Another type of
+mappings can be chosen by `container`::
+
+    from types import MappingProxyType
+    from simpleconf import Config
+
+    conf = Config.load("config.toml", "config.env", container=dict)
+    conf = Config.load("config.toml", container=MappingProxyType)
+
+The loaders parse the configurations into plain dicts, which are merged
+as they are, and then built into the container only once:
+
+- `Diot`: the dicts are converted into Diot objects, as before
+- `dict`: the dicts are returned as they are, with no conversions at all
+- Others (e.g. `types.MappingProxyType`, or any factory that takes a dict):
+  called with each dict, including the ones in the lists, from the innermost
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Sequence
+
+from diot import Diot
+
+# Builds the mapping from a dict, e.g. Diot, dict or MappingProxyType
+Container = Callable[[Dict[str, Any]], Mapping]
+# The types walked into by _wrap()
+_NESTED = (dict, list)
+
+
+def _wrap(value: Any, container: Container) -> Any:
+    """Build the dicts in the value into the container, recursively
+
+    Only the plain dicts and lists are walked, so that the values already
+    built (e.g. shared with the other configurations) are kept.
+    """
+    tp = type(value)
+    if tp is dict:
+        return container(
+            {
+                key: _wrap(val, container) if type(val) in _NESTED else val
+                for key, val in value.items()
+            }
+        )
+    if tp is list:
+        return [
+            _wrap(val, container) if type(val) in _NESTED else val for val in value
+        ]
+    return value
+
+
+def to_plain(value: Any) -> Any:
+    """Copy the mappings (e.g. Diot objects) and lists in the value into
+    new dicts and lists, recursively
+
+    For the configurations given by the callers, which are not to be
+    modified when the configurations are merged.
+    """
+    if isinstance(value, Mapping):
+        return {
+            key: to_plain(val) if isinstance(val, (Mapping, list)) else val
+            for key, val in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            to_plain(val) if isinstance(val, (Mapping, list)) else val
+            for val in value
+        ]
+    return value
+
+
+def to_container(
+    data: Mapping[str, Any],
+    container: Container,
+    copy: bool = False,
+) -> Any:
+    """Build the loaded configuration into the container
+
+    Args:
+        data: The loaded configuration, with plain dicts
+        container: The container, Diot, dict or another factory
+        copy: Whether the data is shared (e.g. cached) and must not be
+            handed out. The containers other than dict are always built
+            anew, and the dicts and lists are copied for dict.
+
+    Returns:
+        The configuration in the container
+    """
+    if container is Diot:
+        return data if isinstance(data, Diot) else Diot(data)
+    if isinstance(data, Diot):
+        # e.g. by the custom loaders
+        data = data.to_dict()
+    if container is dict:
+        return _wrap(data, dict) if copy else data
+    return _wrap(data, container)
+
+
+def _merge(layers: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Merge the mappings into a new dict recursively, in one pass"""
+    grouped: Dict[Any, List[Any]] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            try:
+                grouped[key].append(value)
+            except KeyError:
+                grouped[key] = [value]
+
+    out = {}
+    for key, values in grouped.items():
+        last = values[-1]
+        if len(values) == 1 or not isinstance(last, Mapping):
+            out[key] = last
+            continue
+
+        # a value that is not a mapping replaces the former ones,
+        # and the mappings after it are merged recursively
+        start = len(values) - 1
+        while start > 0 and isinstance(values[start - 1], Mapping):
+            start -= 1
+        out[key] = last if start == len(values) - 1 else _merge(values[start:])
+    return out
+
+
+def merge_dicts(layers: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Merge the layers of configurations into a dict in one pass
+
+    The same as `merge_layers()` with `copy=True`, but with dicts instead
+    of Diot objects for the merged subtrees. The layers are not changed,
+    and the subtrees that are not overridden are shared with them.
+
+    Args:
+        layers: The layers to merge. Latter ones override the former ones
+            for items with the same keys recursively.
+
+    Returns:
+        The merged configuration
+    """
+    if len(layers) == 1:
+        return dict(layers[0])
+    return _merge(layers)
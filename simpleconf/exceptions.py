@@ -4,3 +4,21 @@ class FormatNotSupported(Exception):
 
 class NoSuchProfile(Exception):
     """Raises when configuration profile does not exist"""
+
+
+class ValidationError(ValueError):
+    """Raised when the configuration does not match the schema to validate
+
+    Args:
+        path: The keys (or the indexes of the lists) to the value
+        message: What is wrong with the value
+    """
+
+    def __init__(self, path: tuple, message: str) -> None:
+        super().__init__(path, message)
+        self.path = path
+        self.message = message
+
+    def __str__(self) -> str:
+        where = ".".join(str(key) for key in self.path) or "<root>"
+        return f"{where}: {self.message}"
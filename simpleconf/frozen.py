@@ -0,0 +1,157 @@
+"""Immutable configurations that are safe to share across threads
+
+`freeze()` converts a loaded configuration into a tree of FrozenConfig
+objects, with lists converted into tuples and sets into frozensets::
+
+    from simpleconf import Config
+    from simpleconf.frozen import freeze
+
+    conf = freeze(Config.load('config.toml'))
+    # or
+    conf = Config.load('config.toml', frozen=True)
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from keyword import iskeyword
+from typing import Any, Dict, Iterator
+
+_object_getattr = object.__getattribute__
+
+
+def _attr_name(key: Any) -> str | None:
+    """Get the attribute name of a key that is not a valid identifier,
+    transformed the same way as Diot does, or None if it is valid"""
+    if isinstance(key, str) and key.isidentifier() and not iskeyword(key):
+        return None
+
+    from diot.transforms import safe_transform
+
+    return safe_transform(key)
+
+
+class FrozenConfig(Mapping):
+    """An immutable and hashable mapping with attribute access
+
+    The values are frozen recursively when it is created. Frozen values,
+    including FrozenConfig objects, are shared rather than copied.
+
+    Args:
+        data: The mapping to freeze
+    """
+
+    __slots__ = ("_data", "_attrs", "_hash")
+
+    def __init__(self, data: Mapping[str, Any] | None = None) -> None:
+        frozen = {key: freeze(value) for key, value in (data or {}).items()}
+        attrs: Dict[str, Any] | None = None
+        for key in frozen:
+            name = _attr_name(key)
+            if name is not None and name != key:
+                if attrs is None:
+                    attrs = {}
+                attrs.setdefault(name, key)
+
+        object.__setattr__(self, "_data", frozen)
+        object.__setattr__(self, "_attrs", attrs)
+        object.__setattr__(self, "_hash", None)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._data[key]
+
+    def __getattribute__(self, name: str) -> Any:
+        # Looking up the keys first is much faster than falling back to
+        # __getattr__ after the normal lookup fails
+        if name in _CLASS_ATTRS:
+            return _object_getattr(self, name)
+        data = _object_getattr(self, "_data")
+        try:
+            return data[name]
+        except KeyError:
+            pass
+        attrs = _object_getattr(self, "_attrs")
+        if attrs is not None and name in attrs:
+            return data[attrs[name]]
+        raise AttributeError(
+            f"{self.__class__.__name__} object has no attribute {name!r}"
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise TypeError(f"{self.__class__.__name__} object is immutable")
+
+    __delattr__ = __setattr__  # type: ignore[assignment]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if not isinstance(other, FrozenConfig):
+            # lists in other are compared as tuples
+            other = FrozenConfig(other)
+        return self._data == other._data  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(frozenset(self._data.items())))
+        return self._hash  # type: ignore[return-value]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+    def __reduce__(self) -> Any:
+        return (self.__class__, (self._data,))
+
+    def __copy__(self) -> FrozenConfig:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> FrozenConfig:
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert it into a plain dict recursively, with tuples converted
+        back into lists"""
+        return {key: _thaw(value) for key, value in self._data.items()}
+
+
+# The attributes that are not looked up from the keys, including the methods
+_CLASS_ATTRS = frozenset(dir(FrozenConfig))
+
+
+def _thaw(value: Any) -> Any:
+    """Convert the frozen value back into plain dicts and lists"""
+    if isinstance(value, FrozenConfig):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_thaw(val) for val in value]
+    return value
+
+
+def freeze(value: Any) -> Any:
+    """Freeze the value recursively
+
+    Dicts are converted into FrozenConfig objects, lists and tuples into
+    tuples and sets into frozensets. Other values are kept as they are.
+
+    Args:
+        value: The value to freeze, e.g. a loaded configuration
+
+    Returns:
+        The frozen value
+    """
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, dict):
+        return FrozenConfig(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(val) for val in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(val) for val in value)
+    return value
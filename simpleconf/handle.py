@@ -0,0 +1,265 @@
+"""Reloadable handles of loaded configurations
+
+A handle is created by `Config.watch()` or `ProfileConfig.watch()`. It keeps
+the parsed layer and the stat signature of each source, so that `reload()`
+only parses the sources that changed, and only merges again the top-level
+keys (profiles for `ProfileConfig.watch()`) that the changed sources have.
+"""
+from __future__ import annotations
+
+import os
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+from diot import Diot
+
+from .utils import (
+    config_to_ext,
+    merge_layers,
+    run_parallel,
+    _normalize_loaders,
+    POOL_KEY,
+    META_KEY,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
+    from .config import LoaderType
+
+# The sources that are parsed only once
+_STATIC = "static"
+# The sources that are parsed on every reload, and compared with the
+# previous layer, as they can't be checked by stat
+_VOLATILE = "volatile"
+# The local files, parsed again when their stat signatures change
+_FILE = "file"
+
+_MISSING = object()
+
+
+def _source_kind(conf: Any) -> str:
+    """Get how the changes of the source are detected"""
+    if not isinstance(conf, (str, os.PathLike)):
+        # dicts and streams
+        return _STATIC
+    if "://" in str(conf) or config_to_ext(conf) == "osenv":
+        return _VOLATILE
+    return _FILE
+
+
+def _stat_signature(conf: Any) -> Tuple[int, int, int] | None:
+    """Get the stat signature of a local file, None if it does not exist"""
+    try:
+        stat = os.stat(conf)
+    except (OSError, ValueError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _diff(old: Any, new: Any, path: str, changed: List[str]) -> None:
+    """Collect the dotted paths of the keys that are different"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in {**old, **new}:
+            subpath = f"{path}.{key}" if path else str(key)
+            oldval = old.get(key, _MISSING)
+            newval = new.get(key, _MISSING)
+            if oldval is _MISSING or newval is _MISSING:
+                changed.append(subpath)
+            elif oldval is not newval:
+                _diff(oldval, newval, subpath, changed)
+    elif old != new:
+        changed.append(path)
+
+
+class ConfigHandle:
+    """A reloadable configuration
+
+    The configuration is available at `handle.config`. It is replaced by a
+    new object when `reload()` finds changes, and the unchanged top-level
+    keys are shared between the old and the new objects, so the
+    configuration should be treated as read-only.
+
+    The sources are checked as follows on `reload()`:
+
+    - local files are parsed again when their stat signatures
+      (mtime_ns, size, inode) change, including when they are created or
+      removed (with `ignore_nonexist`)
+    - system environment variables (`<prefix>_osenv`) and remote files
+      (e.g. `s3://...`) are parsed again and compared with the previous
+      results
+    - dicts and streams are only parsed once
+
+    Args:
+        configs: The configuration files or other configurations to load
+        loader: The loader to use. If a list is given, it must have the
+            same length as configs.
+        ignore_nonexist: Whether to ignore non-existent files
+        profiles: Whether to load the configurations with profiles,
+            like `ProfileConfig.load()`
+        base: The base profile, with `profiles`
+        allow_missing_base: Whether to allow missing base profile,
+            with `profiles`
+        parallel: Whether to parse the changed sources on a thread pool.
+            An integer is used as the maximum number of threads.
+        executor: An executor to parse the changed sources with.
+            Implies `parallel`.
+    """
+
+    def __init__(
+        self,
+        configs: Sequence[Any],
+        loader: LoaderType | Sequence[LoaderType] = None,
+        ignore_nonexist: bool = False,
+        profiles: bool = False,
+        base: str = "default",
+        allow_missing_base: bool = False,
+        parallel: bool | int = False,
+        executor: Executor | None = None,
+    ) -> None:
+        loader = _normalize_loaders(configs, loader)
+
+        self.configs = list(configs)
+        self.loaders = list(loader)
+        self.ignore_nonexist = ignore_nonexist
+        self.profiles = profiles
+        self.base = base
+        self.allow_missing_base = allow_missing_base
+        self.parallel = parallel
+        self.executor = executor
+
+        self._kinds = [_source_kind(conf) for conf in self.configs]
+        self._signatures: List[Any] = [None] * len(self.configs)
+        self._layers: List[Dict[str, Any] | None] = [None] * len(self.configs)
+        self._merged = Diot()
+        self.config = Diot()
+        self.reload(force=True)
+
+    def _parse(self, i: int) -> Diot:
+        """Parse the i-th source into a layer"""
+        from .config import Config, _load_with_profiles, _merge_profiles
+
+        conf = self.configs[i]
+        if not self.profiles:
+            return Config.load_one(conf, self.loaders[i], self.ignore_nonexist)
+
+        loaded = _load_with_profiles(conf, self.loaders[i], self.ignore_nonexist)
+        return _merge_profiles([loaded])
+
+    def _stale(self, force: bool) -> List[Tuple[int, Any]]:
+        """Get the indexes of the sources to parse, with their new signatures
+
+        The signatures are taken before parsing, so that a change while
+        parsing is picked up by the next reload.
+        """
+        stale = []
+        for i, kind in enumerate(self._kinds):
+            signature = _stat_signature(self.configs[i]) if kind == _FILE else None
+            if (
+                force
+                or kind == _VOLATILE
+                or (kind == _FILE and signature != self._signatures[i])
+            ):
+                stale.append((i, signature))
+        return stale
+
+    def _merge(self, layers: List[Any], keys: set) -> Diot:
+        """Merge the layers, only for the given top-level keys. The values of
+        the other keys are taken from the previously merged configuration.
+        """
+        fresh = merge_layers(
+            [{key: layer[key] for key in keys if key in layer} for layer in layers],
+            copy=True,
+        )
+        merged = Diot()
+        for layer in layers:
+            for key in layer:  # type: ignore[union-attr]
+                if key not in merged:
+                    merged[key] = fresh[key] if key in keys else self._merged[key]
+        return merged
+
+    def _build(self, merged: Diot) -> Diot:
+        """Build the configuration object from the merged configuration"""
+        if not self.profiles:
+            return merged
+
+        from .config import ProfileConfig
+
+        out = Diot({POOL_KEY: merged})
+        out[META_KEY] = {"current_profile": None, "base_profile": None}
+        base = self.base
+        if base and base not in merged and not self.allow_missing_base:
+            raise ValueError(f"Base profile '{base}' not found")
+
+        # keep the profile switched to
+        profile = self.config.get(META_KEY, {}).get("current_profile")
+        if profile is not None and profile in merged:
+            base = self.config[META_KEY]["base_profile"]
+            return ProfileConfig.use_profile(
+                out,
+                profile,
+                base=base,
+                allow_missing_base=True,
+            )
+
+        if base and base in merged:
+            out = ProfileConfig.use_profile(out, base, base=base)
+        return out
+
+    def reload(self, force: bool = False) -> List[str]:
+        """Reload the configuration, parsing only the changed sources
+
+        When any of the sources fails to parse, the error is raised and the
+        configuration is kept unchanged, so the next reload tries again.
+
+        Args:
+            force: Parse all the sources, even if they are not changed
+
+        Returns:
+            The dotted paths of the keys that are changed, added or removed,
+            sorted. With profiles, the paths start with the profile names.
+        """
+        stale = self._stale(force)
+        if not stale:
+            return []
+
+        parsed = run_parallel(
+            [partial(self._parse, i) for i, _ in stale],
+            self.parallel,
+            self.executor,
+        )
+
+        layers = list(self._layers)
+        keys: set = set()
+        for (i, _), layer in zip(stale, parsed):
+            old = layers[i]
+            if old is not None and old == layer:
+                continue
+            keys.update(layer)
+            keys.update(old or ())
+            layers[i] = layer
+
+        signatures = list(self._signatures)
+        for i, signature in stale:
+            signatures[i] = signature
+
+        if not keys:
+            self._signatures = signatures
+            return []
+
+        merged = self._merge(layers, keys)
+        config = self._build(merged)
+
+        changed: List[str] = []
+        for key in keys:
+            _diff(
+                self._merged.get(key, _MISSING),
+                merged.get(key, _MISSING),
+                str(key),
+                changed,
+            )
+
+        self._layers = layers
+        self._signatures = signatures
+        self._merged = merged
+        self.config = config
+        return sorted(changed)
@@ -0,0 +1,117 @@
+"""Flattened index of the configurations by dotted paths
+
+    from simpleconf import Config
+
+    conf = Config.load('config.toml', index=True)
+    index = Config.index(conf)
+    index["db.host"]  # the same as conf.db.host
+    list(index.prefix("db"))  # [("db.host", ...), ("db.port", ...)]
+
+The index is a snapshot of the configuration. It is rebuilt by
+`ProfileConfig.use_profile()`, but other changes to the configuration
+require `index.rebuild()`.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .utils import POOL_KEY, META_KEY
+
+
+def _flatten(
+    conf: Mapping,
+    prefix: str,
+    flat: Dict[str, Any],
+    leaves: List[str],
+) -> None:
+    """Flatten the configuration into dotted paths"""
+    for key, value in conf.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, Mapping) and value:
+            _flatten(value, f"{path}.", flat, leaves)
+        else:
+            leaves.append(path)
+
+
+class ConfigIndex(Mapping):
+    """A flattened index of a configuration by dotted paths
+
+    All the nodes, including the subtrees, can be looked up by their paths
+    in O(1), and the leaves can be iterated in sorted order by prefix.
+    Keys containing dots are not distinguished from nested keys.
+
+    Args:
+        conf: The configuration to index. The pool and the meta information
+            of the configurations with profiles are not indexed.
+    """
+
+    def __init__(self, conf: Mapping[str, Any]) -> None:
+        self.conf = conf
+        self._flat: Dict[str, Any] = {}
+        self._leaves: List[str] = []
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Rebuild the index, after the configuration is changed"""
+        flat: Dict[str, Any] = {}
+        leaves: List[str] = []
+        _flatten(
+            {
+                key: value
+                for key, value in self.conf.items()
+                if key not in (POOL_KEY, META_KEY)
+            },
+            "",
+            flat,
+            leaves,
+        )
+        leaves.sort()
+        self._flat = flat
+        self._leaves = leaves
+
+    def __getitem__(self, path: str) -> Any:
+        return self._flat[path]
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._flat
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._flat)
+
+    def __len__(self) -> int:
+        return len(self._flat)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} ({len(self._flat)} paths)>"
+
+    def prefix(self, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+        """Iterate over the leaves under the prefix, in sorted order
+
+        Args:
+            prefix: The dotted path of the subtree, e.g. `db` for `db.*`.
+                Empty to iterate over all the leaves.
+
+        Yields:
+            The dotted paths and the values of the leaves
+        """
+        leaves = self._leaves
+        if not prefix:
+            for path in leaves:
+                yield path, self._flat[path]
+            return
+
+        value = self._flat.get(prefix)
+        if prefix in self._flat and not (isinstance(value, Mapping) and value):
+            # the prefix itself is a leaf
+            yield prefix, value
+            return
+
+        start = f"{prefix}."
+        # "/" is the character right after "."
+        end = f"{prefix}/"
+        for i in range(bisect_left(leaves, start), bisect_left(leaves, end)):
+            path = leaves[i]
+            yield path, self._flat[path]
@@ -1,12 +1,254 @@
 from __future__ import annotations
 
+import os
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Dict
-from pathlib import Path
+from os import PathLike
+from typing import TYPE_CHECKING, Any, Callable, List, Dict, Sequence, Tuple
 
 from diot import Diot
-from panpath import PanPath
 from ..caster import cast
+from ..cache import bytecode_cache, disk_cache, load_cache, template_cache
+from ..container import Container, to_container
+from ..projection import ANY, Projection, projection_kind, projection_tree, prune
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+    from ..schema import CompiledSchema, Schema
+
+# Local files of at least this size (in bytes) are not preloaded. The json
+# and yaml loaders load them in the large-file mode.
+LARGE_FILE_SIZE = 64 * 1024 * 1024
+
+
+class LocalFile:
+    """A local configuration file
+
+    It is accessed with `os.stat()` and `open()` directly, which is much
+    cheaper than going through PanPath. The asynchronous methods do the
+    same on a thread (`asyncio.to_thread()`), not to block the event loop.
+
+    Args:
+        path: The path of the file
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: str | PathLike) -> None:
+        self.path = os.fspath(path)
+
+    def __fspath__(self) -> str:
+        return self.path  # type: ignore[return-value]
+
+    __str__ = __fspath__
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    @property
+    def name(self) -> str:
+        """The name of the file"""
+        return os.path.basename(self.path)  # type: ignore[arg-type]
+
+    def exists(self) -> bool:
+        try:
+            os.stat(self.path)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    async def a_exists(self) -> bool:
+        from asyncio import to_thread
+
+        return await to_thread(self.exists)
+
+    def is_large(self) -> bool:
+        """Whether the file is large enough to be loaded in the large-file
+        mode, see `LARGE_FILE_SIZE`"""
+        try:
+            return os.stat(self.path).st_size >= LARGE_FILE_SIZE
+        except (OSError, ValueError):
+            return False
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    async def a_read_bytes(self) -> bytes:
+        from asyncio import to_thread
+
+        return await to_thread(self.read_bytes)
+
+    def read_signed(self) -> Tuple[bytes, Tuple[int, int, int]]:
+        """Read the content, with the stat signature (mtime_ns, size, inode)
+        of the file taken from the same handle right before reading
+
+        If the file is modified after it is stat'ed, the signature changes,
+        so that the content is never cached under a newer signature.
+        """
+        with open(self.path, "rb") as fh:
+            stat = os.fstat(fh.fileno())
+            content = fh.read()
+        return content, (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def read_text(self) -> str:
+        with open(self.path, encoding="utf-8") as fh:
+            return fh.read()
+
+    async def a_read_text(self) -> str:
+        from asyncio import to_thread
+
+        return await to_thread(self.read_text)
+
+
+class PreloadedPath:
+    """A configuration file with its content already read
+
+    It is passed to the loaders in place of the path, so that the file is
+    read only once, even when its first line is checked for the loader
+    directive.
+
+    Args:
+        path: The path of the file
+        content: The content of the file
+        signature: The stat signature (mtime_ns, size, inode) of the file
+            when the content was read, to cache the loaded configuration
+            with. None if it is not a local file.
+    """
+
+    __slots__ = ("path", "content", "signature")
+
+    def __init__(
+        self,
+        path: LocalFile | Path,
+        content: bytes,
+        signature: Tuple[int, int, int] | None = None,
+    ) -> None:
+        self.path = path
+        self.content = content
+        self.signature = signature
+
+    def __fspath__(self) -> str:
+        return str(self.path)
+
+    __str__ = __fspath__
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self.path)!r})"
+
+    @property
+    def name(self) -> str:
+        """The name of the file"""
+        return self.path.name
+
+    def first_line(self) -> str:
+        """Get the first line of the content, without reading the rest"""
+        end = self.content.find(b"\n")
+        head = self.content if end == -1 else self.content[:end]
+        return head.decode(errors="replace")
+
+    def exists(self) -> bool:
+        return True
+
+    async def a_exists(self) -> bool:
+        return True
+
+    def read_bytes(self) -> bytes:
+        return self.content
+
+    async def a_read_bytes(self) -> bytes:
+        return self.content
+
+    def read_text(self) -> str:
+        """Decode the content, with universal newlines like `Path.read_text`"""
+        text = self.content.decode()
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    async def a_read_text(self) -> str:
+        return self.read_text()
+
+
+def _is_path(conf: Any) -> bool:
+    """Check if the configuration is a path (not read yet)"""
+    return isinstance(conf, (str, PathLike)) and not isinstance(
+        conf,
+        (PreloadedPath, LocalFile),
+    )
+
+
+def _to_path(conf: str | PathLike) -> LocalFile | Path:
+    """Convert the path to a LocalFile object if it is a local path, or
+    to PanPath, imported on first use, for URIs (e.g. s3://, gs://)"""
+    if "://" not in str(conf):
+        return LocalFile(conf)
+
+    from panpath import PanPath
+
+    return PanPath(conf)
+
+
+def _preload_local(path: LocalFile, conf: Any) -> Any:
+    """Read a local file that is not large, see `preload()`"""
+    if path.is_large():
+        # read by the loaders, in the large-file mode if supported
+        return path
+    try:
+        return PreloadedPath(path, *path.read_signed())
+    except OSError:
+        return conf
+
+
+def preload(conf: Any) -> Any:
+    """Read the configuration file, so that it is only read once
+
+    Args:
+        conf: The configuration
+
+    Returns:
+        A PreloadedPath object if conf is a path that can be read,
+        a LocalFile object if it is a large local file, otherwise conf
+        itself, so that the loaders can deal with it (e.g. raise errors for
+        non-existent files).
+    """
+    if not _is_path(conf):
+        return conf
+
+    path = _to_path(conf)
+    if isinstance(path, LocalFile):
+        return _preload_local(path, conf)
+    try:
+        return PreloadedPath(path, path.read_bytes())
+    except OSError:
+        return conf
+
+
+async def a_preload(conf: Any) -> Any:
+    """Asynchronously read the configuration file, so that it is only read
+    once
+
+    Args:
+        conf: The configuration
+
+    Returns:
+        A PreloadedPath object if conf is a path that can be read,
+        a LocalFile object if it is a large local file, otherwise conf
+        itself, so that the loaders can deal with it (e.g. raise errors for
+        non-existent files).
+    """
+    if not _is_path(conf):
+        return conf
+
+    path = _to_path(conf)
+    if isinstance(path, LocalFile):
+        from asyncio import to_thread
+
+        # stat'ed and read on a thread, not to block the event loop
+        return await to_thread(_preload_local, path, conf)
+    try:
+        return PreloadedPath(path, await path.a_read_bytes())
+    except OSError:
+        return conf
 
 
 class Loader(ABC):
@@ -14,10 +256,10 @@ class Loader(ABC):
     CASTERS: List[Callable[[str, bool], Any]] | None = None
 
     @staticmethod
-    def _convert_path(conf: str | Path) -> Path:
-        """Convert the conf to Path if it is a string"""
-        if isinstance(conf, (str, Path)):
-            return PanPath(conf)
+    def _convert_path(conf: str | Path) -> LocalFile | Path:
+        """Convert the conf to a path object if it is a string or a path"""
+        if _is_path(conf):
+            return _to_path(conf)
         return conf
 
     @abstractmethod
@@ -28,18 +270,80 @@ class Loader(ABC):
     async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Asynchronously load the configuration from the path or configurations"""
 
+    def _prune(self, loaded: Any, tree: Projection, kind: str) -> Any:
+        """Prune the unrequested subtrees from the loaded configuration,
+        before it is converted"""
+        if kind == "profiles":
+            tree = {ANY: tree}
+        return prune(loaded, tree)
+
+    def _loading(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        tree: Projection | None,
+    ) -> Any:
+        """Load the configuration, with the unrequested subtrees pruned
+
+        Loaders that are able to skip building the unrequested subtrees
+        can override this.
+        """
+        loaded = self.loading(conf, ignore_nonexist)
+        if tree is None:
+            return loaded
+        return self._prune(loaded, tree, kind)
+
+    async def _a_loading(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        tree: Projection | None,
+    ) -> Any:
+        """Asynchronously load the configuration, with the unrequested
+        subtrees pruned"""
+        loaded = await self.a_loading(conf, ignore_nonexist)
+        if tree is None:
+            return loaded
+        return self._prune(loaded, tree, kind)
+
     @classmethod
-    def _convert(cls, conf: Any, loaded: Any) -> Diot:
-        """Convert the loaded configuration to Diot"""
-        if cls.CASTERS:
-            loaded = cast(loaded, cls.CASTERS)
+    def _convert(
+        cls,
+        conf: Any,
+        loaded: Any,
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
+        """Convert the loaded configuration, with the values casted"""
+        if cls.CASTERS or (schema is not None and schema.root is not None):
+            # validated in the same walk, see simpleconf.validation
+            loaded = cast(loaded, cls.CASTERS, schema and schema.tree)
 
-        return Diot(loaded)
+        return loaded
 
     @classmethod
-    def _convert_with_profiles(cls, conf: Any, loaded: Any) -> Diot:
-        """Convert the loaded configuration with profiles to Diot"""
-        return Diot(loaded)
+    def _convert_with_profiles(
+        cls,
+        conf: Any,
+        loaded: Any,
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
+        """Convert the loaded configuration with profiles"""
+        if schema is not None and schema.root is not None:
+            loaded = cast(loaded, None, schema.profiles)
+        return loaded
+
+    def _large_file(self, conf: Any) -> LocalFile | None:
+        """Get the local file to load in the large-file mode, or None if
+        it is not large or its content needs rendering (templates)"""
+        if (
+            not isinstance(conf, LocalFile)
+            or isinstance(self, (J2ModifierMixin, LiqModifierMixin))
+            or not conf.is_large()
+        ):
+            return None
+        return conf
 
     def _exists(self, conf: str | Path, ignore_exist: bool) -> bool:
         """Check if the configuration file exists"""
@@ -57,69 +361,291 @@ class Loader(ABC):
             raise FileNotFoundError(f"{conf} does not exist")
         return exists
 
-    def load(self, conf: Any, ignore_nonexist: bool = False) -> Diot:
+    def _preload(self, conf: Any) -> Any:
+        """Read the configuration file once for caching and loading"""
+        return preload(conf)
+
+    async def _a_preload(self, conf: Any) -> Any:
+        """Asynchronously read the configuration file once for caching and
+        loading"""
+        return await a_preload(conf)
+
+    def _cache_key(self, conf: Any, kind: str) -> Any:
+        """Get the key to cache the loaded configuration in memory with,
+        or None if it should not be cached"""
+        return load_cache.key(conf, self.__class__, kind)
+
+    def _disk_cache_key(self, conf: Any, kind: str) -> Any:
+        """Get the key to cache the loaded configuration on disk with,
+        or None if it should not be cached
+
+        Templated configurations are not cached on disk, as the rendered
+        content is not determined by the file content only.
+        """
+        if isinstance(self, (J2ModifierMixin, LiqModifierMixin)):
+            return None
+        content = conf.content if isinstance(conf, PreloadedPath) else None
+        return disk_cache.key(conf, self.__class__, kind, content)
+
+    @staticmethod
+    def _disk_cache_get(disk_key: Any, mem_key: Any) -> Any:
+        """Get the configuration cached on disk, or None if it is not cached"""
+        if disk_key is None:
+            return None
+
+        # Stored as plain dicts, which are much faster to unpickle
+        cached = disk_cache.get(disk_key)
+        if cached is None:
+            return None
+        if mem_key is not None:
+            load_cache.put(mem_key, cached)
+        return cached
+
+    @staticmethod
+    def _cache_put(mem_key: Any, disk_key: Any, out: Any) -> Any:
+        """Cache the loaded configuration, as plain dicts
+
+        Returns:
+            The configuration cached, to build the container from
+        """
+        if isinstance(out, Diot):
+            # e.g. by the custom loaders
+            out = out.to_dict()
+        if mem_key is not None:
+            load_cache.put(mem_key, out)
+        if disk_key is not None:
+            disk_cache.put(disk_key, out)
+        return out
+
+    def _load(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
+        """Load the configuration, reading the file only once, and with
+        the caches considered
+
+        Args:
+            conf: The configuration file to load
+            ignore_nonexist: Whether to ignore non-existent files
+            kind: `load` to load it as it is, or `profiles` to load it
+                with profiles
+            only: The dotted paths of the subtrees to keep, under the
+                profiles with `profiles`. None to keep all.
+            schema: The schema to convert the values by, under the profiles
+                with `profiles`. See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into. See `simpleconf.container`.
+
+        Returns:
+            The loaded configuration in the container
+        """
+        tree = None if only is None else projection_tree(only)
+        cache_kind = projection_kind(kind, only)
+        if schema is not None:
+            from ..schema import compile_schema
+
+            schema = compile_schema(schema)
+            cache_kind = f"{cache_kind};{schema.fingerprint}"
+        mem_key = self._cache_key(conf, cache_kind)
+        cached = None if mem_key is None else load_cache.get(mem_key)
+        if cached is not None:
+            return to_container(cached, container, copy=True)
+
+        preloaded = self._preload(conf)
+        if mem_key is not None and preloaded is not conf:
+            # keyed by the signature of the content just read, in case the
+            # file is modified after it was looked up
+            mem_key = self._cache_key(preloaded, cache_kind)
+        disk_key = self._disk_cache_key(preloaded, cache_kind)
+        cached = self._disk_cache_get(disk_key, mem_key)
+        if cached is not None:
+            return to_container(cached, container, copy=mem_key is not None)
+
+        path = self.__class__._convert_path(preloaded)
+        loaded = self._loading(path, ignore_nonexist, kind, tree)
+        if kind == "load":
+            out = self.__class__._convert(conf, loaded, schema)
+        else:
+            out = self.__class__._convert_with_profiles(
+                conf, loaded, schema  # type: ignore[arg-type]
+            )
+
+        out = self._cache_put(mem_key, disk_key, out)
+        # shared with the load cache, if cached in it
+        return to_container(out, container, copy=mem_key is not None)
+
+    async def _a_load(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
+        """Asynchronously load the configuration, reading the file only once,
+        and with the caches considered
+
+        Args:
+            conf: The configuration file to load
+            ignore_nonexist: Whether to ignore non-existent files
+            kind: `load` to load it as it is, or `profiles` to load it
+                with profiles
+            only: The dotted paths of the subtrees to keep, under the
+                profiles with `profiles`. None to keep all.
+            schema: The schema to convert the values by, under the profiles
+                with `profiles`. See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into. See `simpleconf.container`.
+
+        Returns:
+            The loaded configuration in the container
+        """
+        tree = None if only is None else projection_tree(only)
+        cache_kind = projection_kind(kind, only)
+        if schema is not None:
+            from ..schema import compile_schema
+
+            schema = compile_schema(schema)
+            cache_kind = f"{cache_kind};{schema.fingerprint}"
+        mem_key = self._cache_key(conf, cache_kind)
+        cached = None if mem_key is None else load_cache.get(mem_key)
+        if cached is not None:
+            return to_container(cached, container, copy=True)
+
+        preloaded = await self._a_preload(conf)
+        if mem_key is not None and preloaded is not conf:
+            # keyed by the signature of the content just read, in case the
+            # file is modified after it was looked up
+            mem_key = self._cache_key(preloaded, cache_kind)
+        disk_key = self._disk_cache_key(preloaded, cache_kind)
+        cached = self._disk_cache_get(disk_key, mem_key)
+        if cached is not None:
+            return to_container(cached, container, copy=mem_key is not None)
+
+        path = self.__class__._convert_path(preloaded)
+        loaded = await self._a_loading(path, ignore_nonexist, kind, tree)
+        if kind == "load":
+            out = self.__class__._convert(conf, loaded, schema)
+        else:
+            out = self.__class__._convert_with_profiles(
+                conf, loaded, schema  # type: ignore[arg-type]
+            )
+
+        out = self._cache_put(mem_key, disk_key, out)
+        # shared with the load cache, if cached in it
+        return to_container(out, container, copy=mem_key is not None)
+
+    def load(
+        self,
+        conf: Any,
+        ignore_nonexist: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Load the configuration from the path or configurations and cast
         values
 
         Args:
             conf: The configuration file to load
+            only: The dotted paths of the subtrees to keep. None to keep all.
+            schema: The schema to convert the values by.
+                See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into, Diot by default. See `simpleconf.container`.
 
         Returns:
-            The Diot object
+            The loaded configuration in the container
         """
-        path = self.__class__._convert_path(conf)
-        loaded = self.loading(path, ignore_nonexist)
-        return self.__class__._convert(conf, loaded)
+        return self._load(
+            conf, ignore_nonexist, "load", only, schema, container
+        )
 
-    async def a_load(self, conf: Any, ignore_nonexist: bool = False) -> Diot:
+    async def a_load(
+        self,
+        conf: Any,
+        ignore_nonexist: bool = False,
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Asynchronously load the configuration from the path or configurations
         and cast values
 
         Args:
             conf: The configuration file to load
+            only: The dotted paths of the subtrees to keep. None to keep all.
+            schema: The schema to convert the values by.
+                See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into, Diot by default. See `simpleconf.container`.
 
         Returns:
-            The Diot object
+            The loaded configuration in the container
         """
-        path = self.__class__._convert_path(conf)
-        loaded = await self.a_loading(path, ignore_nonexist)
-        return self.__class__._convert(conf, loaded)
+        return await self._a_load(
+            conf, ignore_nonexist, "load", only, schema, container
+        )
 
     def load_with_profiles(  # type: ignore[override]
         self,
         conf: Any,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Load the configuration from the path or configurations with profiles
         and cast values
 
         Args:
             conf: The configuration file to load
+            only: The dotted paths of the subtrees to keep under each
+                profile. None to keep all.
+            schema: The schema to convert the values by under each
+                profile. See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into, Diot by default. See `simpleconf.container`.
 
         Returns:
-            The Diot object
+            The loaded configuration in the container
         """
-        path = self.__class__._convert_path(conf)
-        loaded = self.loading(path, ignore_nonexist)
-        return self.__class__._convert_with_profiles(conf, loaded)
+        return self._load(
+            conf, ignore_nonexist, "profiles", only, schema, container
+        )
 
     async def a_load_with_profiles(  # type: ignore[override]
         self,
         conf: Any,
         ignore_nonexist: bool = False,
-    ) -> Diot:
+        only: Sequence[str] | None = None,
+        schema: Schema | None = None,
+        container: Container = Diot,
+    ) -> Any:
         """Asynchronously load the configuration from the path or configurations
         with profiles and cast values
 
         Args:
             conf: The configuration file to load
+            only: The dotted paths of the subtrees to keep under each
+                profile. None to keep all.
+            schema: The schema to convert the values by under each
+                profile. See `simpleconf.schema`.
+            container: The type of the mappings to load the configuration
+                into, Diot by default. See `simpleconf.container`.
 
         Returns:
-            The Diot object
+            The loaded configuration in the container
         """
-        path = self.__class__._convert_path(conf)
-        loaded = await self.a_loading(path, ignore_nonexist)
-        return self.__class__._convert_with_profiles(conf, loaded)
+        return await self._a_load(
+            conf, ignore_nonexist, "profiles", only, schema, container
+        )
 
 
 class NoConvertingPathMixin(ABC):
@@ -129,34 +655,175 @@ class NoConvertingPathMixin(ABC):
     def _convert_path(conf: str) -> str:
         return conf
 
+    def _preload(self, conf: Any) -> Any:
+        """Strings are not paths, nothing to read"""
+        return conf
+
+    async def _a_preload(self, conf: Any) -> Any:
+        """Strings are not paths, nothing to read"""
+        return conf
+
+    def _cache_key(self, conf: Any, kind: str) -> Any:
+        """Strings are not paths, don't cache them"""
+        return None
+
+    def _disk_cache_key(self, conf: Any, kind: str) -> Any:
+        """Strings are not paths, don't cache them"""
+        return None
+
     async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Asynchronously load the configuration from a toml file"""
         return self.loading(conf, ignore_nonexist)  # type: ignore[attr-defined]
 
 
+def as_text(content: str | bytes) -> str:
+    """Decode the content if it is bytes
+
+    The loaders pass bytes through as long as they can, so that the content
+    is decoded at most once, by this or by the parser.
+    """
+    return content.decode() if isinstance(content, bytes) else content
+
+
 class LoaderModifierMixin(ABC):
     """Loader mixin class with content modifier"""
 
     def _modifier(self, content: str | bytes) -> str | bytes:
-        """Modify the content of the configuration file before loading"""
+        """Modify the content of the configuration file before loading
+
+        Bytes are returned as they are if the content is not modified, so
+        that they are only decoded when needed.
+        """
         return content
 
 
-class J2ModifierMixin(LoaderModifierMixin):
-    """Loader mixin class with Jinja2 content modifier"""
+class TemplateModifierMixin(LoaderModifierMixin):
+    """Loader mixin class rendering the content as a template
+
+    The compiled templates are cached in `template_cache`, keyed by the
+    loader class, the options and the hash of the content, and one
+    environment of the template engine is created for each loader class and
+    options. The code of the templates is also cached in `bytecode_cache`
+    if it is enabled.
+    """
+
+    # Options to create the environment of the template engine with
+    TEMPLATE_OPTIONS: Dict[str, Any] = {}
+
+    @classmethod
+    @abstractmethod
+    def _create_environment(cls, options: Dict[str, Any]) -> Any:
+        """Create the environment of the template engine"""
+
+    @classmethod
+    @abstractmethod
+    def _engine(cls) -> str:
+        """Get the name and version of the template engine"""
+
+    @classmethod
+    def _environment(cls, options_key: str) -> Any:
+        """Get the environment of the loader class and options"""
+        key = (cls, options_key)
+        try:
+            return _ENVIRONMENTS[key]
+        except KeyError:
+            env = cls._create_environment(cls.TEMPLATE_OPTIONS)
+            return _ENVIRONMENTS.setdefault(key, env)
+
+    def _template(self, content: str | bytes) -> Any:
+        """Get the compiled template of the content, from the cache if
+        possible"""
+        cls = self.__class__
+        options_key = repr(sorted(cls.TEMPLATE_OPTIONS.items()))
+        key = template_cache.key(cls, options_key, content)
+        template = template_cache.get(key) if key is not None else None
+        if template is None:
+            env = cls._environment(options_key)
+            code = self._compile(env, options_key, content)
+            template = env.template_class.from_code(env, code, env.make_globals(None))
+            if key is not None:
+                template_cache.put(key, template)
+        return template
+
+    def _compile(self, env: Any, options_key: str, content: str | bytes) -> Any:
+        """Compile the content into a code object, or get it from the
+        bytecode cache if possible"""
+        cls = self.__class__
+        key = bytecode_cache.key(cls, options_key, cls._engine(), content)
+        code = bytecode_cache.get(key) if key is not None else None
+        if code is None:
+            code = env.compile(as_text(content))
+            if key is not None:
+                bytecode_cache.put(key, code)
+        return code
+
+    def _has_template_syntax(self, content: str | bytes) -> bool:
+        """Check if the content has any of the start delimiters of the
+        template engine"""
+        options = self.__class__.TEMPLATE_OPTIONS
+        if options.get("line_statement_prefix") or options.get("line_comment_prefix"):
+            return True
+
+        binary = isinstance(content, bytes)
+        for name, default in _START_STRINGS:
+            start = options.get(name, default)
+            if (start.encode() if binary else start) in content:
+                return True
+        return False
 
     def _modifier(self, content: str | bytes) -> str | bytes:
-        """Modify the content of the configuration file before loading"""
-        from jinja2 import Template
-        return Template(content).render()  # type: ignore
+        """Modify the content of the configuration file before loading
+
+        The content without any template syntax is returned as it is.
+        """
+        if not self._has_template_syntax(content):
+            template_cache.count(rendered=False)
+            return content
+
+        template_cache.count(rendered=True)
+        return self._template(content).render()
 
 
-class LiqModifierMixin(LoaderModifierMixin):
+# The environments of the template engines, by loader class and options
+_ENVIRONMENTS: Dict[Any, Any] = {}
+# The options of the start delimiters, with the defaults
+_START_STRINGS = (
+    ("block_start_string", "{%"),
+    ("variable_start_string", "{{"),
+    ("comment_start_string", "{#"),
+)
+
+
+class J2ModifierMixin(TemplateModifierMixin):
+    """Loader mixin class with Jinja2 content modifier"""
+
+    @classmethod
+    def _engine(cls) -> str:
+        """Get the name and version of jinja2"""
+        import jinja2
+        return f"jinja2 {jinja2.__version__}"
+
+    @classmethod
+    def _create_environment(cls, options: Dict[str, Any]) -> Any:
+        """Create the jinja2 environment"""
+        from jinja2 import Environment
+        return Environment(**options)
+
+
+class LiqModifierMixin(TemplateModifierMixin):
     """Loader mixin class with Liquid content modifier"""
 
-    def _modifier(self, content: str | bytes) -> str | bytes:
-        """Modify the content of the configuration file before loading"""
+    TEMPLATE_OPTIONS: Dict[str, Any] = {"mode": "wild"}
+
+    @classmethod
+    def _engine(cls) -> str:
+        """Get the name and version of liquidpy and jinja2"""
+        import jinja2
+        import liquid  # type: ignore[import]
+        return f"liquidpy {liquid.__version__} jinja2 {jinja2.__version__}"
+
+    @classmethod
+    def _create_environment(cls, options: Dict[str, Any]) -> Any:
+        """Create the jinja2 environment with the liquid extensions"""
         from liquid import Liquid  # type: ignore[import]
-        str_content = content.decode() if isinstance(content, bytes) else content
-        liq = Liquid(str_content, from_file=False, mode="wild")  # type: ignore
-        return liq.render()
+        return Liquid("", from_file=False, **options).env
@@ -1,10 +1,14 @@
 from typing import Any, Dict
 
+from ..container import to_plain
 from . import Loader, NoConvertingPathMixin
 
 
 class DictLoader(Loader):
-    """Dict loader"""
+    """Dict loader
+
+    The dict is copied, as the loaded configurations are merged in place.
+    """
 
     @staticmethod
     def _convert_path(conf: Any) -> Any:  # type: ignore[override]
@@ -12,11 +16,11 @@ class DictLoader(Loader):
 
     def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Load the configuration from a dict"""
-        return conf
+        return to_plain(conf)
 
     async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Asynchronously load the configuration from a dict"""
-        return conf
+        return to_plain(conf)
 
 
 class DictsLoader(NoConvertingPathMixin, DictLoader):  # type: ignore[misc]
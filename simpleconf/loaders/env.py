@@ -1,10 +1,12 @@
+from __future__ import annotations
+
 import warnings
 import io
 from pathlib import Path
-from typing import Any, Awaitable, Dict
-from diot import Diot
+from typing import TYPE_CHECKING, Any, Awaitable, Dict
 
 from ..utils import require_package
+from ..projection import Projection, prune_profile_keys
 from ..caster import (
     cast,
     int_caster,
@@ -17,16 +19,40 @@ from ..caster import (
     toml_caster,
 )
 from . import (
+    as_text,
+    LocalFile,
     Loader,
+    PreloadedPath,
     NoConvertingPathMixin,
     LoaderModifierMixin,
     J2ModifierMixin,
     LiqModifierMixin,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..schema import CompiledSchema
+
 dotenv = require_package("dotenv")
 
 
+def _dotenv_values(text: str) -> Dict[str, Any]:
+    """Parse the content of a .env file
+
+    The variables are only interpolated if there may be any (`${VAR}`), since
+    the interpolation takes quadratic time in the number of the values.
+    """
+    return dotenv.dotenv_values(stream=io.StringIO(text), interpolate="$" in text)
+
+
+def _may_interpolate(conf: Any) -> bool:
+    """Check if the variables in a .env file may be interpolated from the
+    environment, so that the loaded values are not determined by the file
+    only. Large files, which are not read yet, are taken as they may."""
+    if isinstance(conf, PreloadedPath):
+        return b"$" in conf.content
+    return isinstance(conf, LocalFile)
+
+
 class EnvLoader(Loader, LoaderModifierMixin):
     """Env file loader"""
 
@@ -45,9 +71,7 @@ class EnvLoader(Loader, LoaderModifierMixin):
         """Load the configuration from a .env file"""
         if hasattr(conf, "read"):
             content = conf.read()
-            str_content = content.decode() if isinstance(content, bytes) else content
-            sio = io.StringIO(str_content)  # type: ignore[arg-type]
-            return dotenv.dotenv_values(stream=sio)
+            return _dotenv_values(as_text(content))
 
         if not self._exists(conf, ignore_nonexist):
             return {}
@@ -55,9 +79,19 @@ class EnvLoader(Loader, LoaderModifierMixin):
         conf = self.__class__._convert_path(conf)
         content = conf.read_text()  # so that cloud paths work
         modified = self._modifier(content)
-        str_modified = modified.decode() if isinstance(modified, bytes) else modified
-        sio = io.StringIO(str_modified)  # type: ignore[arg-type]
-        return dotenv.dotenv_values(stream=sio)
+        return _dotenv_values(as_text(modified))
+
+    def _cache_key(self, conf: Any, kind: str) -> Any:
+        """Not cached in memory if the variables may be interpolated"""
+        if _may_interpolate(conf):
+            return None
+        return super()._cache_key(conf, kind)
+
+    def _disk_cache_key(self, conf: Any, kind: str) -> Any:
+        """Not cached on disk if the variables may be interpolated"""
+        if _may_interpolate(conf):
+            return None
+        return super()._disk_cache_key(conf, kind)
 
     async def a_loading(self, conf, ignore_nonexist):
         """Asynchronously load the configuration from a .env file"""
@@ -65,12 +99,8 @@ class EnvLoader(Loader, LoaderModifierMixin):
             content = conf.read()
             if isinstance(content, Awaitable):
                 content = await content
-            if isinstance(content, bytes):
-                content = content.decode()
             modified = self._modifier(content)
-            str_modified = modified.decode() if isinstance(modified, bytes) else modified
-            sio = io.StringIO(str_modified)  # type: ignore[arg-type]
-            return dotenv.dotenv_values(stream=sio)
+            return _dotenv_values(as_text(modified))
 
         if not await self._a_exists(conf, ignore_nonexist):
             return {}
@@ -79,26 +109,32 @@ class EnvLoader(Loader, LoaderModifierMixin):
         # so that cloud paths work
         content = await conf.a_read_text()  # type: ignore[attr-defined]
         modified = self._modifier(content)
-        str_modified = modified.decode() if isinstance(modified, bytes) else modified
-        sio = io.StringIO(str_modified)  # type: ignore[arg-type]
-        return dotenv.dotenv_values(stream=sio)
+        return _dotenv_values(as_text(modified))
+
+    def _prune(self, loaded: Any, tree: Projection, kind: str) -> Any:
+        """Prune the flat keys, which have the profile names as prefixes
+        with profiles"""
+        if kind == "profiles":
+            return prune_profile_keys(loaded, tree)
+        return super()._prune(loaded, tree, kind)
 
     @classmethod
     def _convert_with_profiles(  # type: ignore[override]
         cls,
         conf: Any,
         loaded: Dict[str, Any],
-    ) -> Diot:
-        out = Diot()
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
         for k, v in loaded.items():
             if "_" not in k:
                 warnings.warn(f"{Path(conf).name}: No profile name found in key: {k}")
                 continue
             profile, key = k.split("_", 1)
             profile = profile.lower()
-            out.setdefault(profile, Diot())[key] = v
+            out.setdefault(profile, {})[key] = v
 
-        return cast(out, cls.CASTERS or [])
+        return cast(out, cls.CASTERS, schema and schema.profiles)
 
 
 class EnvsLoader(NoConvertingPathMixin, EnvLoader):  # type: ignore[misc]
@@ -106,7 +142,7 @@ class EnvsLoader(NoConvertingPathMixin, EnvLoader):  # type: ignore[misc]
 
     def loading(self, conf: Any, ignore_nonexist: bool = False) -> Dict[str, Any]:
         """Load the configuration from a .env file"""
-        return dotenv.dotenv_values(stream=io.StringIO(conf))
+        return _dotenv_values(conf)
 
 
 class EnvJ2Loader(EnvLoader, J2ModifierMixin):
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import warnings
-from typing import Any, Awaitable, Dict
+from typing import TYPE_CHECKING, Any, Awaitable, Dict
 from pathlib import Path
-from diot import Diot
 
 from ..utils import require_package
+from ..projection import ANY, Projection, prune
 from ..caster import (
     cast,
     int_caster,
@@ -25,6 +25,9 @@ from . import (
     LiqModifierMixin,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..schema import CompiledSchema
+
 iniconfig = require_package("iniconfig")
 
 
@@ -75,12 +78,18 @@ class IniLoader(Loader, LoaderModifierMixin):
         content = self._modifier(content)
         return iniconfig.IniConfig(conf, content).sections
 
+    def _prune(self, loaded: Any, tree: Projection, kind: str) -> Any:
+        """Prune the keys under the sections, which are the profiles, or
+        the default section without profiles"""
+        return prune(loaded, {ANY: tree})
+
     @classmethod
     def _convert(  # type: ignore[override]
         cls,
         conf: Any,
         loaded: Dict[str, Any],
-    ) -> Diot:
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
         keys = list(loaded)
 
         if hasattr(conf, "read"):
@@ -99,18 +108,17 @@ class IniLoader(Loader, LoaderModifierMixin):
         if len(keys) == 0 or keys[0].lower() != "default":
             raise ValueError(f"{pathname}: Only the default section can be loaded.")
 
-        return cast(Diot(loaded[keys[0]]), cls.CASTERS or [])
+        return cast(loaded[keys[0]], cls.CASTERS, schema and schema.tree)
 
     @classmethod
     def _convert_with_profiles(  # type: ignore[override]
         cls,
         conf: Any,
         loaded: Dict[str, Any],
-    ) -> Diot:
-        out = Diot()
-        for k, v in loaded.items():
-            out[k.lower()] = cast(v, cls.CASTERS or [])
-        return out
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
+        out = {k.lower(): v for k, v in loaded.items()}
+        return cast(out, cls.CASTERS, schema and schema.profiles)
 
 
 class InisLoader(NoConvertingPathMixin, IniLoader):  # type: ignore[misc]
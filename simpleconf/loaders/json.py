@@ -1,7 +1,12 @@
+from __future__ import annotations
+
 import json
 from typing import Any, Awaitable, Dict
 
+from ..backends import get_backend
 from . import (
+    as_text,
+    LocalFile,
     Loader,
     NoConvertingPathMixin,
     LoaderModifierMixin,
@@ -10,41 +15,81 @@ from . import (
 )
 
 
+def _loads(content: str | bytes) -> Any:
+    """Parse the content with the json backend in use"""
+    backend = get_backend("json")
+    return backend.loads(content if backend.binary else as_text(content))
+
+
+def _load_large(path: LocalFile) -> Any:
+    """Load a large json file, without holding its content twice
+
+    With orjson, the file is memory-mapped and parsed directly, without
+    being read into memory. With the other backends, the whole file is
+    still read, as text only (by `json.load()` with the standard library),
+    rather than as bytes and then a str.
+    """
+    backend = get_backend("json")
+    if backend.name != "orjson":
+        with open(path, encoding="utf-8") as fh:
+            if backend.name == "json":
+                return json.load(fh)
+            return backend.loads(fh.read())
+
+    import mmap
+
+    with open(path, "rb") as fh, mmap.mmap(
+        fh.fileno(),
+        0,
+        access=mmap.ACCESS_READ,
+    ) as mapped, memoryview(mapped) as view:
+        return backend.loads(view)
+
+
 class JsonLoader(Loader, LoaderModifierMixin):
     """Json file loader"""
 
     def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Load the configuration from a json file"""
+        large = self._large_file(conf)
+        if large is not None:
+            return _load_large(large)
+
         if hasattr(conf, "read"):
             content = conf.read()
-            return json.loads(content)
+            return _loads(content)
 
         if not self._exists(conf, ignore_nonexist):
             return {}
 
         conf = self.__class__._convert_path(conf)
-        content = conf.read_text()
+        # decoded by the backend, unless it takes str only
+        content = conf.read_bytes()
         content = self._modifier(content)
-        return json.loads(content)
+        return _loads(content)
 
     async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Asynchronously load the configuration from a json file"""
+        large = self._large_file(conf)
+        if large is not None:
+            from asyncio import to_thread
+
+            return await to_thread(_load_large, large)
+
         if hasattr(conf, "read"):
             content = conf.read()
             if isinstance(content, Awaitable):
                 content = await content
-            if isinstance(content, bytes):
-                content = content.decode()
             content = self._modifier(content)
-            return json.loads(content)
+            return _loads(content)
 
         if not await self._a_exists(conf, ignore_nonexist):
             return {}
 
         conf = self.__class__._convert_path(conf)
-        content = await conf.a_read_text()
+        content = await conf.a_read_bytes()
         content = self._modifier(content)
-        return json.loads(content)
+        return _loads(content)
 
 
 class JsonsLoader(NoConvertingPathMixin, JsonLoader):  # type: ignore[misc]
@@ -52,7 +97,7 @@ class JsonsLoader(NoConvertingPathMixin, JsonLoader):  # type: ignore[misc]
 
     def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Load the configuration from a json file"""
-        return json.loads(conf)
+        return _loads(conf)
 
 
 class JsonJ2Loader(JsonLoader, J2ModifierMixin):
@@ -1,10 +1,12 @@
+from __future__ import annotations
+
 import warnings
 from os import environ
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-from diot import Diot
 
 from . import Loader, NoConvertingPathMixin
+from ..projection import Projection, prune_profile_keys
 from ..caster import (
     cast,
     int_caster,
@@ -17,6 +19,9 @@ from ..caster import (
     toml_caster,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..schema import CompiledSchema
+
 
 class OsenvLoader(NoConvertingPathMixin, Loader):  # type: ignore[misc]
     """Environment variable loader"""
@@ -50,19 +55,27 @@ class OsenvLoader(NoConvertingPathMixin, Loader):  # type: ignore[misc]
         """Asynchronously load the configuration from environment variables"""
         return self.loading(conf, ignore_nonexist)
 
+    def _prune(self, loaded: Any, tree: Projection, kind: str) -> Any:
+        """Prune the flat keys, which have the profile names as prefixes
+        with profiles"""
+        if kind == "profiles":
+            return prune_profile_keys(loaded, tree)
+        return super()._prune(loaded, tree, kind)
+
     @classmethod
     def _convert_with_profiles(  # type: ignore[override]
         cls,
         conf: Any,
         loaded: Dict[str, Any],
-    ) -> Diot:
-        out = Diot()
+        schema: CompiledSchema | None = None,
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
         for key, val in loaded.items():
             if "_" not in key:
                 warnings.warn(f"{conf}: No profile name found in key: {key}")
                 continue
             profile, key = key.split("_", 1)
             profile = profile.lower()
-            out.setdefault(profile, Diot())[key] = val
+            out.setdefault(profile, {})[key] = val
 
-        return cast(out, cls.CASTERS)
+        return cast(out, cls.CASTERS, schema and schema.profiles)
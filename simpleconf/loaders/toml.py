@@ -1,11 +1,12 @@
 from typing import Any, Dict, Awaitable
 
-from ..utils import require_package
+from ..backends import get_backend
 from ..caster import (
     none_caster,
     null_caster,
 )
 from . import (
+    as_text,
     Loader,
     NoConvertingPathMixin,
     LoaderModifierMixin,
@@ -13,8 +14,6 @@ from . import (
     LiqModifierMixin,
 )
 
-toml = require_package("rtoml", "tomllib", "tomli")
-
 
 class TomlLoader(Loader, LoaderModifierMixin):
     """Toml file loader"""
@@ -29,19 +28,16 @@ class TomlLoader(Loader, LoaderModifierMixin):
         if hasattr(conf, "read"):
             content = conf.read()
             content = self._modifier(content)
-            return toml.loads(content)
+            return get_backend("toml").loads(as_text(content))
 
         if not self._exists(conf, ignore_nonexist):
             return {}
 
         conf = self.__class__._convert_path(conf)
         content = conf.read_bytes()
-        try:
-            return toml.loads(self._modifier(content))
-        except Exception:  # TypeError, TomlParsingError
-            content = content.decode()
-            content = self._modifier(content)
-            return toml.loads(content)
+        content = self._modifier(content)
+        # rtoml, tomllib and tomli all parse str only
+        return get_backend("toml").loads(as_text(content))
 
     async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Asynchronously load the configuration from a toml file"""
@@ -49,22 +45,16 @@ class TomlLoader(Loader, LoaderModifierMixin):
             content = conf.read()
             if isinstance(content, Awaitable):
                 content = await content
-            if isinstance(content, bytes):
-                content = content.decode()
             content = self._modifier(content)
-            return toml.loads(content)
+            return get_backend("toml").loads(as_text(content))
 
         if not await self._a_exists(conf, ignore_nonexist):
             return {}
 
         conf = self.__class__._convert_path(conf)
         content = await conf.a_read_bytes()
-        try:
-            return toml.loads(self._modifier(content))
-        except Exception:  # TypeError, TemplateSyntaxError
-            content = content.decode()
-            content = self._modifier(content)
-            return toml.loads(content)
+        content = self._modifier(content)
+        return get_backend("toml").loads(as_text(content))
 
 
 class TomlsLoader(NoConvertingPathMixin, TomlLoader):  # type: ignore[misc]
@@ -72,7 +62,7 @@ class TomlsLoader(NoConvertingPathMixin, TomlLoader):  # type: ignore[misc]
 
     def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
         """Load the configuration from a toml file"""
-        return toml.loads(conf)
+        return get_backend("toml").loads(conf)
 
 
 class TomlJ2Loader(TomlLoader, J2ModifierMixin):
@@ -1,61 +1,425 @@
-from typing import Any, Dict, Awaitable
+from __future__ import annotations
+
+from collections import ChainMap
+from typing import Any, Dict, Awaitable, List
 
 from . import (
+    LocalFile,
     Loader,
     NoConvertingPathMixin,
     LoaderModifierMixin,
     J2ModifierMixin,
     LiqModifierMixin,
 )
+from ..backends import get_backend
+from ..projection import ANY, Projection, prune
 from ..utils import require_package
 
 yaml = require_package("yaml")
 
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_STR_TAG = "tag:yaml.org,2002:str"
+_COLLECTION_TAGS = (None, "!", "tag:yaml.org,2002:map", "tag:yaml.org,2002:seq")
+
+# Merge keys (`<<`) in the mappings, when they are built from the events
+_MERGE = object()
+
+
+def _prune_node(node: Any, tree: Projection) -> Any:
+    """Prune the unrequested subtrees from the composed yaml node, so that
+    they are not constructed at all
+
+    The nodes are copied rather than modified, since a node can be shared
+    by the anchors and aliases.
+    """
+    if not isinstance(node, yaml.MappingNode):
+        return node
+
+    any_tree = tree.get(ANY)
+    value = []
+    for key_node, value_node in node.value:
+        if key_node.tag == _MERGE_TAG:
+            # merged keys are pruned after construction
+            value.append((key_node, value_node))
+            continue
+        key = key_node.value if isinstance(key_node, yaml.ScalarNode) else None
+        sub = tree.get(key, any_tree)
+        if sub is None:
+            continue
+        if sub is not True:
+            value_node = _prune_node(value_node, sub)
+        value.append((key_node, value_node))
+
+    return yaml.MappingNode(
+        node.tag,
+        value,
+        node.start_mark,
+        node.end_mark,
+        flow_style=node.flow_style,
+    )
+
+
+def _load_projected(content: str | bytes, tree: Projection) -> Any:
+    """Load the yaml content, constructing only the requested subtrees"""
+    loader = get_backend("yaml").parser(content)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None
+        return prune(loader.construct_document(_prune_node(node, tree)), tree)
+    finally:
+        loader.dispose()
+
+
+def _compose(loader: Any, event: Any, anchors: Dict[str, Any]) -> Any:
+    """Compose the node from the events, starting with the given event
+    that is already taken from the parser"""
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise yaml.composer.ComposerError(
+                None,
+                None,
+                f"found undefined alias {event.anchor!r}",
+                event.start_mark,
+            )
+        return anchors[event.anchor]
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(
+            tag,
+            event.value,
+            event.start_mark,
+            event.end_mark,
+            style=event.style,
+        )
+    elif isinstance(event, yaml.MappingStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(
+            tag,
+            [],
+            event.start_mark,
+            None,
+            flow_style=event.flow_style,
+        )
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose(loader, loader.get_event(), anchors)
+            node.value.append((key, _compose(loader, loader.get_event(), anchors)))
+        node.end_mark = loader.get_event().end_mark
+    else:  # SequenceStartEvent
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(
+            tag,
+            [],
+            event.start_mark,
+            None,
+            flow_style=event.flow_style,
+        )
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose(loader, loader.get_event(), anchors))
+        node.end_mark = loader.get_event().end_mark
+
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def _construct_scalar(loader: Any, event: Any) -> Any:
+    """Construct the value of a scalar event"""
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+    if tag == _STR_TAG:
+        return event.value
+    if tag == _MERGE_TAG:
+        return _MERGE
+
+    node = yaml.ScalarNode(
+        tag,
+        event.value,
+        event.start_mark,
+        event.end_mark,
+        style=event.style,
+    )
+    constructor = loader.yaml_constructors.get(tag)
+    if constructor is not None:
+        return constructor(loader, node)
+    # multi-constructors (e.g. !!python/name:...) and undefined tags
+    value = loader.construct_document(node)
+    return value
+
+
+def _merge_mapping(mapping: Dict[Any, Any], merges: List[Any], mark: Any) -> None:
+    """Apply the merge keys to the mapping in place, with the merged keys
+    first and overridden by the keys of the mapping, like PyYAML does"""
+    merged: Dict[Any, Any] = {}
+    for value in reversed(merges):
+        for sub in reversed(value) if isinstance(value, list) else [value]:
+            if not isinstance(sub, dict):
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    mark,
+                    "expected a mapping or list of mappings for merging, "
+                    f"but found {type(sub).__name__}",
+                    mark,
+                )
+            merged.update(sub)
+    merged.update(mapping)
+    mapping.clear()
+    mapping.update(merged)
+
+
+def _construct_tagged(
+    loader: Any,
+    event: Any,
+    anchors: Dict[str, Any],
+    nodes: Dict[str, Any],
+    built: Dict[Any, Any],
+) -> Any:
+    """Compose and construct a collection with an explicit tag
+
+    The aliases in it to the values built from the events are resolved by
+    their nodes (`nodes`) with the values constructed already (`built`), and
+    the anchors in it are added to both, so that the values are shared with
+    the aliases both ways, like `yaml.load()` does.
+    """
+    scope: ChainMap[str, Any] = ChainMap({}, nodes)
+    node = _compose(loader, event, scope)  # type: ignore[arg-type]
+    loader.constructed_objects.update(built)
+    try:
+        # construct_document() without dropping the constructed objects
+        value = loader.construct_object(node)
+        while loader.state_generators:
+            generators = loader.state_generators
+            loader.state_generators = []
+            for generator in generators:
+                for _ in generator:
+                    pass
+        for name, sub in scope.maps[0].items():
+            if sub not in loader.constructed_objects:
+                loader.construct_object(sub, deep=True)
+            anchors[name] = built[sub] = loader.constructed_objects[sub]
+            nodes[name] = sub
+    finally:
+        loader.constructed_objects = {}
+        loader.recursive_objects = {}
+        loader.deep_construct = False
+    return value
+
+
+def _build_from_events(loader: Any) -> Any:
+    """Build the objects of a document directly from the parser events
+
+    Unlike `yaml.load()`, the node tree of the whole document is not
+    composed before the objects are constructed, so that the memory held
+    while loading is close to the size of the objects. Collections with
+    explicit tags (e.g. `!!set`) are composed and constructed as usual.
+    """
+    anchors: Dict[str, Any] = {}
+    # The nodes of the anchors and their values, for the collections with
+    # explicit tags. The values built from the events have stand-in nodes.
+    nodes: Dict[str, Any] = {}
+    built: Dict[Any, Any] = {}
+
+    def _anchor(name: str, value: Any) -> None:
+        anchors[name] = value
+        node = nodes[name] = yaml.ScalarNode(_STR_TAG, "")
+        built[node] = value
+
+    # [container, start mark, pending key, merges] of the open collections
+    stack: List[List[Any]] = []
+    get_event = loader.get_event
+    no_key = stack  # a sentinel that is never a key
+
+    while True:
+        event = get_event()
+        if isinstance(event, yaml.ScalarEvent):
+            value = _construct_scalar(loader, event)
+            if event.anchor is not None:
+                _anchor(event.anchor, value)
+        elif isinstance(event, yaml.AliasEvent):
+            if event.anchor not in anchors:
+                raise yaml.composer.ComposerError(
+                    None,
+                    None,
+                    f"found undefined alias {event.anchor!r}",
+                    event.start_mark,
+                )
+            value = anchors[event.anchor]
+        elif isinstance(event, yaml.CollectionStartEvent):
+            if event.tag not in _COLLECTION_TAGS:
+                value = _construct_tagged(loader, event, anchors, nodes, built)
+            else:
+                container: Any = (
+                    {} if isinstance(event, yaml.MappingStartEvent) else []
+                )
+                if event.anchor is not None:
+                    _anchor(event.anchor, container)
+                stack.append([container, event.start_mark, no_key, None])
+                continue
+        else:  # CollectionEndEvent
+            value, mark, _, merges = stack.pop()
+            if merges is not None:
+                _merge_mapping(value, merges, mark)
+
+        if not stack:
+            return value
+
+        frame = stack[-1]
+        container = frame[0]
+        if container.__class__ is list:
+            container.append(value)
+        elif frame[2] is no_key:
+            frame[2] = value
+        else:
+            key = frame[2]
+            frame[2] = no_key
+            if key is _MERGE:
+                if frame[3] is None:
+                    frame[3] = []
+                frame[3].append(value)
+                continue
+            try:
+                container[key] = value
+            except TypeError:
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    frame[1],
+                    "found unhashable key",
+                    event.start_mark,
+                ) from None
+
+
+def _load_large(path: LocalFile) -> Any:
+    """Load a large yaml file, streamed into the parser in chunks, with the
+    objects built from the parser events directly"""
+    with open(path, "rb") as fh:
+        loader = get_backend("yaml").parser(fh)
+        try:
+            loader.get_event()  # StreamStartEvent
+            if loader.check_event(yaml.StreamEndEvent):
+                return None
+            loader.get_event()  # DocumentStartEvent
+            data = _build_from_events(loader)
+            loader.get_event()  # DocumentEndEvent
+            if not loader.check_event(yaml.StreamEndEvent):
+                raise yaml.composer.ComposerError(
+                    "expected a single document in the stream",
+                    None,
+                    "but found another document",
+                    loader.peek_event().start_mark,
+                )
+            return data
+        finally:
+            loader.dispose()
+
 
 class YamlLoader(Loader, LoaderModifierMixin):
     """Yaml file loader"""
 
-    def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
-        """Load the configuration from a yaml file"""
+    def _read(self, conf: Any, ignore_nonexist: bool) -> str | bytes | None:
+        """Read the content to load, None if the file does not exist"""
         if hasattr(conf, "read"):
-            content = conf.read()
-            content = self._modifier(content)
-            return yaml.load(content, Loader=yaml.FullLoader)
+            return self._modifier(conf.read())
 
         if not self._exists(conf, ignore_nonexist):
-            return {}
+            return None
 
         conf = self.__class__._convert_path(conf)
-        content = conf.read_text()
-        content = self._modifier(content)
-        return yaml.load(content, Loader=yaml.FullLoader)
+        # the yaml parser decodes the bytes itself
+        return self._modifier(conf.read_bytes())
 
-    async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
-        """Asynchronously load the configuration from a yaml file"""
+    async def _a_read(self, conf: Any, ignore_nonexist: bool) -> str | bytes | None:
+        """Asynchronously read the content to load, None if the file does not
+        exist"""
         if hasattr(conf, "read"):
             content = conf.read()
             if isinstance(content, Awaitable):
                 content = await content
-            if isinstance(content, bytes):
-                content = content.decode()
-            content = self._modifier(content)
-            return yaml.load(content, Loader=yaml.FullLoader)
+            return self._modifier(content)
 
         if not await self._a_exists(conf, ignore_nonexist):
-            return {}
+            return None
 
         conf = self.__class__._convert_path(conf)
-        content = await conf.a_read_text()
-        content = self._modifier(content)
-        return yaml.load(content, Loader=yaml.FullLoader)
+        content = await conf.a_read_bytes()
+        return self._modifier(content)
+
+    def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
+        """Load the configuration from a yaml file"""
+        large = self._large_file(conf)
+        if large is not None:
+            return _load_large(large)
+
+        content = self._read(conf, ignore_nonexist)
+        if content is None:
+            return {}
+        return get_backend("yaml").loads(content)
+
+    async def a_loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
+        """Asynchronously load the configuration from a yaml file"""
+        large = self._large_file(conf)
+        if large is not None:
+            from asyncio import to_thread
+
+            return await to_thread(_load_large, large)
+
+        content = await self._a_read(conf, ignore_nonexist)
+        if content is None:
+            return {}
+        return get_backend("yaml").loads(content)
+
+    def _loading(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        tree: Projection | None,
+    ) -> Any:
+        """Load the configuration, without constructing the unrequested
+        subtrees"""
+        if tree is None or self._large_file(conf) is not None:
+            return super()._loading(conf, ignore_nonexist, kind, tree)
+
+        content = self._read(conf, ignore_nonexist)
+        if content is None:
+            return {}
+        return _load_projected(content, {ANY: tree} if kind == "profiles" else tree)
+
+    async def _a_loading(
+        self,
+        conf: Any,
+        ignore_nonexist: bool,
+        kind: str,
+        tree: Projection | None,
+    ) -> Any:
+        """Asynchronously load the configuration, without constructing the
+        unrequested subtrees"""
+        if tree is None or self._large_file(conf) is not None:
+            return await super()._a_loading(conf, ignore_nonexist, kind, tree)
+
+        content = await self._a_read(conf, ignore_nonexist)
+        if content is None:
+            return {}
+        return _load_projected(content, {ANY: tree} if kind == "profiles" else tree)
 
 
 class YamlsLoader(NoConvertingPathMixin, YamlLoader):  # type: ignore[misc]
     """Yaml string loader"""
 
-    def loading(self, conf: Any, ignore_nonexist: bool) -> Dict[str, Any]:
-        """Load the configuration from a yaml file"""
-        return yaml.load(conf, Loader=yaml.FullLoader)
+    def _read(self, conf: Any, ignore_nonexist: bool) -> str | bytes | None:
+        """The configuration is the content itself"""
+        return conf
+
+    async def _a_read(self, conf: Any, ignore_nonexist: bool) -> str | bytes | None:
+        """The configuration is the content itself"""
+        return conf
 
 
 class YamlJ2Loader(YamlLoader, J2ModifierMixin):
@@ -0,0 +1,112 @@
+"""Projection of the configurations to the requested subtrees
+
+    from simpleconf import Config
+
+    conf = Config.load('config.toml', only=['database', 'cache.redis'])
+
+The loaded configurations are pruned right after they are parsed, before
+the values are casted and the configurations are merged. The loaders that
+can (e.g. the yaml loaders) skip building the unrequested subtrees at all.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Sequence
+
+# Matches any key, e.g. the profile names when loading with profiles
+ANY = object()
+
+# The projection tree, e.g. {"database": True, "cache": {"redis": True}}
+# True means the whole subtree is kept
+Projection = Dict[Any, Any]
+
+
+def projection_tree(only: Iterable[str]) -> Projection:
+    """Build the projection tree from the dotted paths
+
+    Args:
+        only: The dotted paths of the subtrees to keep,
+            e.g. `["database", "cache.redis"]`
+
+    Returns:
+        The projection tree
+    """
+    tree: Projection = {}
+    for path in only:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            sub = node.setdefault(part, {})
+            if sub is True:
+                # the ancestor is kept as a whole
+                break
+            node = sub
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def projection_kind(kind: str, only: Sequence[str] | None) -> str:
+    """Get the kind to cache the projected configuration with, so that it
+    is not mixed up with the full configuration
+
+    Args:
+        kind: `load` or `profiles`
+        only: The dotted paths of the subtrees to keep
+
+    Returns:
+        The kind with the projection
+    """
+    if only is None:
+        return kind
+    return f"{kind}:{','.join(sorted(only))}"
+
+
+def prune(data: Any, tree: Projection) -> Any:
+    """Prune the unrequested subtrees from the parsed configuration
+
+    The values that are not dicts are kept as a whole, even if deeper paths
+    are requested, as they may be casted into dicts later (e.g.
+    `@json:{...}`).
+
+    Args:
+        data: The parsed configuration
+        tree: The projection tree
+
+    Returns:
+        A new dict with only the requested subtrees, which are shared with
+        data rather than copied.
+    """
+    if not isinstance(data, Mapping):
+        return data
+
+    any_tree = tree.get(ANY)
+    out = {}
+    for key, value in data.items():
+        sub = tree.get(key, any_tree)
+        if sub is None:
+            continue
+        out[key] = value if sub is True else prune(value, sub)
+    return out
+
+
+def prune_profile_keys(data: Mapping[str, Any], tree: Projection) -> Dict[str, Any]:
+    """Prune the flat keys with profiles, e.g. `<PROFILE>_<key>` of .env
+    files and environment variables
+
+    The keys without profile names are kept, so that they can be warned
+    about when they are converted.
+
+    Args:
+        data: The parsed configuration with the flat keys
+        tree: The projection tree under the profiles
+
+    Returns:
+        A new dict with only the requested keys
+    """
+    if ANY in tree:
+        return dict(data)
+    return {
+        key: value
+        for key, value in data.items()
+        if "_" not in key or key.split("_", 1)[1] in tree
+    }
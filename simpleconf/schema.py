@@ -0,0 +1,358 @@
+"""Schemas to convert the string values of the configurations by
+
+The values loaded by the ini, env and osenv loaders are all strings, which
+are only casted when they have the prefixes (e.g. `@int:1`). With a schema,
+the values of the keys in it are converted directly to the types instead::
+
+    from simpleconf import Config
+    Config.load("config.env", schema={"PORT": int, "DEBUG": bool})
+
+A schema is a mapping from the keys to the types, with nested mappings or
+dotted keys (e.g. `"database.port"`) for the subtrees, or a dataclass, a
+TypedDict or a NamedTuple class. The types are converted by:
+
+- `str`: kept as it is, not casted by the prefixes
+- `bool`: `true`/`false`, `yes`/`no`, `on`/`off` or `1`/`0`, case-insensitive
+- `None`: an empty string, `none` or `null`, case-insensitive
+- `Optional[X]`: `None` as above, or converted as `X`
+- `Union[X, Y]`: converted as `X`, or as `Y` if it fails
+- `Literal[...]`: the value whose string is the same
+- `list`, `tuple`, `set`, `frozenset`, `dict` (and their generic forms),
+  dataclasses, TypedDicts and NamedTuples: parsed as JSON (into dicts for
+  the classes)
+- `Any`: casted by the prefixes, as if it was not in the schema
+- Others (e.g. `int`, `float`, `Path` and enums): called with the string
+
+The keys not in the schema are casted by the prefixes as usual.
+The compiled schemas of the classes are cached.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from threading import Lock
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Sequence, Tuple, Union
+
+from .projection import ANY
+
+Schema = Union[Mapping[str, Any], type]
+
+
+class SchemaNode(NamedTuple):
+    """A node of the compiled schema"""
+
+    # The type, for the error messages
+    type: Any
+    # Convert a string to the type. None to cast it by the prefixes.
+    convert: Callable[[str], Any] | None
+    # The nodes of the keys of the subtree, or ANY for all the keys
+    children: Dict[Any, "SchemaNode"] | None
+    # The rest are for validation only, see `simpleconf.validation`
+    # check(node, value, path, caster) -> the value converted and checked,
+    # instead of converting the strings only. None for not to check.
+    check: Callable[..., Any] | None = None
+    # The node of the items of the lists
+    items: SchemaNode | None = None
+    # The nodes of the types of the unions
+    members: Tuple[SchemaNode, ...] = ()
+    # The keys required in the mappings, checked after the configurations
+    # are merged. None if no keys are required in the whole subtree.
+    required: Tuple[str, ...] | None = None
+
+
+class CompiledSchema(NamedTuple):
+    """The compiled schema"""
+
+    # The nodes of the top-level keys
+    nodes: Dict[Any, SchemaNode]
+    # A string that identifies the schema, for the keys of the caches
+    fingerprint: str
+    # The node of the whole configuration, to validate it by
+    root: SchemaNode | None = None
+
+    @property
+    def tree(self) -> Dict[Any, SchemaNode] | SchemaNode:
+        """The nodes to cast the configurations by, or the root node to
+        validate them by"""
+        return self.nodes if self.root is None else self.root
+
+    @property
+    def profiles(self) -> Dict[Any, SchemaNode]:
+        """The nodes with the schema applied under every profile"""
+        if self.root is not None:
+            return {ANY: self.root}
+        return {ANY: SchemaNode(dict, None, self.nodes)}
+
+
+# The compiled schemas, by the classes
+_COMPILED: Dict[type, CompiledSchema] = {}
+_LOCK = Lock()
+_NONE_STRINGS = ("", "none", "null")
+_BOOLS = {
+    "true": True,
+    "yes": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "off": False,
+    "0": False,
+}
+
+
+def _to_bool(value: str) -> bool:
+    """Convert a string to bool"""
+    try:
+        return _BOOLS[value.lower()]
+    except KeyError:
+        raise ValueError(f"Expect a bool, got {value!r}") from None
+
+
+def _to_none(value: str) -> None:
+    """Convert a string to None"""
+    if value.lower() not in _NONE_STRINGS:
+        raise ValueError(f"Expect none or null, got {value!r}")
+    return None
+
+
+def _from_json(container: type) -> Callable[[str], Any]:
+    """Make a converter parsing a string as JSON into the container type"""
+
+    def _convert(value: str) -> Any:
+        out = json.loads(value)
+        if container in (dict, list):
+            if not isinstance(out, container):
+                raise ValueError(f"Expect a JSON {container.__name__}, got {value!r}")
+            return out
+        return container(out)
+
+    return _convert
+
+
+def _optional(convert: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Make a converter that also converts the none strings to None"""
+
+    def _convert(value: str) -> Any:
+        if value.lower() in _NONE_STRINGS:
+            return None
+        return convert(value)
+
+    return _convert
+
+
+def _first_of(converts: Sequence[Callable[[str], Any]]) -> Callable[[str], Any]:
+    """Make a converter that tries the converters in turn"""
+
+    def _convert(value: str) -> Any:
+        error = None
+        for convert in converts:
+            try:
+                return convert(value)
+            except Exception as exc:
+                error = exc
+        raise error  # type: ignore[misc]
+
+    return _convert
+
+
+def _one_of(values: Sequence[Any]) -> Callable[[str], Any]:
+    """Make a converter to one of the values, or the one with the same string"""
+
+    def _convert(value: str) -> Any:
+        if value in values:
+            return value
+        for val in values:
+            if str(val) == value:
+                return val
+        raise ValueError(f"Expect one of {list(values)!r}, got {value!r}")
+
+    return _convert
+
+
+def _union_converter(
+    converts: Sequence[Callable[[str], Any] | None],
+    optional: bool,
+) -> Callable[[str], Any] | None:
+    """Make the converter of a union from the converters of the types other
+    than None, or None if any of them is (`Any` in the union)"""
+    if any(convert is None for convert in converts):
+        return None
+    convert = _first_of(converts)  # type: ignore[arg-type]
+    return _optional(convert) if optional else convert
+
+
+def _is_union(origin: Any) -> bool:
+    """Check if the origin of a type is Union, including `X | Y`"""
+    if origin is Union:
+        return True
+    if sys.version_info >= (3, 10):  # pragma: no cover
+        from types import UnionType
+
+        return origin is UnionType
+    return False  # pragma: no cover
+
+
+def _is_typeddict(tp: Any) -> bool:
+    """Check if the type is a TypedDict class"""
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, "__total__")
+
+
+def _is_namedtuple(tp: Any) -> bool:
+    """Check if the type is a namedtuple class"""
+    return isinstance(tp, type) and issubclass(tp, tuple) and hasattr(tp, "_fields")
+
+
+def _field_types(tp: type) -> Dict[str, Any]:
+    """Get the types of the fields of a dataclass, a TypedDict or a
+    namedtuple"""
+    from typing import get_type_hints
+
+    hints = get_type_hints(tp)
+    if _is_typeddict(tp):
+        return hints
+    if _is_namedtuple(tp):
+        return {name: hints.get(name, Any) for name in tp._fields}  # type: ignore
+
+    from dataclasses import fields
+
+    return {field.name: hints.get(field.name, Any) for field in fields(tp)}
+
+
+def _compile_type(tp: Any) -> SchemaNode:
+    """Compile a type into a node"""
+    from dataclasses import is_dataclass
+    from typing import Literal, get_args, get_origin
+
+    if tp is Any:
+        return SchemaNode(tp, None, None)
+    if tp is str:
+        return SchemaNode(tp, str, None)
+    if tp is bool:
+        return SchemaNode(tp, _to_bool, None)
+    if tp is None or tp is type(None):
+        return SchemaNode(None, _to_none, None)
+    if isinstance(tp, Mapping):
+        return SchemaNode(dict, None, _compile_mapping(tp))
+    if (
+        (isinstance(tp, type) and is_dataclass(tp))
+        or _is_typeddict(tp)
+        or _is_namedtuple(tp)
+    ):
+        children = {key: _compile_type(val) for key, val in _field_types(tp).items()}
+        return SchemaNode(tp, _from_json(dict), children)
+
+    origin = get_origin(tp)
+    if _is_union(origin):
+        args = [arg for arg in get_args(tp) if arg is not type(None)]
+        nodes = [_compile_type(arg) for arg in args]
+        convert = _union_converter(
+            [node.convert for node in nodes], len(args) < len(get_args(tp))
+        )
+        children = next((node.children for node in nodes if node.children), None)
+        return SchemaNode(tp, convert, children)
+    if origin is Literal:
+        return SchemaNode(tp, _one_of(get_args(tp)), None)
+
+    container = origin or tp
+    if container in (list, tuple, set, frozenset, dict):
+        children = None
+        args = get_args(tp)
+        if container is dict and len(args) == 2:
+            children = {ANY: _compile_type(args[1])}
+        return SchemaNode(tp, _from_json(container), children)
+
+    if callable(tp) and origin is None:
+        return SchemaNode(tp, tp, None)
+
+    raise TypeError(f"Unsupported type in schema: {tp!r}")
+
+
+def _compile_mapping(mapping: Mapping[str, Any]) -> Dict[Any, SchemaNode]:
+    """Compile a mapping of the keys or dotted paths to the types"""
+    nested: Dict[str, Any] = {}
+    for key, tp in mapping.items():
+        parts = key.split(".")
+        node = nested
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Conflicting types in schema for {key!r}")
+        if parts[-1] in node:
+            raise ValueError(f"Conflicting types in schema for {key!r}")
+        node[parts[-1]] = dict(tp) if isinstance(tp, Mapping) else tp
+
+    return {key: _compile_type(tp) for key, tp in nested.items()}
+
+
+def _is_named(tp: type) -> bool:
+    """Check if the class is the one found by its module and qualified name"""
+    found: Any = sys.modules.get(tp.__module__)
+    for name in tp.__qualname__.split("."):
+        found = getattr(found, name, None)
+    return found is tp
+
+
+def _type_repr(tp: Any) -> str:
+    """The repr of a type for the fingerprints, with the ids of the classes
+    in it that can't be found by their names (e.g. defined in functions), so
+    that they are told apart from the others with the same names, while the
+    fingerprints of the rest stay the same across processes"""
+    from typing import get_args
+
+    ids = []
+    stack = [tp]
+    while stack:
+        arg = stack.pop()
+        if isinstance(arg, type) and not _is_named(arg):
+            ids.append(f"{id(arg):x}")
+        stack.extend(get_args(arg))
+    return f"{tp!r}@{'.'.join(ids)}" if ids else repr(tp)
+
+
+def _fingerprint(nodes: Dict[Any, SchemaNode]) -> str:
+    """Compose the string that identifies the compiled nodes"""
+    parts = []
+    for key, node in nodes.items():
+        name = "*" if key is ANY else key
+        part = f"{name}:{_type_repr(node.type)}"
+        if node.children:
+            part = f"{part}{{{_fingerprint(node.children)}}}"
+        parts.append(part)
+    return ",".join(sorted(parts))
+
+
+def compile_schema(schema: Schema | CompiledSchema) -> CompiledSchema:
+    """Compile the schema, or get the compiled one if it is a class
+
+    Args:
+        schema: A mapping of the keys or dotted paths to the types, or a
+            dataclass, TypedDict or NamedTuple class
+
+    Returns:
+        The CompiledSchema object
+
+    Raises:
+        TypeError: If the schema or any of the types is not supported
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema
+
+    if isinstance(schema, Mapping):
+        nodes = _compile_mapping(schema)
+        return CompiledSchema(nodes, _fingerprint(nodes))
+
+    try:
+        return _COMPILED[schema]
+    except (KeyError, TypeError):
+        pass
+
+    node = _compile_type(schema)
+    if node.children is None or not isinstance(schema, type):
+        raise TypeError(
+            "Expect a mapping, a dataclass, a TypedDict or a NamedTuple class "
+            "as schema, "
+            f"got {schema!r}"
+        )
+    compiled = CompiledSchema(node.children, _fingerprint(node.children))
+    with _LOCK:
+        return _COMPILED.setdefault(schema, compiled)
@@ -0,0 +1,287 @@
+"""Building the configurations as instances of dataclasses or namedtuples
+
+    from dataclasses import dataclass
+    from simpleconf import Config
+
+    @dataclass(slots=True)
+    class Database:
+        host: str
+        port: int = 5432
+
+    @dataclass(slots=True)
+    class AppConfig:
+        debug: bool
+        database: Database
+
+    conf = Config.load_as(AppConfig, "config.toml", "config.env")
+    # conf.database.port == 5432
+
+The instances are built directly from the loaded configurations, without
+merging them into a Diot object first. Each field is looked up from the
+last configuration down, and the configurations with a mapping for a nested
+dataclass or namedtuple are merged field by field as the nested instance is
+built. The values of the other fields are plain python objects, with the
+mappings merged into dicts.
+
+The keys are matched with the names of the fields exactly (e.g.
+`log-level` is not taken as `log_level`). The keys that are not fields are
+ignored, and are pruned right after the configurations are parsed. The
+string values (e.g. of .env files) are converted by the types of the
+fields, see `simpleconf.schema`.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from threading import Lock
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type, TypeVar
+
+from .exceptions import ValidationError
+from .schema import _field_types, _is_namedtuple, _is_union
+
+T = TypeVar("T")
+# build(layers, path) -> the instance
+Builder = Callable[[Sequence[Mapping[str, Any]], Tuple[Any, ...]], Any]
+# build(values, path) -> the value of a field, from its values in the layers
+FieldBuilder = Callable[[List[Any], Tuple[Any, ...]], Any]
+
+_MISSING = object()
+# The compiled builders, by the classes
+_BUILDERS: Dict[type, Builder] = {}
+# The dotted paths of the fields, by the classes
+_PATHS: Dict[type, List[str]] = {}
+_LOCK = Lock()
+
+
+def _is_buildable(tp: Any) -> bool:
+    """Check if the type is a dataclass or a namedtuple class"""
+    from dataclasses import is_dataclass
+
+    return isinstance(tp, type) and (is_dataclass(tp) or _is_namedtuple(tp))
+
+
+def _plain(value: Any) -> Any:
+    """Convert the Diot objects in the value into dicts, recursively"""
+    if isinstance(value, Mapping):
+        return {key: _plain(val) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_plain(val) for val in value]
+    return value
+
+
+def _merge_plain(layers: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Merge the mappings into a dict, the same way as `merge_layers()`"""
+    out: Dict[str, Any] = {}
+    for layer in layers:
+        for key, val in layer.items():
+            prev = out.get(key)
+            if isinstance(val, Mapping) and isinstance(prev, dict):
+                out[key] = _merge_plain([prev, val])
+            else:
+                out[key] = _plain(val)
+    return out
+
+
+def _trailing_mappings(values: List[Any]) -> List[Mapping[str, Any]] | None:
+    """Get the values to merge: the mappings after the last value that is
+    not a mapping, or None if the last value is not a mapping"""
+    if not isinstance(values[-1], Mapping):
+        return None
+    start = len(values) - 1
+    while start > 0 and isinstance(values[start - 1], Mapping):
+        start -= 1
+    return values[start:]
+
+
+def _build_value(values: List[Any], path: Tuple[Any, ...]) -> Any:
+    """Build the value of a field that is not a dataclass or a namedtuple"""
+    mappings = _trailing_mappings(values)
+    if mappings is None:
+        return _plain(values[-1])
+    return _merge_plain(mappings)
+
+
+def _nested(tp: type) -> FieldBuilder:
+    """Make the builder of a field of a dataclass or a namedtuple"""
+
+    def _build(values: List[Any], path: Tuple[Any, ...]) -> Any:
+        mappings = _trailing_mappings(values)
+        if mappings is None:
+            # e.g. None for Optional
+            return _plain(values[-1])
+        # compiled on first use, for the classes referring to themselves
+        return compile_builder(tp)(mappings, path)
+
+    return _build
+
+
+def _nested_items(tp: type, mapping: bool) -> FieldBuilder:
+    """Make the builder of a field of a list or a dict of the dataclasses
+    or namedtuples"""
+
+    def _build(values: List[Any], path: Tuple[Any, ...]) -> Any:
+        value = _build_value(values, path)
+        builder = compile_builder(tp)
+        if mapping and isinstance(value, dict):
+            return {
+                key: builder([val], (*path, key)) if isinstance(val, dict) else val
+                for key, val in value.items()
+            }
+        if not mapping and isinstance(value, list):
+            return [
+                builder([val], (*path, i)) if isinstance(val, dict) else val
+                for i, val in enumerate(value)
+            ]
+        return value
+
+    return _build
+
+
+def _compile_field(tp: Any) -> FieldBuilder:
+    """Compile the builder of a field by its type"""
+    from typing import get_args, get_origin
+
+    if _is_buildable(tp):
+        return _nested(tp)
+
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if _is_union(origin):
+        nested = next((arg for arg in args if _is_buildable(arg)), None)
+        return _build_value if nested is None else _nested(nested)
+
+    if origin in (list, tuple) and args and _is_buildable(args[0]):
+        return _nested_items(args[0], False)
+    if origin is dict and len(args) == 2 and _is_buildable(args[1]):
+        return _nested_items(args[1], True)
+    return _build_value
+
+
+def _fields(tp: type) -> List[Tuple[str, Any, bool]]:
+    """Get the names, types and whether required of the fields"""
+    types = _field_types(tp)
+    if _is_namedtuple(tp):
+        defaults = tp._field_defaults  # type: ignore[attr-defined]
+        return [(name, types[name], name not in defaults) for name in types]
+
+    from dataclasses import MISSING, fields
+
+    return [
+        (
+            field.name,
+            types[field.name],
+            field.default is MISSING and field.default_factory is MISSING,
+        )
+        for field in fields(tp)
+        if field.init
+    ]
+
+
+def _compile_class(tp: type) -> Builder:
+    """Compile the builder of a dataclass or a namedtuple"""
+    specs = [
+        (name, _compile_field(ftype), required) for name, ftype, required in _fields(tp)
+    ]
+
+    def _build(layers: Sequence[Mapping[str, Any]], path: Tuple[Any, ...]) -> Any:
+        # the keys are matched exactly, skipping the key transforms of Diot
+        gets = [
+            dict.get if isinstance(layer, dict) else type(layer).get
+            for layer in layers
+        ]
+        kwargs = {}
+        for name, build_field, required in specs:
+            values = [
+                value
+                for get, layer in zip(gets, layers)
+                if (value := get(layer, name, _MISSING)) is not _MISSING
+            ]
+            if values:
+                kwargs[name] = build_field(values, (*path, name))
+            elif required:
+                raise ValidationError(path, f"missing required key(s): {name}")
+        return tp(**kwargs)
+
+    return _build
+
+
+def compile_builder(tp: type) -> Builder:
+    """Compile the builder of a dataclass or a namedtuple, or get the
+    compiled one
+
+    Args:
+        tp: The dataclass or namedtuple class
+
+    Returns:
+        The builder, called with the layers of the configurations and the
+        path of them (`()` for the whole configurations)
+
+    Raises:
+        TypeError: If the class is not a dataclass or a namedtuple
+    """
+    try:
+        return _BUILDERS[tp]
+    except (KeyError, TypeError):
+        pass
+
+    if not _is_buildable(tp):
+        raise TypeError(f"Expect a dataclass or a namedtuple class, got {tp!r}")
+
+    builder = _compile_class(tp)
+    with _LOCK:
+        return _BUILDERS.setdefault(tp, builder)
+
+
+def field_paths(tp: type) -> List[str]:
+    """Get the dotted paths of the fields, to prune the loaded
+    configurations by
+
+    Args:
+        tp: The dataclass or namedtuple class
+
+    Returns:
+        The dotted paths of the fields, with the nested dataclasses or
+        namedtuples expanded
+    """
+    from typing import get_args, get_origin
+
+    def _paths(cls: type, prefix: str, seen: Tuple[type, ...]) -> List[str]:
+        out = []
+        for name, ftype, _ in _fields(cls):
+            path = f"{prefix}{name}"
+            if _is_union(get_origin(ftype)):
+                args = get_args(ftype)
+                ftype = next((arg for arg in args if _is_buildable(arg)), None)
+            if _is_buildable(ftype) and ftype not in seen:
+                # the whole subtree for the classes without fields
+                out.extend(_paths(ftype, f"{path}.", (*seen, ftype)) or [path])
+            else:
+                out.append(path)
+        return out
+
+    try:
+        return _PATHS[tp]
+    except (KeyError, TypeError):
+        pass
+
+    if not _is_buildable(tp):
+        raise TypeError(f"Expect a dataclass or a namedtuple class, got {tp!r}")
+    paths = _paths(tp, "", (tp,))
+    with _LOCK:
+        return _PATHS.setdefault(tp, paths)
+
+
+def build(tp: Type[T], layers: Sequence[Mapping[str, Any]]) -> T:
+    """Build the instance of the class from the layers of the configurations
+
+    Args:
+        tp: The dataclass or namedtuple class
+        layers: The configurations. Latter ones override the former ones
+            for items with the same keys recursively.
+
+    Returns:
+        The instance
+
+    Raises:
+        ValidationError: If any required field is missing
+    """
+    return compile_builder(tp)(layers, ())
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
+import os
 import re
-from pathlib import Path
+from functools import lru_cache
 from importlib import import_module
 from types import ModuleType
-from typing import Any
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from diot import Diot
 
 from .exceptions import FormatNotSupported
-from .loaders import Loader
+from .loaders import Loader, PreloadedPath
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
 
 POOL_KEY = "_SIMPLECONF_POOL"
 META_KEY = "_SIMPLECONF_META"
+# Where the index by dotted paths is attached to the Diot object,
+# out of its items
+INDEX_ATTR = "__simpleconf_index__"
 
 _LOADER_DIRECTIVE_RE = re.compile(
     r"^\s*(?:#|;|//)\s*simpleconf-loader:\s*(\S+)",
@@ -33,6 +54,9 @@ def detect_loader_directive(conf: Any, current_ext: str) -> str:
     expanded relative to the base format of *current_ext*.
     Any other value is used verbatim as the loader extension.
 
+    Only the first line of the file is read. If the file has been read
+    already (a `PreloadedPath`), no more I/O is done.
+
     Args:
         conf: The configuration source.  Dicts and stream objects are
             ignored (returns *current_ext* unchanged).
@@ -45,14 +69,16 @@ def detect_loader_directive(conf: Any, current_ext: str) -> str:
     if isinstance(conf, dict) or hasattr(conf, "read"):
         return current_ext
 
-    path = Path(conf)
-    if not path.exists():
-        return current_ext
+    if isinstance(conf, PreloadedPath):
+        first_line = conf.first_line()
+    else:
+        from pathlib import Path
 
-    try:
-        first_line = path.read_text(errors="replace").split("\n", 1)[0]
-    except Exception:
-        return current_ext
+        try:
+            with Path(conf).open("rb") as fh:
+                first_line = fh.readline().decode(errors="replace")
+        except Exception:
+            return current_ext
 
     match = _LOADER_DIRECTIVE_RE.match(first_line)
     if not match:
@@ -79,24 +105,40 @@ def config_to_ext(conf: Any, secondary: bool = True) -> str:
     if isinstance(conf, dict):
         return "dict"
 
-    conf = Path(conf)
-    out = conf.suffix.lstrip(".").lower()
+    return _path_to_ext(os.fspath(conf), secondary)
+
+
+def _split_suffix(name: str) -> Tuple[str, str]:
+    """Split the file name into stem and suffix, the same way as pathlib
+    (which is not imported for this)"""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
+
+
+@lru_cache(maxsize=1024)
+def _path_to_ext(path: str, secondary: bool = True) -> str:
+    """Find the extension(flag) of a configuration file"""
+    name = os.path.basename(path.rstrip("/\\"))
+    stem, suffix = _split_suffix(name)
+    out = suffix.lstrip(".").lower()
     if out in ('j2', 'jinja2', 'jinja'):
         # x.toml.j2
-        return config_to_ext(conf.stem) + '.j2'
+        return config_to_ext(stem) + '.j2'
     if out in ('liq', 'liquid'):
         # x.toml.liq
-        return config_to_ext(conf.stem) + '.liq'
+        return config_to_ext(stem) + '.liq'
 
     if secondary:
-        secondary_suffix = conf.with_suffix("").suffix.lstrip(".").lower()
+        secondary_suffix = _split_suffix(stem)[1].lstrip(".").lower()
         # x.j2.toml
         if secondary_suffix in ('j2', 'jinja2', 'jinja'):
-            return config_to_ext(conf, secondary=False) + '.j2'
+            return config_to_ext(path, secondary=False) + '.j2'
         if secondary_suffix in ('liq', 'liquid'):
-            return config_to_ext(conf, secondary=False) + '.liq'
+            return config_to_ext(path, secondary=False) + '.liq'
 
-    if not out and conf.name.lower().endswith("rc"):
+    if not out and name.lower().endswith("rc"):
         out = "rc"
 
     if out in ("ini", "rc", "cfg", "conf", "config"):
@@ -108,104 +150,97 @@ def config_to_ext(conf: Any, secondary: bool = True) -> str:
     return out
 
 
-def get_loader(ext: str | Loader) -> Loader:
-    """Get the loader for the extension"""
-    if isinstance(ext, Loader):
-        return ext
-
-    if ext == "dict":
-        from .loaders.dict import DictLoader
-        return DictLoader()
-
-    if ext == "dicts":
-        from .loaders.dict import DictsLoader
-        return DictsLoader()
-
-    if ext == "env":
-        from .loaders.env import EnvLoader
-        return EnvLoader()
-
-    if ext == "env.j2":
-        from .loaders.env import EnvJ2Loader
-        return EnvJ2Loader()
+# The entry point group for third-party loaders, for example, in pyproject.toml:
+# [project.entry-points."simpleconf.loaders"]
+# xml = "mypackage.loaders:XmlLoader"
+LOADER_ENTRY_POINT_GROUP = "simpleconf.loaders"
+
+# The registry of the loaders, from the extension(flag) to the loader class
+# or "module:class" to be imported on first use
+LOADERS: Dict[str, Union[str, Type[Loader]]] = {
+    "dict": "simpleconf.loaders.dict:DictLoader",
+    "dicts": "simpleconf.loaders.dict:DictsLoader",
+    "env": "simpleconf.loaders.env:EnvLoader",
+    "env.j2": "simpleconf.loaders.env:EnvJ2Loader",
+    "env.liq": "simpleconf.loaders.env:EnvLiqLoader",
+    "envs": "simpleconf.loaders.env:EnvsLoader",
+    "ini": "simpleconf.loaders.ini:IniLoader",
+    "ini.j2": "simpleconf.loaders.ini:IniJ2Loader",
+    "ini.liq": "simpleconf.loaders.ini:IniLiqLoader",
+    "inis": "simpleconf.loaders.ini:InisLoader",
+    "json": "simpleconf.loaders.json:JsonLoader",
+    "json.j2": "simpleconf.loaders.json:JsonJ2Loader",
+    "json.liq": "simpleconf.loaders.json:JsonLiqLoader",
+    "jsons": "simpleconf.loaders.json:JsonsLoader",
+    "osenv": "simpleconf.loaders.osenv:OsenvLoader",
+    "toml": "simpleconf.loaders.toml:TomlLoader",
+    "toml.j2": "simpleconf.loaders.toml:TomlJ2Loader",
+    "toml.liq": "simpleconf.loaders.toml:TomlLiqLoader",
+    "tomls": "simpleconf.loaders.toml:TomlsLoader",
+    "yaml": "simpleconf.loaders.yaml:YamlLoader",
+    "yaml.j2": "simpleconf.loaders.yaml:YamlJ2Loader",
+    "yaml.liq": "simpleconf.loaders.yaml:YamlLiqLoader",
+    "yamls": "simpleconf.loaders.yaml:YamlsLoader",
+}
+
+# The loaders are stateless, so one instance per extension is shared
+_LOADER_INSTANCES: Dict[str, Loader] = {}
+_ENTRY_POINTS_LOADED = False
+
+
+def register_loader(ext: str, loader: str | Type[Loader]) -> None:
+    """Register a loader for the extension(flag)
 
-    if ext == "env.liq":
-        from .loaders.env import EnvLiqLoader
-        return EnvLiqLoader()
-
-    if ext == "envs":
-        from .loaders.env import EnvsLoader
-        return EnvsLoader()
-
-    if ext == "ini":
-        from .loaders.ini import IniLoader
-        return IniLoader()
-
-    if ext == "ini.j2":
-        from .loaders.ini import IniJ2Loader
-        return IniJ2Loader()
-
-    if ext == "ini.liq":
-        from .loaders.ini import IniLiqLoader
-        return IniLiqLoader()
-
-    if ext == "inis":
-        from .loaders.ini import InisLoader
-        return InisLoader()
-
-    if ext == "json":
-        from .loaders.json import JsonLoader
-        return JsonLoader()
-
-    if ext == "json.j2":
-        from .loaders.json import JsonJ2Loader
-        return JsonJ2Loader()
+    Args:
+        ext: The extension(flag), e.g. `xml` or `xml.j2`
+        loader: The loader class, or "module:class" to import it on first use
+    """
+    LOADERS[ext] = loader
+    _LOADER_INSTANCES.pop(ext, None)
 
-    if ext == "json.liq":
-        from .loaders.json import JsonLiqLoader
-        return JsonLiqLoader()
 
-    if ext == "jsons":
-        from .loaders.json import JsonsLoader
-        return JsonsLoader()
+def _load_entry_points() -> None:
+    """Register the loaders from the entry points, without overriding the
+    registered ones"""
+    from importlib.metadata import entry_points
 
-    if ext == "osenv":
-        from .loaders.osenv import OsenvLoader
-        return OsenvLoader()
+    global _ENTRY_POINTS_LOADED
+    _ENTRY_POINTS_LOADED = True
 
-    if ext == "toml":
-        from .loaders.toml import TomlLoader
-        return TomlLoader()
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        group = eps.select(group=LOADER_ENTRY_POINT_GROUP)
+    else:  # pragma: no cover, python < 3.10
+        group = eps.get(LOADER_ENTRY_POINT_GROUP, ())
 
-    if ext == "toml.j2":
-        from .loaders.toml import TomlJ2Loader
-        return TomlJ2Loader()
+    for ep in group:
+        LOADERS.setdefault(ep.name, ep.value)
 
-    if ext == "toml.liq":
-        from .loaders.toml import TomlLiqLoader
-        return TomlLiqLoader()
 
-    if ext == "tomls":
-        from .loaders.toml import TomlsLoader
-        return TomlsLoader()
+def get_loader(ext: str | Loader) -> Loader:
+    """Get the loader for the extension"""
+    if isinstance(ext, Loader):
+        return ext
 
-    if ext == "yaml":
-        from .loaders.yaml import YamlLoader
-        return YamlLoader()
+    try:
+        return _LOADER_INSTANCES[ext]
+    except KeyError:
+        pass
 
-    if ext == "yaml.j2":
-        from .loaders.yaml import YamlJ2Loader
-        return YamlJ2Loader()
+    if ext not in LOADERS and not _ENTRY_POINTS_LOADED:
+        _load_entry_points()
 
-    if ext == "yaml.liq":
-        from .loaders.yaml import YamlLiqLoader
-        return YamlLiqLoader()
+    try:
+        loader = LOADERS[ext]
+    except (KeyError, TypeError):
+        raise FormatNotSupported(f"{ext} is not supported.") from None
 
-    if ext == "yamls":
-        from .loaders.yaml import YamlsLoader
-        return YamlsLoader()
+    if isinstance(loader, str):
+        module, _, name = loader.partition(":")
+        loader = LOADERS[ext] = getattr(import_module(module), name)
 
-    raise FormatNotSupported(f"{ext} is not supported.")
+    instance = _LOADER_INSTANCES[ext] = loader()  # type: ignore[operator]
+    return instance
 
 
 def require_package(package: str, *fallbacks: str) -> ModuleType:
@@ -226,3 +261,208 @@ def require_package(package: str, *fallbacks: str) -> ModuleType:
             ) from None
         else:
             raise ImportError(f"'{package}' is not installed.") from None
+
+
+async def gather_limited(
+    funcs: Sequence[Callable[[], Awaitable[Any]]],
+    limit: int | None = None,
+) -> List[Any]:
+    """Run the coroutine functions concurrently and return their results in
+    the given order
+
+    Args:
+        funcs: The coroutine functions (without arguments) to run
+        limit: The maximum number of coroutines running at the same time
+            None or a non-positive number means no limit
+
+    Returns:
+        The results, in the same order as `funcs`
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(limit) if limit and limit > 0 else None
+
+    async def _run(func: Callable[[], Awaitable[Any]]) -> Any:
+        if semaphore is None:
+            return await func()
+        async with semaphore:
+            return await func()
+
+    tasks = [asyncio.ensure_future(_run(func)) for func in funcs]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave the other fetches running in the background
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def _normalize_loaders(
+    configs: Sequence[Any],
+    loader: str | Loader | Sequence[str | Loader | None] | None,
+) -> Sequence[str | Loader | None]:
+    """Get the loaders of the configurations, one for each
+
+    Args:
+        configs: The configurations
+        loader: The loader for all the configurations, or the loaders of
+            them, one for each
+
+    Returns:
+        The loaders, one for each configuration
+
+    Raises:
+        ValueError: If the number of the loaders does not match
+    """
+    if not isinstance(loader, Sequence) or isinstance(loader, str):
+        return [loader] * len(configs)
+
+    if len(loader) != len(configs):
+        raise ValueError(
+            f"Length of loader ({len(loader)}) does not match "
+            f"length of configs ({len(configs)})"
+        )
+    return loader
+
+
+def run_parallel(
+    funcs: Sequence[Callable[[], Any]],
+    parallel: bool | int = False,
+    executor: Executor | None = None,
+) -> List[Any]:
+    """Run the functions, optionally on a thread pool, and return their
+    results in the given order
+
+    Args:
+        funcs: The functions (without arguments) to run
+        parallel: Whether to run the functions on a thread pool.
+            An integer (> 1) is used as the maximum number of threads.
+        executor: An existing executor to run the functions on.
+            It is not shut down afterwards. Implies `parallel`.
+
+    Returns:
+        The results, in the same order as `funcs`
+    """
+    if executor is not None:
+        futures = [executor.submit(func) for func in funcs]
+        return [future.result() for future in futures]
+
+    if not parallel or len(funcs) < 2:
+        return [func() for func in funcs]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_workers = None if parallel is True else int(parallel)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(func) for func in funcs]
+        return [future.result() for future in futures]
+
+
+# Used to bypass the overhead of Diot for the keys that already exist,
+# whose attribute names are already registered.
+_dict_get = dict.get
+_dict_set = dict.__setitem__
+_dict_contains = dict.__contains__
+_CONTAINERS = (dict, list, tuple)
+
+
+def _assign(target: Diot, key: str, value: Any) -> None:
+    """Assign the value to the key of the target"""
+    if _dict_contains(target, key) and (
+        isinstance(value, Diot) or not isinstance(value, _CONTAINERS)
+    ):
+        # no need to register the key or to nest the value
+        _dict_set(target, key, value)
+    else:
+        target[key] = value
+
+
+def _copy_diot(dct: Diot) -> Diot:
+    """Shallow copy a Diot object, without registering the keys and nesting
+    the values again like `Diot.copy()`"""
+    out = dct.__class__(
+        diot_nest=dct.__diot__["nest"],
+        diot_transform=dct.__diot__["transform"],
+        diot_missing=dct.__diot__["missing"],
+    )
+    dict.update(out, dct)
+    out.__diot__["keymaps"].update(dct.__diot__["keymaps"])
+    return out
+
+
+def _merge_into(target: Diot, dicts: Sequence[Mapping], copy: bool) -> Diot:
+    """Merge the dicts into the target recursively, in one pass"""
+    if len(dicts) == 1:
+        grouped = {key: [value] for key, value in dicts[0].items()}
+    else:
+        grouped = {}
+        for dct in dicts:
+            for key, value in dct.items():
+                try:
+                    grouped[key].append(value)
+                except KeyError:
+                    grouped[key] = [value]
+
+    for key, values in grouped.items():
+        last = values[-1]
+        if not isinstance(last, dict):
+            _assign(target, key, last)
+            continue
+
+        # a value that is not a dict replaces the former ones,
+        # and the dicts after it are merged recursively
+        start = 0
+        for i in range(len(values) - 2, -1, -1):
+            if not isinstance(values[i], dict):
+                start = i + 1
+                break
+
+        current = _dict_get(target, key) if start == 0 else None
+        if isinstance(current, Diot):
+            rest = values
+        else:
+            current, rest = values[start], values[start + 1:]
+
+        if not rest:
+            _assign(target, key, current)
+            continue
+
+        if copy or not isinstance(current, Diot):
+            current = (
+                _copy_diot(current) if isinstance(current, Diot) else Diot(current)
+            )
+        _assign(target, key, _merge_into(current, rest, copy))
+
+    return target
+
+
+def merge_layers(layers: Sequence[Mapping[str, Any]], copy: bool = False) -> Diot:
+    """Merge the layers of configurations in one pass
+
+    Latter layers override the former ones for items with the same keys
+    recursively, the same as updating an empty Diot with the layers one by
+    one with `Diot.update_recursively()`, but each key is only assigned
+    once, with its final value.
+
+    Args:
+        layers: The layers to merge
+        copy: Whether to keep the layers unchanged.
+            If False, the layers (just loaded and not used elsewhere, never
+            the ones given by the callers) are updated in place, and the
+            first one is returned if it is a Diot object. If True, only the
+            subtrees that are overridden are copied, others are shared with
+            the layers.
+
+    Returns:
+        The merged configuration
+    """
+    if not layers:
+        return Diot()
+
+    first = layers[0]
+    if copy or not isinstance(first, Diot):
+        first = _copy_diot(first) if isinstance(first, Diot) else Diot(first)
+    if len(layers) == 1:
+        return first
+    return _merge_into(first, layers[1:], copy)
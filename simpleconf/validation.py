@@ -0,0 +1,677 @@
+"""Validating the loaded configurations against a schema
+
+The schema is compiled once into the nodes of `simpleconf.schema`, with
+the types checked by them. The values are converted by the loaders in the
+same walk as they are casted, with the ones that do not match kept as they
+are. The merged configuration is then checked, with the dotted path of the
+first value that does not match reported::
+
+    from simpleconf import Config
+    Config.load("config.toml", "config.env", validate=AppConfig)
+
+A schema is a dataclass, a TypedDict or a NamedTuple class, or a JSON
+Schema. The fields of the classes without defaults (or in
+`__required_keys__` of the TypedDicts) are required. The types are checked by:
+
+- `Any`: any value
+- `str`, `int`, `float`, `bool`, `None`: the values of the types (`bool`
+  is not taken as `int`, and `int` is taken as `float`)
+- `Optional[X]`, `Union[X, Y]`: the first type that the value matches
+- `Literal[...]`: one of the values
+- `list`, `tuple`, `set`, `frozenset` (and their generic forms): lists,
+  with the items checked
+- `dict`, `Dict[str, X]`, dataclasses, TypedDicts and NamedTuples:
+  mappings, with the values checked
+- Others (e.g. `Path` and enums): instances of them
+
+The strings are casted by the prefixes first with the ini, env and osenv
+loaders. Then they are converted to the types the same way as by
+`simpleconf.schema` (e.g. `"8080"` for an integer, `"off"` for a bool and
+`"null"` for `Optional[str]`), except that the strings are kept as they are
+for `str`.
+
+The keywords supported of JSON Schema are `type`, `properties`, `required`,
+`additionalProperties`, `items`, `enum`, `minimum` and `maximum`, with the
+annotations (e.g. `title` and `description`) ignored.
+
+The keys not in the schema are allowed, except for the objects of JSON
+Schema with `additionalProperties` false. As the configurations are checked
+after they are merged, a value that does not match does not fail the
+loading if it is overridden by a later configuration. The compiled schemas
+are cached.
+"""
+from __future__ import annotations
+
+import json
+from threading import Lock
+from typing import Any, Callable, Collection, Dict, Iterable, Mapping, Tuple
+
+from .caster import _cast, _cast_schema, cast
+from .exceptions import ValidationError
+from .projection import ANY
+from .schema import (
+    CompiledSchema,
+    Schema,
+    SchemaNode,
+    _compile_type as _schema_type,
+    _field_types,
+    _is_namedtuple,
+    _is_typeddict,
+    _is_union,
+    _one_of,
+    _type_repr,
+    _union_converter,
+    compile_schema,
+)
+
+# check(node, value, path, caster) -> the value, converted if needed
+#   caster: The compiled casters to cast the strings by their prefixes
+#     first, None for the values not loaded by the ini, env or osenv loaders
+Checker = Callable[[SchemaNode, Any, Tuple[Any, ...], Any], Any]
+
+# The compiled schemas, by the classes or the JSON Schemas dumped
+_COMPILED: Dict[Any, CompiledSchema] = {}
+_LOCK = Lock()
+
+# The types accepted, by the types
+_SCALARS: Dict[Any, Any] = {
+    str: str,
+    int: int,
+    float: (int, float),
+    bool: bool,
+    None: type(None),
+}
+_ARRAYS = (list, tuple, set, frozenset)
+_JSON_TYPES: Dict[str, Any] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": None,
+    "object": dict,
+    "array": list,
+}
+_JSON_KEYWORDS = {
+    "type",
+    "properties",
+    "required",
+    "additionalProperties",
+    "items",
+    "enum",
+    "minimum",
+    "maximum",
+}
+_JSON_ANNOTATIONS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "default",
+    "examples",
+}
+
+
+def _from_string(
+    node: SchemaNode,
+    name: str,
+    value: str,
+    path: Tuple[Any, ...],
+    caster: Any,
+) -> Any:
+    """Cast a string by its prefix, or convert it by the node"""
+    if caster is not None:
+        casted = caster(value)
+        if casted is not value:
+            return casted
+    try:
+        return node.convert(value)  # type: ignore[misc]
+    except (TypeError, ValueError):
+        raise ValidationError(path, f"expect {name}, got {value!r}") from None
+
+
+def _any(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+    """Accept any value, casted by the prefixes"""
+    return value if caster is None else caster(value)
+
+
+def _scalar(
+    name: str,
+    accept: type | Tuple[type, ...],
+    convert: Callable[[str], Any],
+) -> Checker:
+    """Make a checker of the values of the types, or the strings that can
+    be converted to them"""
+    no_bool = bool not in (accept if isinstance(accept, tuple) else (accept,))
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        # the strings are kept as they are for str
+        if isinstance(value, accept) and not (no_bool and isinstance(value, bool)):
+            return value
+        if isinstance(value, str):
+            casted = value if caster is None else caster(value)
+            if casted is value:
+                try:
+                    return convert(value)
+                except (TypeError, ValueError):
+                    pass
+            elif isinstance(casted, accept) and not (
+                no_bool and isinstance(casted, bool)
+            ):
+                return casted
+        raise ValidationError(path, f"expect {name}, got {value!r}")
+
+    return _check
+
+
+def _union(name: str) -> Checker:
+    """Make a checker of the values that match any of the members"""
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        if isinstance(value, str):
+            value = _from_string(node, name, value, path, caster)
+            caster = None
+        for member in node.members:
+            try:
+                return member.check(member, value, path, caster)  # type: ignore
+            except ValidationError:
+                pass
+        raise ValidationError(path, f"expect {name}, got {value!r}")
+
+    return _check
+
+
+def _constrained(
+    checker: Checker,
+    enum: Collection[Any] | None,
+    minimum: float | None,
+    maximum: float | None,
+) -> Checker:
+    """Make a checker that also checks the values against the constraints"""
+    one_of = None if enum is None else _one_of(list(enum))
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        if one_of is not None and isinstance(value, str):
+            try:
+                value = one_of(value)
+            except ValueError:
+                pass
+        value = checker(node, value, path, caster)
+        if enum is not None and value not in enum:
+            raise ValidationError(path, f"expect one of {list(enum)!r}, got {value!r}")
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            # the bounds are for the numbers only
+            return value
+        if minimum is not None and value < minimum:
+            raise ValidationError(path, f"expect >= {minimum!r}, got {value!r}")
+        if maximum is not None and value > maximum:
+            raise ValidationError(path, f"expect <= {maximum!r}, got {value!r}")
+        return value
+
+    return _check
+
+
+def _array(name: str) -> Checker:
+    """Make a checker of the lists, with the items checked"""
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        if isinstance(value, str):
+            value = _from_string(node, name, value, path, caster)
+        if not isinstance(value, _ARRAYS):
+            raise ValidationError(path, f"expect {name}, got {value!r}")
+        item = node.items
+        if item is None:
+            return value
+
+        out = None
+        for i, val in enumerate(value):
+            new = item.check(item, val, (*path, i), None)  # type: ignore[misc]
+            if new is not val:
+                if out is None:
+                    out = list(value)
+                out[i] = new
+        return value if out is None else out
+
+    return _check
+
+
+def _object(name: str, allowed: Collection[str] | None) -> Checker:
+    """Make a checker of the mappings, with the values checked by the
+    children of the node
+
+    `allowed` is the keys allowed, None to allow any keys.
+    """
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        if isinstance(value, str):
+            value = _from_string(node, name, value, path, caster)
+            # the values parsed from the strings are not casted by the prefixes
+            caster = None
+        if not isinstance(value, Mapping):
+            raise ValidationError(path, f"expect {name}, got {value!r}")
+        if allowed is not None:
+            for key in value:
+                if key not in allowed:
+                    raise ValidationError((*path, key), "unexpected key")
+        if node.children:
+            return _cast_schema(value, caster, node.children, path)
+        if caster is not None and isinstance(value, dict):
+            return _cast(value, caster)
+        return value
+
+    return _check
+
+
+def _lenient(check: Checker) -> Checker:
+    """Make a checker that keeps the values that do not match as they are"""
+
+    def _check(node: SchemaNode, value: Any, path: Tuple[Any, ...], caster: Any) -> Any:
+        try:
+            return check(node, value, path, caster)
+        except ValidationError:
+            return value
+
+    return _check
+
+
+def _to_lenient(node: SchemaNode) -> SchemaNode:
+    """Make the checkers of the node and its subtrees lenient, except for
+    the members of the unions, which are tried in turn by raising"""
+    children = node.children and {
+        key: _to_lenient(child) for key, child in node.children.items()
+    }
+    return node._replace(
+        check=None if node.check is None else _lenient(node.check),
+        children=children,
+        items=node.items and _to_lenient(node.items),
+    )
+
+
+def _requires(nodes: Iterable[SchemaNode | None]) -> bool:
+    """Check if any keys are required under any of the nodes"""
+    return any(node is not None and node.required is not None for node in nodes)
+
+
+def _is_dataclass(tp: Any) -> bool:
+    """Check if the type is a dataclass"""
+    from dataclasses import is_dataclass
+
+    return isinstance(tp, type) and is_dataclass(tp)
+
+
+def _type_name(tp: Any) -> str:
+    """The name of a type for the error messages"""
+    if tp is None or tp is type(None):
+        return "None"
+    if isinstance(tp, type) and not getattr(tp, "__args__", None):
+        return tp.__name__
+    return repr(tp).replace("typing.", "")
+
+
+def _compile_type(tp: Any) -> SchemaNode:
+    """Compile a python type into a node"""
+    from dataclasses import MISSING, fields
+    from typing import Literal, Union, get_args, get_origin
+
+    name = _type_name(tp)
+    if tp is type(None):
+        tp = None
+    # the type and the converter of the strings
+    node = _schema_type(tp)
+    if tp is Any:
+        return node
+    if tp in _SCALARS:
+        return node._replace(check=_scalar(name, _SCALARS[tp], node.convert))
+
+    if _is_dataclass(tp):
+        required = [
+            field.name
+            for field in fields(tp)
+            if field.default is MISSING and field.default_factory is MISSING
+        ]
+    elif _is_typeddict(tp):
+        required = list(tp.__required_keys__)
+    elif _is_namedtuple(tp):
+        required = [name for name in tp._fields if name not in tp._field_defaults]
+    else:
+        required = None
+    if required is not None:
+        children = {key: _compile_type(val) for key, val in _field_types(tp).items()}
+        return node._replace(
+            children=children,
+            check=_object(name, None),
+            required=(
+                tuple(required)
+                if required or _requires(children.values())
+                else None
+            ),
+        )
+
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if _is_union(origin):
+        members = tuple(_compile_type(arg) for arg in args)
+        if any(member.check is None for member in members):
+            return SchemaNode(Any, None, None)
+        return node._replace(
+            children=None,
+            check=_union(name),
+            members=members,
+            required=() if _requires(members) else None,
+        )
+    if origin is Literal:
+        return node._replace(check=_constrained(_any, args, None, None))
+
+    container = origin or tp
+    if container in (list, tuple, set, frozenset):
+        items = [arg for arg in args if arg is not Ellipsis]
+        item = _compile_type(Union[tuple(items)]) if items else None
+        if item is not None and item.check is None:
+            item = None
+        return node._replace(
+            check=_array(name),
+            items=item,
+            required=() if _requires([item]) else None,
+        )
+    if container is dict:
+        value = _compile_type(args[1]) if len(args) == 2 else None
+        children = None if value is None or value.check is None else {ANY: value}
+        return node._replace(
+            children=children,
+            check=_object(name, None),
+            required=() if _requires([value]) else None,
+        )
+
+    if isinstance(tp, type):
+        return node._replace(check=_scalar(name, tp, node.convert))
+
+    raise TypeError(f"Unsupported type to validate: {tp!r}")
+
+
+def _compile_json(schema: Mapping[str, Any]) -> SchemaNode:
+    """Compile a JSON Schema into a node"""
+    if not isinstance(schema, Mapping):
+        raise TypeError(f"Expect a JSON Schema object, got {schema!r}")
+    unsupported = set(schema) - _JSON_KEYWORDS - _JSON_ANNOTATIONS
+    if unsupported:
+        raise TypeError(
+            f"Unsupported keyword(s) of JSON Schema: {', '.join(sorted(unsupported))}"
+        )
+
+    types = schema.get("type")
+    if types is None:
+        types = ["object"] if "properties" in schema else []
+    elif isinstance(types, str):
+        types = [types]
+
+    nodes = []
+    for tp in types:
+        if tp not in _JSON_TYPES:
+            raise TypeError(f"Unsupported type of JSON Schema: {tp!r}")
+        # the converter of the strings
+        node = _schema_type(_JSON_TYPES[tp])._replace(type=tp)
+        if tp == "object":
+            children = {
+                key: _compile_json(val)
+                for key, val in schema.get("properties", {}).items()
+            }
+            additional = schema.get("additionalProperties", True)
+            if not isinstance(additional, bool):
+                children[ANY] = _compile_json(additional)
+            required = tuple(schema.get("required", ()))
+            node = node._replace(
+                children=children,
+                check=_object("object", None if additional else set(children)),
+                required=(
+                    required if required or _requires(children.values()) else None
+                ),
+            )
+        elif tp == "array":
+            items = schema.get("items")
+            item = None if items is None else _compile_json(items)
+            if item is not None and item.check is None:
+                item = None
+            node = node._replace(
+                check=_array("array"),
+                items=item,
+                required=() if _requires([item]) else None,
+            )
+        else:
+            node = node._replace(
+                check=_scalar(tp, _SCALARS[_JSON_TYPES[tp]], node.convert)
+            )
+        nodes.append(node)
+
+    if not nodes:
+        node = SchemaNode(Any, None, None)
+    elif len(nodes) == 1:
+        node = nodes[0]
+    else:
+        name = " or ".join(types)
+        node = SchemaNode(
+            name,
+            _union_converter(
+                [node.convert for node in nodes if node.type != "null"],
+                "null" in types,
+            ),
+            None,
+            check=_union(name),
+            members=tuple(nodes),
+            required=() if _requires(nodes) else None,
+        )
+
+    enum = schema.get("enum")
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    if enum is None and minimum is None and maximum is None:
+        return node
+    return node._replace(
+        check=_constrained(node.check or _any, enum, minimum, maximum)
+    )
+
+
+def _fingerprint(node: SchemaNode) -> str:
+    """Compose the string that identifies the node compiled from a class"""
+    out = _type_repr(node.type)
+    if node.required:
+        out = f"{out}!{','.join(node.required)}"
+    if node.children:
+        children = sorted(
+            f"{'*' if key is ANY else key}:{_fingerprint(child)}"
+            for key, child in node.children.items()
+        )
+        out = f"{out}{{{','.join(children)}}}"
+    if node.items:
+        out = f"{out}[{_fingerprint(node.items)}]"
+    if node.members:
+        out = f"{out}({'|'.join(_fingerprint(member) for member in node.members)})"
+    return out
+
+
+def _with_schema(node: SchemaNode, nodes: Dict[Any, SchemaNode]) -> SchemaNode:
+    """Add the nodes of a schema to convert the values by, for the keys
+    that are not validated"""
+    children = dict(node.children or {})
+    for key, extra in nodes.items():
+        own = children.get(key)
+        if own is None or own.check is None:
+            if ANY not in children:
+                children[key] = extra
+        elif own.children is not None and extra.children:
+            children[key] = _with_schema(own, extra.children)
+    return node._replace(children=children)
+
+
+def _check_required(node: SchemaNode, value: Any, path: Tuple[Any, ...]) -> None:
+    """Check the required keys of the node in the configuration"""
+    if node.required is None:
+        return
+    if node.members:
+        error = None
+        for member in node.members:
+            if member.required is None:
+                continue
+            try:
+                _check_required(member, value, path)
+                return
+            except ValidationError as exc:
+                error = error or exc
+        raise error  # type: ignore[misc]
+    if node.items is not None:
+        if isinstance(value, _ARRAYS):
+            for i, val in enumerate(value):
+                _check_required(node.items, val, (*path, i))
+        return
+    if not isinstance(value, Mapping):
+        return
+
+    missing = [key for key in node.required if key not in value]
+    if missing:
+        raise ValidationError(path, f"missing required key(s): {', '.join(missing)}")
+    for key, child in node.children.items():  # type: ignore[union-attr]
+        if child.required is None:
+            continue
+        if key is not ANY:
+            if key in value:
+                _check_required(child, value[key], (*path, key))
+            continue
+        for name, val in value.items():
+            if name not in node.children:  # type: ignore[operator]
+                _check_required(child, val, (*path, name))
+
+
+def compile_validator(
+    schema: Schema,
+    convert: Schema | None = None,
+    lenient: bool = False,
+) -> CompiledSchema:
+    """Compile the schema into the nodes to validate the configurations
+    by, or get the compiled one
+
+    Args:
+        schema: A dataclass, TypedDict or NamedTuple class, or a JSON Schema
+        convert: The schema to convert the values of the other keys by.
+            See `simpleconf.schema`.
+        lenient: Whether to keep the values that do not match as they are,
+            instead of raising ValidationError, so that the loaders convert
+            the values of each configuration, which are checked after the
+            configurations are merged.
+
+    Returns:
+        The CompiledSchema object, with the root node to be passed to the
+        loaders, which convert and check the values in the cast walk
+
+    Raises:
+        TypeError: If the schema or any of the types is not supported
+    """
+    if isinstance(schema, Mapping):
+        # not a JSON Schema if not serializable, which fails to compile
+        key: Any = json.dumps(schema, sort_keys=True, default=repr)
+    else:
+        key = schema
+
+    try:
+        compiled = _COMPILED[key]
+    except (KeyError, TypeError):
+        compiled = None
+
+    if compiled is None:
+        if isinstance(schema, Mapping):
+            root = _compile_json(schema)
+            fingerprint = key
+        elif _is_dataclass(schema) or _is_typeddict(schema) or _is_namedtuple(schema):
+            root = _compile_type(schema)
+            fingerprint = _fingerprint(root)
+        else:
+            raise TypeError(
+                "Expect a dataclass, a TypedDict or a NamedTuple class, "
+                "or a JSON Schema to validate, "
+                f"got {schema!r}"
+            )
+
+        compiled = CompiledSchema(root.children or {}, f"validate:{fingerprint}", root)
+        with _LOCK:
+            compiled = _COMPILED.setdefault(key, compiled)
+
+    if lenient:
+        try:
+            compiled = _COMPILED[key, True]
+        except (KeyError, TypeError):
+            root = _to_lenient(compiled.root)  # type: ignore[arg-type]
+            lenient_compiled = CompiledSchema(
+                root.children or {}, f"lenient:{compiled.fingerprint}", root
+            )
+            with _LOCK:
+                compiled = _COMPILED.setdefault((key, True), lenient_compiled)
+
+    if convert is None:
+        return compiled
+    extra = compile_schema(convert)
+    root = _with_schema(compiled.root, extra.nodes)  # type: ignore[arg-type]
+    return CompiledSchema(
+        root.children,  # type: ignore[arg-type]
+        f"{compiled.fingerprint};{extra.fingerprint}",
+        root,
+    )
+
+
+def validate(conf: Any, schema: Schema, coerced: bool = False) -> Any:
+    """Validate the configuration against the schema
+
+    Args:
+        conf: The configuration
+        schema: A dataclass, TypedDict or NamedTuple class, or a JSON Schema
+        coerced: Whether the values are converted and checked already,
+            by the loaders with the compiled schema (not lenient), so that
+            only the required keys are checked
+
+    Returns:
+        The configuration, with the values converted in place
+
+    Raises:
+        ValidationError: If the configuration does not match the schema
+    """
+    compiled = compile_validator(schema)
+    if not coerced:
+        conf = cast(conf, None, compiled.root)
+    _check_required(compiled.root, conf, ())  # type: ignore[arg-type]
+    return conf
+
+
+def validate_profiles(
+    pool: Mapping[str, Any],
+    base: str | None,
+    schema: Schema,
+    coerced: bool = False,
+) -> None:
+    """Validate the configurations of all the profiles in the pool
+
+    The values are checked and converted under each profile, and the
+    required keys are checked with each profile merged with the base
+    profile, as it would be switched to by `ProfileConfig.use_profile()`.
+
+    Args:
+        pool: The profiles and their configurations
+        base: The base profile
+        schema: A dataclass, TypedDict or NamedTuple class, or a JSON Schema
+        coerced: Whether the values are converted and checked already,
+            by the loaders with the compiled schema (not lenient), so that
+            only the required keys are checked
+
+    Raises:
+        ValidationError: If any configuration does not match the schema,
+            with the profile name as the first part of the path
+    """
+    from .container import merge_dicts
+
+    compiled = compile_validator(schema)
+    if not coerced:
+        cast(pool, None, compiled.profiles)  # type: ignore[arg-type]
+
+    for profile, conf in pool.items():
+        if base is None or base == profile or base not in pool:
+            merged = conf
+        else:
+            # sharing the subtrees, only to look up the keys
+            merged = merge_dicts([pool[base], conf])
+        _check_required(compiled.root, merged, (profile,))  # type: ignore[arg-type]
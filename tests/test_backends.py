@@ -0,0 +1,150 @@
+import pytest
+
+from simpleconf import Config, backends
+from simpleconf.backends import (
+    Backend,
+    available_backends,
+    benchmark,
+    get_backend,
+    main,
+    register_backend,
+    use_backend,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_backends(monkeypatch):
+    monkeypatch.setattr(backends, "_CHOSEN", {})
+    monkeypatch.setattr(backends, "_BACKENDS", {})
+    monkeypatch.setattr(
+        backends,
+        "BACKENDS",
+        {fmt: dict(registered) for fmt, registered in backends.BACKENDS.items()},
+    )
+    monkeypatch.delenv("SIMPLECONF_YAML_BACKEND", raising=False)
+
+
+def _missing():
+    raise ImportError("not installed")
+
+
+def test_auto_backends():
+    for fmt in ("json", "yaml", "toml"):
+        installed = [
+            backend.name
+            for backend in available_backends(fmt)
+            if backend.name not in backends._NOT_AUTO
+        ]
+        assert get_backend(fmt).name == installed[0]
+        assert get_backend(fmt) is get_backend(fmt)
+
+    # what the standard json module accepts
+    assert get_backend("json").name == "json"
+    conf = Config.load(
+        '{"a": NaN, "b": Infinity, "c": 18446744073709551616}', loader="jsons"
+    )
+    assert conf.a != conf.a
+    assert conf.b == float("inf")
+    assert conf.c == 2**64
+
+    import yaml
+
+    if yaml.__with_libyaml__:
+        assert get_backend("yaml").parser is yaml.CFullLoader
+    # the python tags are supported by the default ones
+    assert Config.load("a: !!python/tuple [1, 2]", loader="yamls") == {"a": (1, 2)}
+
+
+def test_use_backend():
+    import yaml
+
+    backend = use_backend("yaml", "SafeLoader")
+    assert backend.name == "SafeLoader"
+    assert get_backend("yaml") is backend
+    with pytest.raises(yaml.YAMLError):
+        Config.load("a: !!python/tuple [1, 2]", loader="yamls")
+
+    assert use_backend("yaml", None) is None
+    assert get_backend("yaml").name != "SafeLoader"
+
+    with pytest.raises(ValueError, match="Unknown yaml backend"):
+        use_backend("yaml", "CLoader")
+
+    register_backend("json", "missing", _missing)
+    with pytest.raises(ImportError):
+        use_backend("json", "missing")
+
+
+def test_backend_from_env(monkeypatch):
+    monkeypatch.setenv("SIMPLECONF_YAML_BACKEND", "FullLoader")
+    assert get_backend("yaml").name == "FullLoader"
+
+    backends._BACKENDS.clear()
+    monkeypatch.setenv("SIMPLECONF_YAML_BACKEND", "nonexisting")
+    with pytest.raises(ValueError, match="Unknown yaml backend"):
+        get_backend("yaml")
+
+
+def test_register_backend():
+    import json
+
+    parsed = []
+
+    def _loads(content):
+        parsed.append(content)
+        return json.loads(content)
+
+    def _backend():
+        return Backend("recording", _loads, True, json)
+
+    register_backend("json", "recording", _backend)
+    assert get_backend("json").name != "recording"
+
+    register_backend("json", "recording", _backend, first=True)
+    assert get_backend("json").name == "recording"
+    assert Config.load('{"a": 1}', loader="jsons") == {"a": 1}
+    assert parsed == ['{"a": 1}']
+
+    register_backend("xml", "missing", _missing)
+    with pytest.raises(ImportError, match="None of the xml backends"):
+        get_backend("xml")
+
+
+def test_str_only_backend(tmp_path):
+    import json
+
+    def _loads(content):
+        assert isinstance(content, str)
+        return json.loads(content.upper())
+
+    register_backend(
+        "json",
+        "str_only",
+        lambda: Backend("str_only", _loads, False, json),
+        first=True,
+    )
+    path = tmp_path / "conf.json"
+    path.write_bytes(b'{"a": "x"}')
+    assert Config.load(path) == {"A": "X"}
+
+
+def test_benchmark(tmp_path, capsys):
+    yaml_file = tmp_path / "conf.yml"
+    yaml_file.write_text("a: !!python/tuple [1, 2]\n")
+    toml_file = tmp_path / "conf.toml"
+    toml_file.write_text("a = 1\n")
+
+    results = benchmark([str(yaml_file), str(toml_file)], number=2)
+    yaml_results = {r["backend"]: r for r in results if r["format"] == "yaml"}
+    assert yaml_results["FullLoader"]["mbps"] > 0
+    assert "ConstructorError" in yaml_results["SafeLoader"]["error"]
+    assert [r["chosen"] for r in results if r["format"] == "toml"][0]
+
+    assert main([str(yaml_file), str(toml_file), "--number", "1"]) == 0
+    out = capsys.readouterr().out
+    assert f"{yaml_file} (yaml)" in out
+    assert "* " in out
+    assert "MB/s" in out
+
+    assert main([str(tmp_path / "conf.ini")]) == 1
+    assert "No backends for file" in capsys.readouterr().err
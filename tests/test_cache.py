@@ -0,0 +1,421 @@
+import os
+
+import pytest
+from diot import Diot
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.cache import (
+    BytecodeCache,
+    DiskCache,
+    LoadCache,
+    TemplateCache,
+    bytecode_cache,
+    disk_cache,
+    load_cache,
+    template_cache,
+)
+from simpleconf.loaders import a_preload, preload
+from simpleconf.utils import get_loader
+
+pytest_plugins = ["tests.fixt_simpleconf"]
+
+
+@pytest.fixture
+def cache():
+    load_cache.enable(maxsize=2)
+    load_cache.hits = load_cache.misses = 0
+    yield load_cache
+    load_cache.disable()
+
+
+def test_cache_disabled_by_default(toml_file):
+    assert not LoadCache().enabled
+    assert LoadCache().key(toml_file, object, "load") is None
+
+
+def test_cache_hit_and_copy(cache, toml_file, ini_file):
+    loader = get_loader("toml")
+    first = loader.load(toml_file)
+    assert cache.info() == (0, 1, 2, 1)
+
+    second = loader.load(toml_file)
+    assert isinstance(second, Diot)
+    assert second == first
+    assert cache.info().hits == 1
+
+    # modifications do not leak into the cache
+    second.default.a = 100
+    assert loader.load(toml_file).default.a == 1
+
+    # loaded with profiles are cached separately
+    profiles = ProfileConfig.load(ini_file)
+    assert cache.info().misses == 2
+    ProfileConfig.use_profile(profiles, "test")
+    assert profiles.a == 3
+    profiles = ProfileConfig.load(ini_file)
+    assert profiles.a == 1
+    assert cache.info().hits == 3
+
+
+async def test_cache_async(cache, toml_file, ini_file):
+    config = await Config.a_load(toml_file)
+    assert cache.info().misses == 1
+    config2 = await Config.a_load(toml_file)
+    assert config2 == config
+    assert cache.info().hits == 1
+
+    config = await ProfileConfig.a_load(ini_file)
+    config2 = await ProfileConfig.a_load(ini_file)
+    assert config2 == config
+    assert cache.info().hits == 2
+
+
+def test_cache_shared_not_leaked(cache, tmp_path, monkeypatch):
+    path = tmp_path / "conf.toml"
+    path.write_text("a = [1, {b = 2}]\n[c]\nd = 3\n")
+    Config.load(path, container=dict)
+    key = cache.key(path, get_loader("toml").__class__, "load")
+    # handed out without copying
+    assert cache.get(key) is cache.get(key)
+
+    # the file is not read for a hit
+    from simpleconf.loaders import LocalFile
+
+    def _no_read(self):  # pragma: no cover
+        raise AssertionError("The file should not be read")
+
+    monkeypatch.setattr(LocalFile, "read_signed", _no_read)
+    conf = Config.load(path, container=dict)
+    conf["a"][1]["b"] = 100
+    conf["c"]["d"] = 100
+    assert Config.load(path, container=dict) == {"a": [1, {"b": 2}], "c": {"d": 3}}
+    conf = Config.load(path)
+    conf.c.d = 100
+    assert Config.load(path).c.d == 3
+
+
+def test_cache_custom_loader_diot(cache, tmp_path):
+    from simpleconf.loaders.toml import TomlLoader
+
+    class DiotLoader(TomlLoader):
+        @classmethod
+        def _convert(cls, conf, loaded, schema=None):
+            return Diot(super()._convert(conf, loaded, schema))
+
+    path = tmp_path / "conf.toml"
+    path.write_text("[c]\nd = 3\n")
+    conf = Config.load(path, loader=DiotLoader(), container=dict)
+    assert type(conf["c"]) is dict
+    conf["c"]["d"] = 100
+    assert Config.load(path, loader=DiotLoader()).c.d == 3
+
+
+def test_cache_stat_change(cache, tmp_path):
+    path = tmp_path / "conf.json"
+    path.write_text('{"a": 1}')
+    assert Config.load(path).a == 1
+    path.write_text('{"a": 22}')
+    assert Config.load(path).a == 22
+    assert cache.info().hits == 0
+
+
+async def test_cache_keyed_by_content_read(cache, tmp_path):
+    path = tmp_path / "conf.toml"
+    path.write_text("a = 1\n")
+    preloaded = preload(path)
+    mtime_ns = preloaded.signature[0]
+
+    # rewritten after it is read, before it is loaded and cached
+    path.write_text("a = 22\n")
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert get_loader("toml").load(preloaded).a == 1
+    assert Config.load(path).a == 22
+    assert Config.load(path).a == 22
+    assert cache.info().hits == 1
+
+    preloaded = await a_preload(path)
+    path.write_text("a = 333\n")
+    os.utime(path, ns=(mtime_ns + 2 * 10**9, mtime_ns + 2 * 10**9))
+    assert (await get_loader("toml").a_load(preloaded)).a == 22
+    assert (await Config.a_load(path, loader="toml")).a == 333
+
+
+def test_cache_eviction_and_invalidate(cache, toml_file, json_file, yaml_file):
+    for conf in (toml_file, json_file, yaml_file):
+        Config.load(conf)
+    assert cache.info().currsize == 2
+    # toml_file was evicted
+    Config.load(toml_file)
+    assert cache.info().hits == 0
+
+    Config.load(toml_file)
+    assert cache.info().hits == 1
+
+    cache.invalidate(toml_file)
+    assert cache.info().currsize == 1
+    Config.load(toml_file)
+    assert cache.info().hits == 1
+
+    cache.invalidate()
+    assert cache.info().currsize == 0
+
+
+def test_cache_uncacheable(cache, toml_file):
+    assert cache.key({"a": 1}, object, "load") is None
+    assert cache.key("s3://bucket/conf.toml", object, "load") is None
+    assert cache.key("/nonexist/conf.toml", object, "load") is None
+
+    Config.load({"a": 1}, "b = 1", loader=["dict", "tomls"])
+    with open(toml_file) as f:
+        Config.load(f, loader="toml")
+    assert cache.info() == (0, 0, 2, 0)
+
+
+def test_cache_env_interpolated(cache, tmp_path, monkeypatch):
+    path = tmp_path / "interp.env"
+    path.write_text("A=${MYVAR}\n")
+    monkeypatch.setenv("MYVAR", "one")
+    assert Config.load(path).A == "one"
+    monkeypatch.setenv("MYVAR", "two")
+    assert Config.load(path).A == "two"
+    assert cache.info().currsize == 0
+
+    # cached if there is nothing to interpolate
+    path.write_text("A=1\n")
+    Config.load(path)
+    Config.load(path)
+    assert cache.info().hits == 1
+
+
+@pytest.fixture
+def dcache(tmp_path):
+    disk_cache.enable(tmp_path / "cache")
+    disk_cache.hits = disk_cache.misses = 0
+    yield disk_cache
+    disk_cache.disable()
+
+
+def test_disk_cache_disabled_by_default(toml_file, tmp_path):
+    assert DiskCache(tmp_path).directory == tmp_path
+    assert not DiskCache().enabled
+    assert DiskCache().key(toml_file, object, "load") is None
+    assert DiskCache().info() == (0, 0, 64 * 1024 * 1024, 0)
+
+
+def test_disk_cache(dcache, yaml_file, monkeypatch):
+    config = Config.load(yaml_file)
+    assert dcache.info()[:2] == (0, 1)
+    assert dcache.info().currsize == 1
+
+    # no parsing for the cache hit
+    from simpleconf.loaders.yaml import YamlLoader
+
+    monkeypatch.setattr(YamlLoader, "loading", None)
+    config2 = Config.load(yaml_file)
+    assert config2 == config
+    assert isinstance(config2, Diot)
+    assert dcache.info().hits == 1
+
+
+def test_disk_cache_with_load_cache(dcache, cache, toml_file):
+    Config.load(toml_file)
+    cache.invalidate()
+    # from disk, and then put into memory
+    Config.load(toml_file)
+    assert dcache.info().hits == 1
+    Config.load(toml_file)
+    assert dcache.info().hits == 1
+    assert cache.info().hits == 1
+
+
+def test_disk_cache_keyed_by_content(dcache, tmp_path):
+    path = tmp_path / "conf.json"
+    path.write_text('{"default": {"a": 1}}')
+    assert Config.load(path).default.a == 1
+    assert ProfileConfig.load(path).a == 1
+    path.write_text('{"default": {"a": 22}}')
+    assert Config.load(path).default.a == 22
+    path.write_text('{"default": {"a": 1}}')
+    assert Config.load(path).default.a == 1
+    assert dcache.info().hits == 1
+    assert dcache.info().currsize == 3
+    # no temporary files left
+    assert len(list(dcache.directory.iterdir())) == 3
+
+    dcache.clear()
+    assert dcache.info().currsize == 0
+
+
+def test_disk_cache_skips_templates(dcache, json_liq_file):
+    assert Config.load(json_liq_file).default.a == 2
+    assert dcache.info() == (0, 0, dcache.max_size, 0)
+
+
+def test_disk_cache_skips_env_interpolated(dcache, tmp_path, monkeypatch):
+    path = tmp_path / "interp.env"
+    path.write_text("A=${MYVAR}\n")
+    monkeypatch.setenv("MYVAR", "one")
+    assert Config.load(path).A == "one"
+    monkeypatch.setenv("MYVAR", "two")
+    assert Config.load(path).A == "two"
+    assert dcache.info() == (0, 0, dcache.max_size, 0)
+
+    path.write_text("A=1\n")
+    Config.load(path)
+    Config.load(path)
+    assert dcache.info().hits == 1
+
+
+def test_disk_cache_corrupted(dcache, toml_file):
+    Config.load(toml_file)
+    entry = next(dcache.directory.iterdir())
+    entry.write_bytes(b"corrupted")
+    assert Config.load(toml_file).default.a == 1
+    assert dcache.info().hits == 0
+    # rewritten
+    assert Config.load(toml_file).default.a == 1
+    assert dcache.info().hits == 1
+
+
+def test_disk_cache_put_error(dcache, toml_file):
+    dcache.directory.parent.joinpath("cache").write_text("not a directory")
+    assert Config.load(toml_file).default.a == 1
+    assert dcache.info().misses == 1
+
+
+def test_disk_cache_put_unpicklable(dcache):
+    dcache.put("key", lambda: None)
+    assert list(dcache.directory.iterdir()) == []
+
+
+def test_disk_cache_eviction(dcache, toml_file, json_file, yaml_file):
+    Config.load(toml_file)
+    size = next(dcache.directory.iterdir()).stat().st_size
+    dcache.max_size = size * 2
+    Config.load(json_file)
+    Config.load(yaml_file)
+    assert dcache.info().currsize == 2
+    # toml_file was evicted
+    Config.load(toml_file)
+    assert dcache.info().hits == 0
+
+    dcache.max_size = 0
+    for conf in (toml_file, json_file, yaml_file):
+        Config.load(conf)
+    assert dcache.info().currsize == 3
+
+
+async def test_disk_cache_async(dcache, toml_file):
+    config = await Config.a_load(toml_file)
+    config2 = await Config.a_load(toml_file)
+    assert config2 == config
+    assert dcache.info().hits == 1
+
+
+def test_disk_cache_key(dcache, toml_file):
+    key = dcache.key(toml_file, object, "load")
+    assert key == dcache.key(toml_file, object, "load", toml_file.read_bytes())
+    assert key != dcache.key(toml_file, object, "profiles")
+
+
+def test_disk_cache_unreadable(dcache):
+    assert dcache.key("/nonexist/conf.toml", object, "load") is None
+    assert dcache.key("s3://bucket/conf.toml", object, "load") is None
+
+
+@pytest.fixture
+def tcache():
+    template_cache.enable(maxsize=2)
+    template_cache.invalidate()
+    template_cache.hits = template_cache.misses = 0
+    yield template_cache
+    template_cache.enable()
+
+
+def test_template_cache(tcache, json_liq_file, yaml_j2_file, tmp_path, monkeypatch):
+    assert TemplateCache(128).enabled
+    assert Config.load(json_liq_file).default.a == 2
+    assert tcache.info() == (0, 1, 2, 1)
+    assert Config.load(json_liq_file).default.a == 2
+    assert tcache.info() == (1, 1, 2, 1)
+
+    # keyed by content, not by path
+    other = tmp_path / "other.json.liq"
+    other.write_bytes(json_liq_file.read_bytes())
+    assert Config.load(other).default.a == 2
+    assert tcache.info().hits == 2
+
+    # keyed by loader, with one environment for each loader
+    assert Config.load(yaml_j2_file).default.a == 2
+    yaml_j2 = get_loader("yaml.j2")
+    env = yaml_j2._environment(repr([]))
+    yaml_j2.loading(str(yaml_j2_file), False)
+    assert tcache.info() == (3, 2, 2, 2)
+    assert yaml_j2._environment(repr([])) is env
+    assert get_loader("json.j2")._environment(repr([])) is not env
+
+    # keyed by options
+    monkeypatch.setattr(
+        type(get_loader("json.liq")), "TEMPLATE_OPTIONS", {"mode": "standard"}
+    )
+    assert Config.load(json_liq_file).default.a == 2
+    assert tcache.info().misses == 3
+
+
+def test_template_cache_disabled(tcache, toml_liq_file):
+    tcache.disable()
+    assert tcache.key(object, "", "a") is None
+    assert Config.load(toml_liq_file).default.b == 12
+    assert Config.load(toml_liq_file).default.b == 12
+    assert tcache.info() == (0, 0, 0, 0)
+
+
+@pytest.fixture
+def bcache(tmp_path, tcache):
+    bytecode_cache.enable(tmp_path / "bytecode")
+    bytecode_cache.hits = bytecode_cache.misses = 0
+    yield bytecode_cache
+    bytecode_cache.disable()
+
+
+def test_bytecode_cache(bcache, toml_liq_file, yaml_j2_file, monkeypatch):
+    assert not BytecodeCache().enabled
+    assert BytecodeCache().key(object, "", "", "a") is None
+
+    assert Config.load(toml_liq_file).default.b == 12
+    assert Config.load(yaml_j2_file).default.a == 2
+    assert bcache.info() == (0, 2, 64 * 1024 * 1024, 2)
+
+    # a new process, with the templates not cached in memory
+    template_cache.invalidate()
+    from jinja2 import Environment
+
+    def compile(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("compiled")
+
+    monkeypatch.setattr(Environment, "compile", compile)
+    assert Config.load(toml_liq_file).default.b == 12
+    assert Config.load(yaml_j2_file).default.a == 2
+    assert bcache.info().hits == 2
+
+
+def test_bytecode_cache_key(bcache):
+    key = bcache.key(object, "", "jinja2 3.1", "a")
+    assert bcache.key(object, "", "jinja2 3.1", b"a") == key
+    assert bcache.key(object, "", "jinja2 3.2", "a") != key
+    assert bcache.key(object, "[]", "jinja2 3.1", "a") != key
+    assert bcache.key(type, "", "jinja2 3.1", "a") != key
+    assert bcache.key(object, "", "jinja2 3.1", "b") != key
+
+
+def test_bytecode_cache_corrupted(bcache, json_liq_file):
+    Config.load(json_liq_file)
+    entry = next(bcache.directory.iterdir())
+    entry.write_bytes(b"corrupted")
+    template_cache.invalidate()
+    assert Config.load(json_liq_file).default.a == 2
+    assert bcache.info().hits == 0
+    # rewritten
+    template_cache.invalidate()
+    assert Config.load(json_liq_file).default.a == 2
+    assert bcache.info().hits == 1
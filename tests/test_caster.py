@@ -9,8 +9,11 @@ from simpleconf.caster import (
     python_caster,
     none_caster,
     null_caster,
+    type_caster,
     cast,
     cast_value,
+    compile_casters,
+    CompiledCasters,
 )
 
 ALL_CASTERS = [
@@ -94,7 +97,84 @@ def test_cast_value(value, casters, expected):
         ({"a": "@int:1"}, ALL_CASTERS, {"a": 1}),
         ({"a": {"b": "@int:1"}}, ALL_CASTERS, {"a": {"b": 1}}),
         ({"a": {"b": "null"}}, [null_caster], {"a": {"b": None}}),
+        ({"a": "@int:1"}, None, {"a": "@int:1"}),
     ],
 )
 def test_cast(value, casters, expected):
     assert cast(value, casters) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "1",
+        "@",
+        "@int:1",
+        "@int:a",
+        "@float:1e-1",
+        "@bool:TRUE",
+        "@bool:yes",
+        "@none",
+        "@none:a",
+        "null",
+        "nullable",
+        "@python:[1, 2]",
+        '@json:{"a": 1}',
+        "@toml:a=1",
+        "@unknown:1",
+        1,
+        None,
+    ],
+)
+def test_compiled_casters_same_as_trying_in_turn(value):
+    from simpleconf.caster import _cast_value
+
+    expected = value if not isinstance(value, str) else _cast_value(value, ALL_CASTERS)
+    compiled = CompiledCasters(ALL_CASTERS)
+    assert compiled(value) == expected
+    # memoized
+    assert compiled(value) == expected
+
+
+def test_compiled_casters_order():
+    int_from_float = type_caster("@i", lambda x: int(float(x[2:])))
+    # both match "@int:1.5", the first one that succeeds wins
+    assert cast_value("@int:1.5", [int_from_float, int_caster]) == 1
+    assert cast_value("@int:1.5", [float_caster, int_caster]) == 1
+    assert cast_value("@int:x", [int_from_float, int_caster]) == "@int:x"
+
+
+def test_compiled_casters_memo():
+    compiled = CompiledCasters(ALL_CASTERS, memo_size=2)
+    assert compiled("@int:1") == 1
+    assert compiled("@bool:true") is True
+    assert compiled._memo == {"@int:1": 1, "@bool:true": True}
+    # mutable results are not memoized
+    first = compiled("@json:[1]")
+    assert compiled("@json:[1]") is not first
+    # plain strings are rejected before memoization
+    assert compiled("plain") == "plain"
+    assert len(compiled._memo) == 2
+    compiled("@float:1")
+    assert compiled._memo == {"@float:1": 1.0}
+
+    compiled = CompiledCasters(ALL_CASTERS, memo_size=0)
+    assert compiled("@int:1") == 1
+    assert compiled._memo == {}
+
+
+def test_compiled_casters_custom():
+    def upper_caster(value):
+        if not value.startswith("up:"):
+            raise ValueError(value)
+        return value[3:].upper()
+
+    casters = [upper_caster, int_caster]
+    assert compile_casters(casters) is compile_casters(casters)
+    assert compile_casters(compile_casters(casters)) is compile_casters(casters)
+    assert cast({"a": "up:a", "b": "@int:1", "c": "c"}, casters) == {
+        "a": "A",
+        "b": 1,
+        "c": "c",
+    }
@@ -1,7 +1,13 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from panpath.base import PanPath
 import pytest
 
-from simpleconf import Config, ProfileConfig
+from simpleconf import Config, LazyConfig, ProfileConfig
+from simpleconf.loaders.dict import DictLoader
 
 pytest_plugins = ["tests.fixt_simpleconf"]
 
@@ -311,6 +317,17 @@ def test_use_profile_base_not_existing():
         ProfileConfig.use_profile(config, "p2", "x", allow_missing_base=False)
 
 
+def test_use_profile_keeps_base_intact():
+    config = ProfileConfig.load(
+        {"default": {"a": {"x": 1}}, "p1": {"a": {"y": 2}}}
+    )
+    ProfileConfig.use_profile(config, "p1")
+    assert config.a == {"x": 1, "y": 2}
+    conf2 = ProfileConfig.use_profile(config, "p1", copy=True)
+    assert conf2.a == {"x": 1, "y": 2}
+    assert ProfileConfig.pool(config).default == {"a": {"x": 1}}
+
+
 def test_detach():
     config = ProfileConfig.load({"default": {"a": 1, "b": [2, 3]}, "p1": {"a": 6}})
     ProfileConfig.use_profile(config, "p1")
@@ -355,3 +372,183 @@ def test_profile_loader_directive_liq(toml_profile_with_liq_directive):
     config = ProfileConfig.load(toml_profile_with_liq_directive)
     assert config.a == 2
     assert config.b == 12
+
+
+class _SlowDictLoader(DictLoader):
+    """Dict loader that takes a while to load, to check the concurrency"""
+
+    def __init__(self):
+        self.started = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def a_loading(self, conf, ignore_nonexist):
+        self.started += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        # later configs finish first
+        await asyncio.sleep(0.01 * (10 - self.started))
+        self.running -= 1
+        return conf
+
+
+async def test_async_load_concurrently():
+    loader = _SlowDictLoader()
+    configs = [{"a": {f"k{i}": i}, "b": i} for i in range(8)]
+    config = await Config.a_load(*configs, loader=loader, concurrency=4)
+    assert loader.max_running == 4
+    # merged in the given order
+    assert config.b == 7
+    assert config.a == {f"k{i}": i for i in range(8)}
+
+    loader = _SlowDictLoader()
+    configs = [{"default": {"a": i}} for i in range(8)]
+    config = await ProfileConfig.a_load(*configs, loader=loader, concurrency=None)
+    assert loader.max_running == 8
+    assert config.a == 7
+
+
+class _BlockingDictLoader(DictLoader):
+    """Dict loader that records the threads loading the configurations"""
+
+    def __init__(self):
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def loading(self, conf, ignore_nonexist):
+        with self.lock:
+            self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return conf
+
+
+@pytest.mark.parametrize("parallel", [True, 4])
+def test_load_parallel(parallel):
+    loader = _BlockingDictLoader()
+    configs = [{"a": {f"k{i}": i}, "b": i} for i in range(8)]
+    config = Config.load(*configs, loader=loader, parallel=parallel)
+    assert len(loader.threads) > 1
+    assert config.b == 7
+    assert config.a == {f"k{i}": i for i in range(8)}
+
+    loader = _BlockingDictLoader()
+    configs = [{"default": {"a": i}} for i in range(8)]
+    config = ProfileConfig.load(*configs, loader=loader, parallel=parallel)
+    assert len(loader.threads) > 1
+    assert config.a == 7
+
+
+def test_load_executor(ini_file, toml_file):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.warns(UserWarning):
+            config = Config.load(toml_file, ini_file, executor=executor)
+        assert config.a == 1
+        assert config.b == 2
+        assert config.default.a == 1
+
+        config = ProfileConfig.load(
+            ini_file, {"default": {"b": 3}}, executor=executor
+        )
+        assert config.a == 1
+        assert config.b == 3
+        assert ProfileConfig.profiles(config) == ["default", "test"]
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    from simpleconf.loaders import LocalFile
+
+    reads = []
+    read_signed = LocalFile.read_signed
+
+    def _read_signed(self):
+        reads.append(str(self))
+        return read_signed(self)
+
+    def _no_read(self, *args, **kwargs):  # pragma: no cover
+        raise AssertionError("The file should be read only once")
+
+    monkeypatch.setattr(LocalFile, "read_signed", _read_signed)
+    monkeypatch.setattr(LocalFile, "read_bytes", _no_read)
+    monkeypatch.setattr(LocalFile, "read_text", _no_read)
+    monkeypatch.setattr(LocalFile, "exists", _no_read)
+    return reads
+
+
+async def test_file_read_once(
+    count_reads,
+    toml_with_liq_directive,
+    toml_profile_with_liq_directive,
+    yaml_file,
+):
+    config = Config.load(toml_with_liq_directive, yaml_file)
+    assert config.default.a == 1
+    assert config.default.b == 12
+    assert count_reads == [str(toml_with_liq_directive), str(yaml_file)]
+
+    count_reads.clear()
+    config = await Config.a_load(toml_with_liq_directive)
+    assert config.default.b == 12
+    assert count_reads == [str(toml_with_liq_directive)]
+
+    count_reads.clear()
+    config = ProfileConfig.load(toml_profile_with_liq_directive)
+    assert config.b == 12
+    config = await ProfileConfig.a_load(toml_profile_with_liq_directive)
+    assert config.b == 12
+    assert len(count_reads) == 2
+
+    count_reads.clear()
+    config = Config.load(yaml_file, loader="yaml")
+    assert config.b == 2
+    assert count_reads == [str(yaml_file)]
+
+
+def test_lazy_config(tmp_path):
+    base = tmp_path / "base.toml"
+    base.write_text('a = 1\nb = [1, 2]\n[db]\nhost = "localhost"\nport = 1\n')
+    override = tmp_path / "override.json"
+    override.write_text('{"a": 2, "db": {"port": 2}}')
+    sources = (base, {"c": {"d": 3}}, override)
+
+    config = LazyConfig(*sources)
+    assert config.loaded == [False, False, False]
+    assert "0/3 sources loaded" in repr(config)
+
+    # found in the source with the highest precedence
+    assert config.a == 2
+    assert config.loaded == [False, False, True]
+    assert config["db"] == {"host": "localhost", "port": 2}
+    assert config.loaded == [True, True, True]
+    assert config.db.port == 2
+    assert "2 keys merged" in repr(config)
+
+    assert "a" in config
+    assert "c" in config
+    assert "x" not in config
+    with pytest.raises(AttributeError):
+        config._x
+    assert config.get("x", 1) == 1
+    with pytest.raises(AttributeError):
+        config.x
+    with pytest.raises(KeyError):
+        config["x"]
+
+    assert list(config) == ["a", "b", "db", "c"]
+    assert len(config) == 4
+    assert config == Config.load(*sources)
+    assert config.to_diot() == Config.load(*sources)
+    assert config.to_diot().c.d == 3
+
+
+def test_lazy_config_errors(tmp_path):
+    with pytest.raises(ValueError, match="Length of loader"):
+        LazyConfig({"a": 1}, loader=["dict", "dict"])
+
+    config = LazyConfig(tmp_path / "nonexist.toml", {"a": 1})
+    assert config.a == 1
+    with pytest.raises(FileNotFoundError):
+        config.b
+
+    config = LazyConfig(tmp_path / "nonexist.toml", {"a": 1}, ignore_nonexist=True)
+    assert dict(config) == {"a": 1}
@@ -0,0 +1,265 @@
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import pytest
+from diot import Diot
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.cache import load_cache
+from simpleconf.container import merge_dicts, to_container
+from simpleconf.exceptions import ValidationError
+from simpleconf.utils import META_KEY, POOL_KEY, get_loader
+
+
+class Node(dict):
+    """A factory that is not a type of the builtins"""
+
+
+@dataclass
+class Server:
+    name: str
+    port: int = 80
+
+
+@pytest.fixture
+def files(tmp_path):
+    toml = tmp_path / "config.toml"
+    toml.write_text(
+        "name = 's'\n"
+        "[database]\nhost = 'db'\nport = 1\n"
+        "[[servers]]\nname = 'a'\n"
+        "[database.options]\na = 1\n"
+    )
+    env = tmp_path / "config.env"
+    env.write_text("port=@int:8080\ndatabase=@json:{\"port\": 2}\n")
+    return toml, env
+
+
+def test_to_container():
+    data = {"a": {"b": 1}, "c": [{"d": 2}, 3]}
+    conf = to_container(data, Diot)
+    assert isinstance(conf, Diot)
+    assert conf.a.b == 1 and conf.c[0].d == 2
+    assert to_container(conf, Diot) is conf
+
+    assert to_container(data, dict) is data
+    assert type(to_container(conf, dict)["a"]) is dict
+
+    conf = to_container(data, MappingProxyType)
+    assert isinstance(conf, MappingProxyType)
+    assert isinstance(conf["a"], MappingProxyType)
+    assert isinstance(conf["c"][0], MappingProxyType)
+    assert conf["c"][1] == 3
+    # the input is not changed
+    assert type(data["a"]) is dict
+
+    # the values built already are kept
+    shared = MappingProxyType({"x": 1})
+    assert to_container({"a": shared}, MappingProxyType)["a"] is shared
+    assert to_container(shared, MappingProxyType) is shared
+
+    # copied for dict if shared
+    copied = to_container(data, dict, copy=True)
+    assert copied == data and copied is not data
+    assert copied["c"] is not data["c"] and copied["c"][0] is not data["c"][0]
+
+
+def test_merge_dicts():
+    first = {"a": {"b": 1, "c": {"d": 2}}, "e": [1], "f": {"g": 1}}
+    second = {"a": {"c": {"h": 3}}, "e": [2], "f": 1}
+    third = {"f": {"i": 1}}
+    merged = merge_dicts([first, second, third])
+    assert merged == {
+        "a": {"b": 1, "c": {"d": 2, "h": 3}},
+        "e": [2],
+        "f": {"i": 1},
+    }
+    # the layers are not changed, and the subtrees not overridden are shared
+    assert first["a"] == {"b": 1, "c": {"d": 2}}
+    assert merged["f"] is third["f"]
+
+    single = merge_dicts([first])
+    assert single == first and single is not first
+    assert merge_dicts([MappingProxyType({"a": 1}), {"b": 2}]) == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("container", [dict, MappingProxyType, Node, OrderedDict])
+def test_load(files, container):
+    toml, env = files
+    conf = Config.load(toml, env, container=container)
+    assert type(conf) is container
+    assert type(conf["database"]) is container
+    assert type(conf["database"]["options"]) is container
+    assert type(conf["servers"][0]) is container
+    assert conf["database"]["host"] == "db"
+    assert conf["database"]["port"] == 2
+    assert conf["port"] == 8080
+
+
+async def test_a_load(files):
+    toml, env = files
+    conf = await Config.a_load(toml, env, container=dict)
+    assert type(conf) is dict
+    assert conf["database"] == {"host": "db", "port": 2, "options": {"a": 1}}
+
+    conf = await Config.a_load(toml, container=MappingProxyType)
+    assert isinstance(conf["database"], MappingProxyType)
+
+
+def test_load_dicts_not_changed():
+    base = {"a": {"b": 1}, "c": 1}
+    override = {"a": {"d": 2}}
+    conf = Config.load(base, override, container=dict)
+    assert conf == {"a": {"b": 1, "d": 2}, "c": 1}
+    assert base == {"a": {"b": 1}, "c": 1}
+    assert override == {"a": {"d": 2}}
+
+
+def test_load_with_schema_validate(files):
+    toml, env = files
+    conf = Config.load(
+        toml,
+        env,
+        schema={"database.port": int},
+        validate={"type": "object", "required": ["name"]},
+        container=MappingProxyType,
+    )
+    assert conf["database"]["port"] == 2
+
+    with pytest.raises(ValidationError, match="missing"):
+        Config.load(toml, validate={"type": "object", "required": ["x"]}, container=dict)
+
+
+def test_load_errors(files):
+    toml, _ = files
+    with pytest.raises(ValueError, match="'index' can only be used"):
+        Config.load(toml, container=dict, index=True)
+    with pytest.raises(ValueError, match="'container' can't be used"):
+        Config.load(toml, container=dict, frozen=True)
+    # the defaults are fine
+    assert isinstance(Config.load(toml, container=Diot, index=True), Diot)
+
+
+def test_load_as_no_diot(files):
+    toml, _ = files
+    assert Config.load_as(Server, toml) == Server("s")
+
+
+def test_profiles_dict(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\na = 1\nb = 2\n[dev]\nb = 3\n[prod]\nc = 4\n")
+    env = tmp_path / "config.env"
+    env.write_text("DEV_d=@int:5\n")
+
+    conf = ProfileConfig.load(ini, env, container=dict)
+    assert type(conf) is dict
+    assert type(conf[POOL_KEY]["dev"]) is dict
+    assert ProfileConfig.current_profile(conf) == "default"
+    assert ProfileConfig.profiles(conf) == ["default", "dev", "prod"]
+    assert ProfileConfig.detach(conf) == {"a": "1", "b": "2"}
+
+    dev = ProfileConfig.use_profile(conf, "dev", copy=True)
+    assert type(dev) is dict
+    assert ProfileConfig.detach(dev) == {"a": "1", "b": "3", "d": 5}
+    assert ProfileConfig.current_profile(conf) == "default"
+
+    ProfileConfig.use_profile(conf, "prod")
+    assert ProfileConfig.detach(conf) == {"a": "1", "b": "2", "c": "4"}
+    assert ProfileConfig.current_profile(conf) == "prod"
+
+    with ProfileConfig.with_profile(conf, "dev"):
+        assert conf["b"] == "3"
+    assert ProfileConfig.current_profile(conf) == "prod"
+    assert "b" in conf and conf["b"] == "2"
+
+
+def test_profiles_dict_not_shared_with_pool():
+    pool = {"default": {"db": {"port": 1}}, "dev": {"x": 1}}
+    conf = ProfileConfig.load(pool, container=dict)
+    conf["db"]["port"] = 2
+    assert conf[POOL_KEY]["default"] == {"db": {"port": 1}}
+    assert json.loads(json.dumps(conf[META_KEY])) == {
+        "current_profile": "default",
+        "base_profile": "default",
+    }
+
+    dev = ProfileConfig.use_profile(conf, "dev", copy=True)
+    dev["db"]["port"] = 3
+    ProfileConfig.use_profile(conf, "dev")
+    conf["db"]["port"] = 4
+    assert conf[POOL_KEY]["default"] == {"db": {"port": 1}}
+    assert type(ProfileConfig.detach(dev)) is dict
+
+
+async def test_profiles_mapping_proxy(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\na = 1\n[dev]\nb = 2\n")
+
+    conf = await ProfileConfig.a_load(ini, container=MappingProxyType)
+    assert isinstance(conf, MappingProxyType)
+    assert isinstance(conf[POOL_KEY], MappingProxyType)
+    assert isinstance(conf[POOL_KEY]["dev"], MappingProxyType)
+    assert conf["a"] == "1"
+
+    dev = ProfileConfig.use_profile(conf, "dev", copy=True)
+    assert isinstance(dev, MappingProxyType)
+    assert dict(ProfileConfig.detach(dev)) == {"a": "1", "b": "2"}
+    assert isinstance(ProfileConfig.detach(dev), MappingProxyType)
+    assert ProfileConfig.current_profile(dev) == "dev"
+    assert dev[META_KEY]["base_profile"] == "default"
+
+    with pytest.raises(TypeError, match="in place, use copy=True"):
+        ProfileConfig.use_profile(conf, "dev")
+
+    # no base profile
+    conf = ProfileConfig.load(
+        {"dev": {"a": 1}}, container=MappingProxyType, allow_missing_base=True
+    )
+    assert ProfileConfig.current_profile(conf) is None
+    assert dict(ProfileConfig.detach(conf)) == {}
+
+
+def test_profiles_load_one_validate(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nname = s\n[dev]\nport = 8080\n")
+
+    conf = ProfileConfig.load_one(ini, container=dict)
+    assert type(conf) is dict and conf["name"] == "s"
+
+    # coerced by the validation
+    conf = ProfileConfig.load(ini, validate=Server, container=dict)
+    assert conf[POOL_KEY]["dev"] == {"port": 8080}
+
+    with pytest.raises(ValueError, match="Base profile 'x' not found"):
+        ProfileConfig.load(ini, base="x", container=dict)
+    with pytest.raises(ValueError, match="'index' can only be used"):
+        ProfileConfig.load(ini, container=dict, index=True)
+
+
+async def test_profiles_a_load_one(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nname = s\n")
+    conf = await ProfileConfig.a_load_one(ini, container=MappingProxyType)
+    assert isinstance(conf, MappingProxyType) and conf["name"] == "s"
+
+
+def test_cache_with_containers(files):
+    toml, _ = files
+    load_cache.enable()
+    load_cache.hits = load_cache.misses = 0
+    try:
+        loader = get_loader("toml")
+        first = loader.load(toml, container=dict)
+        first["database"]["host"] = "changed"
+
+        second = loader.load(toml, container=MappingProxyType)
+        assert load_cache.info().hits == 1
+        assert isinstance(second["database"], MappingProxyType)
+        assert second["database"]["host"] == "db"
+
+        third = loader.load(toml)
+        assert isinstance(third, Diot) and third.database.host == "db"
+    finally:
+        load_cache.disable()
@@ -0,0 +1,101 @@
+import copy
+import pickle
+import threading
+
+import pytest
+from diot import Diot
+
+from simpleconf import Config
+from simpleconf.frozen import FrozenConfig, freeze
+
+
+def test_freeze():
+    conf = Diot(a=1, b={"c": [1, {"d": 2}], "e": {3}}, **{"f-g": 4, "in": 5})
+    frozen = freeze(conf)
+    assert isinstance(frozen, FrozenConfig)
+    assert isinstance(frozen.b, FrozenConfig)
+    assert frozen.a == 1
+    assert frozen["a"] == 1
+    assert frozen.b.c == (1, FrozenConfig({"d": 2}))
+    assert frozen.b.c[1].d == 2
+    assert frozen.b.e == frozenset({3})
+    assert frozen.f_g == 4
+    assert frozen["f-g"] == 4
+    assert frozen._in == 5
+    assert "a" in frozen
+    assert list(frozen) == ["a", "b", "f-g", "in"]
+    assert len(frozen) == 4
+    assert frozen.get("x", 1) == 1
+    assert repr(FrozenConfig({"a": 1})) == "FrozenConfig({'a': 1})"
+    with pytest.raises(AttributeError):
+        frozen.x
+
+    assert frozen == conf
+    assert frozen == freeze(conf)
+    assert frozen != {"a": 1}
+    assert frozen != 1
+    assert frozen.to_dict() == {
+        "a": 1,
+        "b": {"c": [1, {"d": 2}], "e": {3}},
+        "f-g": 4,
+        "in": 5,
+    }
+    assert FrozenConfig() == {}
+    # keys don't shadow the methods
+    with_items = freeze({"items": 1})
+    assert with_items["items"] == 1
+    assert list(with_items.items()) == [("items", 1)]
+    assert freeze(1) == 1
+    assert freeze(frozen) is frozen
+
+
+def test_frozen_immutable():
+    frozen = freeze({"a": {"b": 1}})
+    with pytest.raises(TypeError):
+        frozen["a"] = 2
+    with pytest.raises(TypeError):
+        frozen.a = 2
+    with pytest.raises(TypeError):
+        del frozen.a
+    with pytest.raises(AttributeError):
+        frozen.__dict__
+    assert not hasattr(frozen, "update")
+
+
+def test_frozen_hashable_and_shared():
+    frozen = freeze({"a": {"b": [1, 2]}, "c": 3})
+    assert hash(frozen) == hash(freeze({"c": 3, "a": {"b": [1, 2]}}))
+    assert {frozen: 1}[freeze({"a": {"b": [1, 2]}, "c": 3})] == 1
+
+    outer = FrozenConfig({"x": frozen})
+    assert outer.x is frozen
+    assert copy.copy(frozen) is frozen
+    assert copy.deepcopy(frozen) is frozen
+
+    unpickled = pickle.loads(pickle.dumps(outer))
+    assert unpickled == outer
+    assert unpickled.x.a.b == (1, 2)
+
+
+def test_frozen_across_threads():
+    frozen = freeze({"a": {"b": 1}})
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(frozen.a.b))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [1, 1, 1, 1]
+
+
+async def test_load_frozen():
+    conf = Config.load({"a": {"b": [1]}}, {"a": {"c": 2}}, frozen=True)
+    assert isinstance(conf, FrozenConfig)
+    assert conf == {"a": {"b": [1], "c": 2}}
+
+    conf = await Config.a_load({"a": {"b": [1]}}, frozen=True)
+    assert isinstance(conf, FrozenConfig)
+    assert conf.a.b == (1,)
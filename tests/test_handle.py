@@ -0,0 +1,186 @@
+import os
+
+import pytest
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.handle import ConfigHandle, _source_kind
+
+
+def _write(path, content):
+    """Write the file, making sure its mtime changes"""
+    mtime = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    parsed = []
+    parse = ConfigHandle._parse
+
+    def _parse(self, i):
+        parsed.append(str(self.configs[i]))
+        return parse(self, i)
+
+    monkeypatch.setattr(ConfigHandle, "_parse", _parse)
+    return parsed
+
+
+def test_watch(tmp_path, count_parses):
+    base = tmp_path / "base.toml"
+    override = tmp_path / "override.json"
+    _write(base, 'a = 1\n[db]\nhost = "localhost"\nport = 5432\n[log]\nlevel = 1\n')
+    _write(override, '{"db": {"port": 5433}}')
+
+    handle = Config.watch(base, {"x": 1}, override)
+    assert handle.config == {
+        "a": 1,
+        "db": {"host": "localhost", "port": 5433},
+        "log": {"level": 1},
+        "x": 1,
+    }
+    assert count_parses == [str(base), "{'x': 1}", str(override)]
+
+    count_parses.clear()
+    assert handle.reload() == []
+    assert count_parses == []
+
+    config = handle.config
+    _write(override, '{"db": {"port": 5434, "user": "me"}}')
+    assert handle.reload() == ["db.port", "db.user"]
+    assert count_parses == [str(override)]
+    assert handle.config.db == {"host": "localhost", "port": 5434, "user": "me"}
+    # unchanged keys are shared, old config is kept as is
+    assert handle.config is not config
+    assert handle.config.log is config.log
+    assert config.db.port == 5433
+
+    # touched only
+    count_parses.clear()
+    os.utime(override, ns=(1, 1))
+    assert handle.reload() == []
+    assert count_parses == [str(override)]
+
+    _write(base, "a = 2\n[db]\nhost = 'remote'\n")
+    assert handle.reload() == ["a", "db.host", "log"]
+    assert handle.config == {
+        "a": 2,
+        "db": {"host": "remote", "port": 5434, "user": "me"},
+        "x": 1,
+    }
+
+    count_parses.clear()
+    assert handle.reload(force=True) == []
+    assert len(count_parses) == 3
+
+
+def test_watch_layers_not_modified(tmp_path):
+    base = tmp_path / "base.json"
+    override = tmp_path / "override.json"
+    _write(base, '{"db": {"host": "localhost"}, "a": 1}')
+    _write(override, '{"db": {"port": 1}}')
+
+    handle = Config.watch(base, override)
+    _write(override, '{"db": {"port": 2}}')
+    assert handle.reload() == ["db.port"]
+    _write(override, '{"a": 2}')
+    assert handle.reload() == ["a", "db.port"]
+    assert handle.config == {"db": {"host": "localhost"}, "a": 2}
+
+
+def test_watch_missing_files(tmp_path):
+    conf = tmp_path / "conf.toml"
+    handle = Config.watch({"a": 1}, conf, ignore_nonexist=True)
+    assert handle.config == {"a": 1}
+
+    _write(conf, "a = 2\nb = 3")
+    assert handle.reload() == ["a", "b"]
+    assert handle.config == {"a": 2, "b": 3}
+
+    conf.unlink()
+    assert handle.reload() == ["a", "b"]
+    assert handle.config == {"a": 1}
+
+    with pytest.raises(FileNotFoundError):
+        Config.watch(conf)
+
+
+def test_watch_error_keeps_config(tmp_path):
+    conf = tmp_path / "conf.json"
+    _write(conf, '{"a": 1}')
+    handle = Config.watch(conf)
+
+    _write(conf, '{"a": ')
+    with pytest.raises(ValueError):
+        handle.reload()
+    assert handle.config == {"a": 1}
+
+    # tried again
+    _write(conf, '{"a": 2}')
+    assert handle.reload() == ["a"]
+    assert handle.config == {"a": 2}
+
+
+def test_watch_osenv(monkeypatch, tmp_path):
+    monkeypatch.setenv("HANDLE_a", "1")
+    handle = Config.watch({"a": "0", "b": "0"}, "HANDLE.osenv", parallel=2)
+    assert handle.config == {"a": "1", "b": "0"}
+    assert handle.reload() == []
+
+    monkeypatch.setenv("HANDLE_b", "2")
+    assert handle.reload() == ["b"]
+    assert handle.config == {"a": "1", "b": "2"}
+
+
+def test_watch_loader_length():
+    with pytest.raises(ValueError, match="Length of loader"):
+        Config.watch({"a": 1}, loader=["dict", "dict"])
+
+
+def test_profile_watch(tmp_path):
+    base = tmp_path / "base.toml"
+    override = tmp_path / "override.toml"
+    _write(base, "[default]\na = 1\nb = 2\n[dev]\na = 3\n")
+    _write(override, "[DEV]\nb = 4\n")
+
+    handle = ProfileConfig.watch(base, override)
+    assert handle.config.a == 1
+    assert ProfileConfig.current_profile(handle.config) == "default"
+
+    ProfileConfig.use_profile(handle.config, "dev")
+    assert handle.config.a == 3
+    assert handle.config.b == 4
+
+    _write(override, "[dev]\nb = 5\n[prod]\na = 6\n")
+    assert handle.reload() == ["dev.b", "prod"]
+    # the profile switched to is kept
+    assert ProfileConfig.current_profile(handle.config) == "dev"
+    assert handle.config.a == 3
+    assert handle.config.b == 5
+    assert ProfileConfig.pool(handle.config).default == {"a": 1, "b": 2}
+    assert ProfileConfig.profiles(handle.config) == ["default", "dev", "prod"]
+
+    _write(base, "[default]\na = 1\nb = 2\n")
+    _write(override, "[prod]\na = 6\n")
+    assert handle.reload() == ["dev"]
+    assert ProfileConfig.current_profile(handle.config) == "default"
+    assert handle.config.a == 1
+
+    _write(base, "[dev]\na = 1\n")
+    with pytest.raises(ValueError, match="Base profile"):
+        handle.reload()
+
+
+def test_profile_watch_missing_base(tmp_path):
+    conf = tmp_path / "conf.toml"
+    _write(conf, "[dev]\na = 1\n")
+    handle = ProfileConfig.watch(conf, allow_missing_base=True)
+    assert ProfileConfig.current_profile(handle.config) is None
+    assert ProfileConfig.profiles(handle.config) == ["dev"]
+
+
+def test_source_kind(tmp_path):
+    assert _source_kind({"a": 1}) == "static"
+    assert _source_kind("s3://bucket/conf.toml") == "volatile"
+    assert _source_kind("XXX.osenv") == "volatile"
+    assert _source_kind(tmp_path / "conf.toml") == "file"
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import pytest
+
+import simpleconf
+
+HEAVY_MODULES = [
+    "panpath",
+    "asyncio",
+    "concurrent.futures",
+    "importlib.metadata",
+    "pathlib",
+    "pickle",
+    "json",
+    "yaml",
+]
+
+
+def _imported_by(stmt):
+    code = (
+        "import sys; before = set(sys.modules); "
+        f"{stmt}; "
+        "print(' '.join(m for m in sys.modules if m not in before))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(out.stdout.split())
+
+
+def test_import_is_lazy():
+    imported = _imported_by("import simpleconf")
+    assert imported == {"simpleconf"}
+
+
+def test_heavy_modules_not_imported():
+    imported = _imported_by("from simpleconf import Config, ProfileConfig")
+    assert "simpleconf.config" in imported
+    assert sorted(imported.intersection(HEAVY_MODULES)) == []
+
+
+def test_lazy_attributes():
+    assert simpleconf.Config.__name__ == "Config"
+    assert "ProfileConfig" in dir(simpleconf)
+    with pytest.raises(AttributeError):
+        simpleconf.NonExisting
+
+
+def test_local_files_skip_panpath(tmp_path):
+    conf = tmp_path / "conf.json"
+    conf.write_text('{"a": 1}')
+    imported = _imported_by(
+        f"from simpleconf import Config; Config.load({str(conf)!r})"
+    )
+    assert "simpleconf.loaders.json" in imported
+    assert "panpath" not in imported
@@ -0,0 +1,94 @@
+import pytest
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.index import ConfigIndex
+
+
+def test_index():
+    conf = Config.load(
+        {"db": {"host": "localhost", "port": 1, "pool": {"size": 2}}},
+        {"db-x": 3, "dc": {}, "a": [1, 2]},
+        index=True,
+    )
+    index = Config.index(conf)
+    assert isinstance(index, ConfigIndex)
+    assert Config.index(conf) is index
+    # not an item of the configuration
+    assert list(conf) == ["db", "db-x", "dc", "a"]
+
+    assert index["db.host"] == "localhost"
+    assert index["db.pool.size"] == 2
+    assert index["db.pool"] is conf.db.pool
+    assert index.get("db.user") is None
+    assert "db.port" in index
+    assert "db.user" not in index
+    assert len(index) == 8
+    assert repr(index) == "<ConfigIndex (8 paths)>"
+
+    assert list(index.prefix("db")) == [
+        ("db.host", "localhost"),
+        ("db.pool.size", 2),
+        ("db.port", 1),
+    ]
+    assert list(index.prefix("db.pool")) == [("db.pool.size", 2)]
+    assert list(index.prefix("db.port")) == [("db.port", 1)]
+    assert list(index.prefix("dc")) == [("dc", {})]
+    assert list(index.prefix("x")) == []
+    assert [path for path, _ in index.prefix()] == [
+        "a",
+        "db-x",
+        "db.host",
+        "db.pool.size",
+        "db.port",
+        "dc",
+    ]
+
+    conf.db.port = 5
+    assert index["db.port"] == 1
+    index.rebuild()
+    assert index["db.port"] == 5
+
+
+async def test_index_built_on_demand():
+    conf = await Config.a_load({"a": {"b": 1}}, index=True)
+    assert Config.index(conf)["a.b"] == 1
+
+    conf = Config.load({"a": {"b": 1}})
+    assert Config.index(conf)["a.b"] == 1
+    assert Config.index(conf) is Config.index(conf)
+
+    conf = Config.load({"a": {"b": 1}}, frozen=True)
+    assert Config.index(conf)["a.b"] == 1
+
+    with pytest.raises(ValueError, match="frozen"):
+        Config.load({"a": 1}, frozen=True, index=True)
+
+
+async def test_index_use_profile():
+    profiles = {
+        "default": {"db": {"host": "localhost", "port": 1}},
+        "dev": {"db": {"port": 2}, "debug": True},
+    }
+    conf = ProfileConfig.load(profiles, index=True)
+    index = Config.index(conf)
+    assert index["db.port"] == 1
+    assert "debug" not in index
+    assert not any(path.startswith("_SIMPLECONF") for path in index)
+
+    ProfileConfig.use_profile(conf, "dev")
+    assert Config.index(conf) is index
+    assert index["db.port"] == 2
+    assert index["db.host"] == "localhost"
+    assert index["debug"] is True
+
+    copied = ProfileConfig.use_profile(conf, "default", copy=True)
+    assert Config.index(copied) is not index
+    assert Config.index(copied)["db.port"] == 1
+    assert index["db.port"] == 2
+
+    with ProfileConfig.with_profile(conf, "default"):
+        assert index["db.port"] == 1
+    assert index["db.port"] == 2
+
+    conf = await ProfileConfig.a_load(profiles, index=True)
+    assert Config.index(conf)["db.port"] == 1
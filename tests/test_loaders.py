@@ -4,6 +4,13 @@ import pytest
 from os import environ
 from diot import Diot
 from simpleconf.utils import get_loader
+from simpleconf.loaders import (
+    Loader,
+    LocalFile,
+    PreloadedPath,
+    a_preload,
+    preload,
+)
 from simpleconf.loaders.dict import DictLoader
 
 pytest_plugins = ["tests.fixt_simpleconf"]
@@ -21,6 +28,28 @@ def test_dict_loader():
     assert loaded == {"a": 1}
 
 
+def test_dict_loader_not_changed():
+    from simpleconf import Config, ProfileConfig
+
+    conf = Diot(a={"x": 1}, servers=[{"y": 1}])
+    merged = Config.load(conf, {"a": {"y": 2}, "c": 3, "servers": [2]})
+    assert merged == {"a": {"x": 1, "y": 2}, "c": 3, "servers": [2]}
+    assert merged is not conf
+    assert conf == {"a": {"x": 1}, "servers": [{"y": 1}]}
+
+    merged = Config.load(conf)
+    merged.a.x = 2
+    merged.servers[0].y = 2
+    assert conf == {"a": {"x": 1}, "servers": [{"y": 1}]}
+    assert get_loader("dict").loading(None, False) is None
+
+    profiles = Diot(default={"a": {"x": 1}}, dev={"a": {"y": 2}})
+    merged = ProfileConfig.load(profiles, {"default": {"b": 1}})
+    ProfileConfig.use_profile(merged, "dev")
+    assert ProfileConfig.detach(merged) == {"a": {"x": 1, "y": 2}, "b": 1}
+    assert profiles == {"default": {"a": {"x": 1}}, "dev": {"a": {"y": 2}}}
+
+
 async def test_dict_a_loader():
     loader = get_loader("dict")
 
@@ -530,3 +559,358 @@ async def test_osenv_a_loader():
         loaded = await loader.a_load_with_profiles("SIMPLECONF_TEST.osenv")
     assert isinstance(loaded, Diot)
     assert loaded == {"default": {"B": "2"}}
+
+
+def test_preloaded_path(tmp_path):
+    path = tmp_path / "conf.toml"
+    path.write_bytes(b"# first\r\na = 1\r\nb = 2")
+    preloaded = preload(path)
+    assert isinstance(preloaded, PreloadedPath)
+    assert repr(preloaded) == f"PreloadedPath({str(path)!r})"
+    assert str(preloaded) == str(path)
+    assert preloaded.name == "conf.toml"
+    assert preloaded.exists()
+    assert preloaded.first_line() == "# first\r"
+    assert preloaded.read_text() == "# first\na = 1\nb = 2"
+    assert get_loader("toml").load(preloaded) == {"a": 1, "b": 2}
+
+    path.write_bytes(b"a = 1")
+    assert preload(path).first_line() == "a = 1"
+
+    assert preload({"a": 1}) == {"a": 1}
+    assert preload("/nonexistent/conf.toml") == "/nonexistent/conf.toml"
+
+
+async def test_a_preloaded_path(tmp_path):
+    path = tmp_path / "conf.toml"
+    path.write_bytes(b"a = 1")
+    preloaded = await a_preload(path)
+    assert await preloaded.a_exists()
+    assert await preloaded.a_read_bytes() == b"a = 1"
+    assert await preloaded.a_read_text() == "a = 1"
+    assert await get_loader("toml").a_load(preloaded) == {"a": 1}
+
+    assert await a_preload({"a": 1}) == {"a": 1}
+    assert await a_preload("/nonexistent/x.toml") == "/nonexistent/x.toml"
+
+
+async def test_local_file(tmp_path):
+    path = tmp_path / "conf.toml"
+    path.write_bytes(b"a = 1\r\nb = 2")
+    local = Loader._convert_path(path)
+    assert isinstance(local, LocalFile)
+    assert repr(local) == f"LocalFile({str(path)!r})"
+    assert str(local) == str(path)
+    assert local.name == "conf.toml"
+    assert local.exists()
+    assert await local.a_exists()
+    assert local.read_bytes() == b"a = 1\r\nb = 2"
+    assert await local.a_read_bytes() == b"a = 1\r\nb = 2"
+    assert local.read_text() == "a = 1\nb = 2"
+    assert await local.a_read_text() == "a = 1\nb = 2"
+    assert get_loader("toml").loading(str(path), False) == {"a": 1, "b": 2}
+
+    assert Loader._convert_path(local) is local
+    assert isinstance(preload(str(path)).path, LocalFile)
+    assert not LocalFile(tmp_path / "nonexistent.toml").exists()
+    assert not LocalFile("a\0b").exists()
+    with pytest.raises(FileNotFoundError):
+        get_loader("toml").load(tmp_path / "nonexistent.toml")
+
+
+def test_uri_uses_panpath():
+    path = Loader._convert_path("s3://bucket/conf.toml")
+    assert isinstance(path, PanPath)
+    assert str(path) == "s3://bucket/conf.toml"
+
+
+async def test_preload_uri(tmp_path):
+    path = tmp_path / "conf.toml"
+    path.write_text("a = 1")
+    preloaded = preload(f"file://{path}")
+    assert isinstance(preloaded.path, PanPath)
+    assert preloaded.read_bytes() == b"a = 1"
+    # only the local files are signed for the load cache
+    assert preloaded.signature is None
+    assert preload(path).signature[1] == 5
+
+    preloaded = await a_preload(f"file://{path}")
+    assert await preloaded.a_read_bytes() == b"a = 1"
+    assert preloaded.signature is None
+
+    missing = f"file://{tmp_path}/nonexistent.toml"
+    assert preload(missing) == missing
+    assert await a_preload(missing) == missing
+
+
+async def test_local_file_reads_concurrently(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+
+    path = tmp_path / "conf.toml"
+    path.write_bytes(b"a = 1")
+    # passed only if both reads are waiting at the same time, on threads
+    barrier = threading.Barrier(2, timeout=5)
+    read_bytes = LocalFile.read_bytes
+    read_signed = LocalFile.read_signed
+
+    def _read_bytes(self):
+        barrier.wait()
+        return read_bytes(self)
+
+    def _read_signed(self):
+        barrier.wait()
+        return read_signed(self)
+
+    monkeypatch.setattr(LocalFile, "read_bytes", _read_bytes)
+    monkeypatch.setattr(LocalFile, "read_signed", _read_signed)
+    local = LocalFile(path)
+    assert await asyncio.gather(local.a_read_bytes(), local.a_read_bytes()) == [
+        b"a = 1",
+        b"a = 1",
+    ]
+    first, second = await asyncio.gather(a_preload(path), a_preload(path))
+    assert first.content == second.content == b"a = 1"
+
+
+@pytest.fixture
+def large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr("simpleconf.loaders.LARGE_FILE_SIZE", 16)
+    files = {}
+    for name, content in {
+        "conf.json": '{"a": {"b": [1, 2.5, null]}, "c": "x"}',
+        "conf.yaml": (
+            "base: &b {x: 1, y: 2}\n"
+            "a: {<<: *b, y: 3, z: [1, 2.5, null, true]}\n"
+            "s: !!set {p, q}\nl: [*b]\n"
+        ),
+        "conf.yml.j2": "a: {{ 1 + 1 }}\n",
+        "small.yaml": "a: 1",
+    }.items():
+        files[name] = tmp_path / name
+        files[name].write_text(content)
+    return files
+
+
+async def test_large_files(large_files, monkeypatch):
+    from simpleconf import Config
+
+    read = []
+    read_signed = LocalFile.read_signed
+
+    def _read_signed(self):
+        read.append(self.name)
+        return read_signed(self)
+
+    monkeypatch.setattr(LocalFile, "read_signed", _read_signed)
+
+    assert isinstance(preload(large_files["conf.json"]), LocalFile)
+    assert isinstance(await a_preload(large_files["conf.json"]), LocalFile)
+    assert isinstance(preload(large_files["small.yaml"]), PreloadedPath)
+    assert not LocalFile(large_files["conf.json"].parent / "x.json").is_large()
+
+    expected = {"a": {"b": [1, 2.5, None]}, "c": "x"}
+    assert Config.load(large_files["conf.json"]) == expected
+    assert await Config.a_load(large_files["conf.json"]) == expected
+
+    expected = {
+        "base": {"x": 1, "y": 2},
+        "a": {"x": 1, "y": 3, "z": [1, 2.5, None, True]},
+        "s": {"p", "q"},
+        "l": [{"x": 1, "y": 2}],
+    }
+    assert Config.load(large_files["conf.yaml"]) == expected
+    assert await Config.a_load(large_files["conf.yaml"]) == expected
+    assert Config.load(large_files["conf.yaml"], only=["a.y"]) == {"a": {"y": 3}}
+    assert read == ["small.yaml"]
+
+    # templates are rendered from the whole content
+    assert Config.load(large_files["conf.yml.j2"]) == {"a": 2}
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson", "ujson"])
+def test_large_json_backends(large_files, monkeypatch, backend):
+    from simpleconf import backends
+
+    try:
+        chosen = backends.BACKENDS["json"][backend]()
+    except ImportError:
+        pytest.skip(f"{backend} is not installed")
+    monkeypatch.setitem(backends._BACKENDS, "json", chosen)
+    assert get_loader("json").load(large_files["conf.json"]) == {
+        "a": {"b": [1, 2.5, None]},
+        "c": "x",
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "just a string",
+        "- 1\n- [2, {a: &x 3}]\n- *x\n",
+        "t: !!python/tuple [1, 2]\nd: 2001-12-14\nn: !!str 1\nb: !!binary aGk=\n",
+        "a: &a {x: 1}\nb: &c {y: 2, x: 3}\nm: {q: 0, <<: [*a, *c], y: 9}\n",
+        "o: &o !!omap [{a: [&v 1, {c: 2}]}, {b: *v}]\np: *o\n",
+        "j: !!python/name:os.path.join ''\n",
+        "base: &b 5\nother: !!omap [a: *b]\n",
+        "t: !!python/tuple [&c 2, 3]\nu: *c\n",
+        "t: !!python/tuple [{<<: &m {x: 1}}]\nu: *m\n",
+    ],
+)
+def test_large_yaml_same_as_yaml_load(tmp_path, monkeypatch, content):
+    import yaml
+
+    monkeypatch.setattr("simpleconf.loaders.LARGE_FILE_SIZE", 0)
+    path = tmp_path / "conf.yaml"
+    path.write_text(content)
+    loaded = get_loader("yaml").loading(LocalFile(path), False)
+    expected = yaml.load(content, Loader=yaml.FullLoader)
+    assert loaded == expected
+    if isinstance(expected, dict):
+        assert list(loaded) == list(expected)
+        assert list(loaded.get("m", {})) == list(expected.get("m", {}))
+
+
+def test_large_yaml_aliases_shared_with_tagged(tmp_path, monkeypatch):
+    monkeypatch.setattr("simpleconf.loaders.LARGE_FILE_SIZE", 0)
+    path = tmp_path / "conf.yaml"
+    path.write_text("l: &l [1]\nt: !!python/tuple [*l, &m [2]]\nu: *m\nv: *m\n")
+    loaded = get_loader("yaml").loading(LocalFile(path), False)
+    assert loaded == {"l": [1], "t": ([1], [2]), "u": [2], "v": [2]}
+    assert loaded["t"][0] is loaded["l"]
+    assert loaded["t"][1] is loaded["u"] is loaded["v"]
+
+
+@pytest.mark.parametrize(
+    "content,error",
+    [
+        ("a: 1\n---\nb: 2\n", "expected a single document"),
+        ("a: *x\n", "found undefined alias"),
+        ("a: !!set {b: *x}\n", "found undefined alias"),
+        ("? [a]\n: 1\n", "found unhashable key"),
+        ("a: {<<: 1}\n", "expected a mapping or list of mappings"),
+    ],
+)
+def test_large_yaml_errors(tmp_path, monkeypatch, content, error):
+    import yaml
+
+    monkeypatch.setattr("simpleconf.loaders.LARGE_FILE_SIZE", 0)
+    path = tmp_path / "conf.yaml"
+    path.write_text(content)
+    with pytest.raises(yaml.YAMLError, match=error):
+        get_loader("yaml").loading(LocalFile(path), False)
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Record the types of the content passed to the backends"""
+    from simpleconf import backends
+
+    parsed = []
+    for fmt in ("json", "yaml", "toml"):
+        backend = backends.get_backend(fmt)
+
+        def _loads(content, loads=backend.loads):
+            parsed.append(type(content))
+            return loads(content)
+
+        monkeypatch.setitem(backends._BACKENDS, fmt, backend._replace(loads=_loads))
+    return parsed
+
+
+@pytest.mark.parametrize(
+    "ext,content",
+    [
+        ("json", b'{"a": "\xc3\xa9"}'),
+        ("yaml", b"a: \xc3\xa9"),
+    ],
+)
+async def test_bytes_passed_to_parsers(tmp_path, parsed, ext, content):
+    path = tmp_path / f"conf.{ext}"
+    path.write_bytes(content)
+    loader = get_loader(ext)
+    assert loader.loading(preload(path), False) == {"a": "é"}
+    assert await loader.a_loading(await a_preload(path), False) == {"a": "é"}
+    with open(path, "rb") as fh:
+        assert await loader.a_loading(fh, False) == {"a": "é"}
+    assert parsed == [bytes, bytes, bytes]
+
+
+def test_toml_loader_parses_once(tmp_path, parsed):
+    path = tmp_path / "conf.toml"
+    path.write_bytes(b'a = "\xc3\xa9"')
+    assert get_loader("toml").load(path) == {"a": "é"}
+    assert parsed == [str]
+
+    parsed.clear()
+    path.write_bytes(b"a = ")
+    with pytest.raises(Exception):
+        get_loader("toml").load(path)
+    assert parsed == [str]
+
+
+@pytest.mark.parametrize(
+    "ext,content,skipped",
+    [
+        ("yaml.j2", b"a: \xc3\xa9 # {not a template}", True),
+        ("yaml.liq", b"a: \xc3\xa9", True),
+        ("yaml.j2", b"a: {{ '\xc3\xa9' }}", False),
+        ("yaml.liq", b"a: {% if true %}\xc3\xa9{% endif %}", False),
+        ("yaml.j2", b"a: \xc3\xa9 {# comment #}", False),
+    ],
+)
+def test_template_fast_path(tmp_path, parsed, ext, content, skipped):
+    from simpleconf.cache import template_cache
+
+    path = tmp_path / f"conf.{ext}"
+    path.write_bytes(content)
+    renders, skips = template_cache.renders, template_cache.skips
+    assert get_loader(ext).load(path) == {"a": "é"}
+    assert template_cache.skips - skips == int(skipped)
+    assert template_cache.renders - renders == int(not skipped)
+    # still passed as bytes to the parser if not rendered
+    assert parsed == [bytes if skipped else str]
+
+
+def test_template_fast_path_custom_delimiters(tmp_path, monkeypatch):
+    from simpleconf.cache import template_cache
+
+    loader = get_loader("json.j2")
+    monkeypatch.setattr(
+        type(loader),
+        "TEMPLATE_OPTIONS",
+        {"variable_start_string": "<<", "variable_end_string": ">>"},
+    )
+    path = tmp_path / "conf.json.j2"
+    path.write_text('{"a": << 1 + 1 >>, "b": "{{"}')
+    renders = template_cache.renders
+    assert loader.load(path) == {"a": 2, "b": "{{"}
+    assert template_cache.renders == renders + 1
+
+    monkeypatch.setattr(type(loader), "TEMPLATE_OPTIONS", {"line_statement_prefix": "%"})
+    path.write_text('{\n% if true\n"a": 3\n% endif\n}')
+    assert loader.load(path) == {"a": 3}
+    assert template_cache.renders == renders + 2
+
+
+def test_template_mixin_abstract():
+    from simpleconf.loaders import TemplateModifierMixin
+    from simpleconf.loaders.json import JsonLoader
+
+    class NoEngineLoader(TemplateModifierMixin, JsonLoader):
+        @classmethod
+        def _create_environment(cls, options):  # pragma: no cover
+            return None
+
+    with pytest.raises(TypeError, match="_engine"):
+        NoEngineLoader()
+
+
+def test_env_loader_interpolation(monkeypatch):
+    monkeypatch.setenv("SIMPLECONF_TEST_HOST", "localhost")
+    loader = get_loader("envs")
+    assert loader.loading(
+        "A=1\nB=${A}2\nC=${SIMPLECONF_TEST_HOST}", False
+    ) == {"A": "1", "B": "12", "C": "localhost"}
+    assert loader.loading("A=1\nB=@int:2", False) == {"A": "1", "B": "@int:2"}
@@ -0,0 +1,198 @@
+import pytest
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.caster import cast
+from simpleconf.loaders import Loader
+from simpleconf.projection import ANY, projection_tree, prune, prune_profile_keys
+
+
+def test_projection_tree():
+    assert projection_tree([]) == {}
+    assert projection_tree(["a", "b.c", "b.d.e"]) == {
+        "a": True,
+        "b": {"c": True, "d": {"e": True}},
+    }
+    # the ancestor wins, in any order
+    assert projection_tree(["a.b", "a"]) == {"a": True}
+    assert projection_tree(["a", "a.b"]) == {"a": True}
+
+
+def test_prune():
+    data = {"a": {"x": 1, "y": 2}, "b": "@json:{}", "c": [1]}
+    assert prune(data, {"a": {"x": True}, "b": {"z": True}, "d": True}) == {
+        "a": {"x": 1},
+        # not a dict yet, kept
+        "b": "@json:{}",
+    }
+    assert prune(data, {ANY: {"x": True}}) == {"a": {"x": 1}, "b": "@json:{}", "c": [1]}
+    # subtrees are shared
+    assert prune(data, {"a": True})["a"] is data["a"]
+
+    flat = {"default_a": 1, "dev_b": 2, "noprofile": 3}
+    assert prune_profile_keys(flat, {"a": True}) == {"default_a": 1, "noprofile": 3}
+    assert prune_profile_keys(flat, {ANY: True}) == flat
+
+
+@pytest.fixture
+def shared(tmp_path):
+    files = {
+        "base.yaml": (
+            "common: &common\n  x: 1\n  y: 2\n"
+            "database:\n  <<: *common\n  host: localhost\n"
+            "cache:\n  redis: {port: 6379}\n  memcached: {port: 11211}\n"
+            "log: {level: info}\n"
+        ),
+        "override.json": '{"cache": {"redis": {"db": 1}}, "other": [1, 2]}',
+        "override.toml": '[database]\nport = 5432\n[extra]\na = 1\n',
+        "override.env": "database=@json:{\"user\": \"me\"}\nlog=debug\n",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    return {name: tmp_path / name for name in files}
+
+
+def test_load_only(shared):
+    conf = Config.load(*shared.values(), only=["database", "cache.redis"])
+    assert conf == {
+        "database": {"x": 1, "y": 2, "host": "localhost", "port": 5432, "user": "me"},
+        "cache": {"redis": {"port": 6379, "db": 1}},
+    }
+    # the full configuration is not mixed up with the projected one
+    assert "log" in Config.load(*shared.values())
+    assert Config.load(*shared.values(), only=[]) == {}
+    assert Config.load_one(shared["base.yaml"], only=["database.host"]) == {
+        "database": {"host": "localhost"}
+    }
+    assert Config.load(
+        shared["base.yaml"].parent / "nonexistent.yaml",
+        ignore_nonexist=True,
+        only=["a"],
+    ) == {}
+    assert Config.load("a: 1\nb: 2", loader="yamls", only=["b"]) == {"b": 2}
+
+
+def test_osenv_only(monkeypatch):
+    monkeypatch.setenv("PROJ_a", "1")
+    monkeypatch.setenv("PROJ_b", "2")
+    assert Config.load("PROJ.osenv", only=["b"]) == {"b": "2"}
+
+
+def test_load_only_casted_after_pruning(shared, monkeypatch):
+    casted = []
+
+    def _cast(loaded, casters, schema=None):
+        casted.append(list(loaded))
+        return cast(loaded, casters, schema)
+
+    monkeypatch.setattr("simpleconf.loaders.cast", _cast)
+    conf = Config.load(shared["override.env"], only=["database.user"])
+    # casted value kept as a whole
+    assert conf == {"database": {"user": "me"}}
+    assert casted == [["database"]]
+
+
+def test_yaml_only_not_constructed(shared, monkeypatch):
+    import yaml
+
+    constructed = []
+    construct = yaml.constructor.FullConstructor.construct_mapping
+
+    def construct_mapping(self, node, deep=False):
+        out = construct(self, node, deep=deep)
+        constructed.append(sorted(out))
+        return out
+
+    monkeypatch.setattr(
+        yaml.constructor.FullConstructor,
+        "construct_mapping",
+        construct_mapping,
+    )
+    conf = Config.load_one(shared["base.yaml"], only=["cache.redis"])
+    assert conf == {"cache": {"redis": {"port": 6379}}}
+    assert ["port"] in constructed
+    assert ["host", "x", "y"] not in constructed
+    assert ["level"] not in constructed
+
+
+def test_yaml_only_aliases_not_affected(tmp_path):
+    conf = tmp_path / "conf.yaml"
+    conf.write_text("a: &a {x: 1, y: 2}\nb: *a\nc: {<<: *a, z: 3}\n")
+    assert Config.load(conf, only=["a", "b.x", "c.z"]) == {
+        "a": {"x": 1, "y": 2},
+        "b": {"x": 1},
+        "c": {"z": 3},
+    }
+    assert Config.load(conf, only=["c.x"]) == {"c": {"x": 1}}
+
+
+def test_profile_load_only(tmp_path, monkeypatch):
+    toml = tmp_path / "conf.toml"
+    toml.write_text("[default]\na = 1\nb = 2\n[dev]\na = 3\nc = 4\n")
+    yaml = tmp_path / "conf.yaml"
+    yaml.write_text("default: {a: {x: 1, y: 2}}\nprod: {a: {x: 3}, b: 5}\n")
+    ini = tmp_path / "conf.ini"
+    ini.write_text("[default]\na = 1\nc = 2\n[DEV]\nb = 5\n")
+    env = tmp_path / "conf.env"
+    env.write_text("default_a=1\ndefault_c=2\ndev_b=6\n")
+    monkeypatch.setenv("PROJ_default_b", "7")
+    monkeypatch.setenv("PROJ_default_c", "8")
+
+    conf = ProfileConfig.load(toml, yaml, ini, env, "PROJ.osenv", only=["a.x", "b"])
+    assert ProfileConfig.pool(conf) == {
+        # values without casting prefixes are kept as strings
+        "default": {"a": "1", "b": "7"},
+        "dev": {"a": 3, "b": "6"},
+        "prod": {"a": {"x": 3}, "b": 5},
+    }
+
+    conf = ProfileConfig.load_one(ini, only=["c"])
+    assert ProfileConfig.pool(conf) == {"default": {"c": "2"}, "dev": {}}
+
+
+async def test_async_load_only(shared):
+    conf = await Config.a_load(
+        shared["base.yaml"],
+        shared["override.json"],
+        only=["cache.redis"],
+    )
+    assert conf == {"cache": {"redis": {"port": 6379, "db": 1}}}
+    assert await Config.a_load(
+        shared["base.yaml"].parent / "nonexistent.yaml",
+        ignore_nonexist=True,
+        only=["a"],
+    ) == {}
+    assert await Config.a_load("a: 1\nb: 2", loader="yamls", only=["b"]) == {"b": 2}
+
+    conf = await ProfileConfig.a_load(
+        {"default": {"a": 1, "b": 2}},
+        loader="dict",
+        only=["b"],
+    )
+    assert ProfileConfig.pool(conf) == {"default": {"b": 2}}
+    conf = await ProfileConfig.a_load_one(
+        shared["base.yaml"],
+        only=["x"],
+        allow_missing_base=True,
+    )
+    assert ProfileConfig.pool(conf) == {
+        "common": {"x": 1},
+        "database": {"x": 1},
+        # profiles are kept
+        "cache": {},
+        "log": {},
+    }
+
+
+def test_loader_only_default_pruning():
+    class ListLoader(Loader):
+        def loading(self, conf, ignore_nonexist):
+            return dict(conf)
+
+        async def a_loading(self, conf, ignore_nonexist):
+            return dict(conf)
+
+    loader = ListLoader()
+    assert loader.load([("a", 1), ("b", 2)], only=["b"]) == {"b": 2}
+    assert loader.load_with_profiles([("p", {"a": 1, "b": 2})], only=["a"]) == {
+        "p": {"a": 1}
+    }
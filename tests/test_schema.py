@@ -0,0 +1,248 @@
+import enum
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple, TypedDict, Union
+
+import pytest
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.cache import load_cache
+from simpleconf.caster import cast
+from simpleconf.projection import ANY
+from simpleconf.schema import CompiledSchema, compile_schema
+from simpleconf.utils import get_loader
+
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass
+class Database:
+    host: str
+    port: int
+    tags: List[str]
+
+
+@dataclass
+class AppConfig:
+    debug: bool
+    database: Database
+    timeout: Optional[float] = None
+
+
+class Limits(TypedDict):
+    cpu: float
+    memory: int
+
+
+@pytest.mark.parametrize(
+    "tp,value,expected",
+    [
+        (int, "8080", 8080),
+        (float, "0.5", 0.5),
+        (str, "@int:1", "@int:1"),
+        (bool, "Yes", True),
+        (bool, "off", False),
+        (bool, "0", False),
+        (None, "null", None),
+        (type(None), "", None),
+        (Optional[int], "None", None),
+        (Optional[int], "1", 1),
+        (Union[int, float], "1.5", 1.5),
+        (Union[int, bool], "true", True),
+        (list, "[1, 2]", [1, 2]),
+        (List[int], "[1, 2]", [1, 2]),
+        (Tuple[int, ...], "[1, 2]", (1, 2)),
+        (set, "[1, 1]", {1}),
+        (Dict[str, int], '{"a": 1}', {"a": 1}),
+        (Database, '{"host": "h"}', {"host": "h"}),
+        (Path, "/tmp", Path("/tmp")),
+        (Color, "red", Color.RED),
+        (Literal["a", 1], "1", 1),
+        (Any, "@int:1", 1),
+        (Optional[Any], "@int:1", 1),
+    ],
+)
+def test_convert(tp, value, expected):
+    conf = {"a": value, "b": "@int:2"}
+    assert cast(conf, get_loader("env").CASTERS, compile_schema({"a": tp}).nodes) == {
+        "a": expected,
+        "b": 2,
+    }
+
+
+@pytest.mark.parametrize(
+    "tp,value",
+    [
+        (int, "x"),
+        (bool, "maybe"),
+        (None, "x"),
+        (Optional[int], "x"),
+        (Union[int, float], "x"),
+        (list, '{"a": 1}'),
+        (Database, "[1]"),
+        (Color, "green"),
+        (Literal["a"], "b"),
+    ],
+)
+def test_convert_error(tp, value):
+    schema = compile_schema({"a": {"b": tp}})
+    with pytest.raises(ValueError, match="Failed to convert 'a.b'"):
+        cast({"a": {"b": value}}, [], schema.nodes)
+
+
+def test_compile_schema():
+    schema = compile_schema({"a.b": int, "a.c": {"d": bool}, "e": Dict[str, int]})
+    assert isinstance(schema, CompiledSchema)
+    assert compile_schema(schema) is schema
+    assert set(schema.nodes) == {"a", "e"}
+    assert set(schema.nodes["a"].children) == {"b", "c"}
+    assert schema.nodes["a"].children["c"].children["d"].type is bool
+    assert schema.nodes["e"].children[ANY].type is int
+    assert schema.fingerprint == compile_schema(
+        {"e": Dict[str, int], "a": {"c.d": bool, "b": int}}
+    ).fingerprint
+    assert schema.fingerprint != compile_schema({"a.b": float}).fingerprint
+    # the same across processes, for the disk cache
+    assert "@" not in compile_schema({"c": Color, "d": List[Database]}).fingerprint
+
+
+def _local_type(tp):
+    class Local:
+        def __init__(self, value):
+            self.value = tp(value)
+
+    return Local
+
+
+def test_schema_fingerprint_local_classes():
+    first, second = _local_type(int), _local_type(float)
+    assert repr(first) == repr(second)
+    fingerprints = {
+        compile_schema({"a": tp}).fingerprint
+        for tp in (first, second, Optional[first], Optional[second])
+    }
+    assert len(fingerprints) == 4
+    assert compile_schema({"a": first}).fingerprint == (
+        compile_schema({"a": first}).fingerprint
+    )
+
+    # compiled once for classes
+    assert compile_schema(AppConfig) is compile_schema(AppConfig)
+    assert compile_schema(AppConfig).nodes["database"].children["port"].type is int
+    assert compile_schema(Limits).nodes["memory"].type is int
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [{"a": int, "a.b": int}, {"a.b": int, "a": int}],
+)
+def test_compile_schema_conflicts(schema):
+    with pytest.raises(ValueError, match="Conflicting"):
+        compile_schema(schema)
+
+
+@pytest.mark.parametrize("schema", [int, List[int], {"a": object()}, {"a": 1}])
+def test_compile_schema_unsupported(schema):
+    with pytest.raises(TypeError):
+        compile_schema(schema)
+
+
+def test_load_with_schema(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text(
+        "debug=yes\n"
+        'database={"host": "db", "port": "5432", "tags": ["a"]}\n'
+        "timeout=\n"
+        "other=@int:1\n"
+        "plain=1\n"
+    )
+    conf = Config.load(env, schema=AppConfig)
+    assert conf == {
+        "debug": True,
+        "database": {"host": "db", "port": 5432, "tags": ["a"]},
+        "timeout": None,
+        "other": 1,
+        "plain": "1",
+    }
+
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nport = 8080\nname = @int:1\nratio = 0.5\n")
+    toml = tmp_path / "config.toml"
+    toml.write_text('ratio = "1.5"\n')
+    schema = {"port": int, "name": str, "ratio": float}
+    assert Config.load(ini, toml, schema=schema) == {
+        "port": 8080,
+        "name": "@int:1",
+        "ratio": 1.5,
+    }
+    assert Config.load_one(ini, schema=schema).port == 8080
+
+
+def test_load_with_schema_nested(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text(
+        'database=@json:{"port": "1", "host": "@int:2", "opts": {"a": "@int:3"}}\n'
+    )
+    # the values of the dicts casted from strings are converted as well,
+    # but not casted by the prefixes
+    conf = Config.load(env, schema={"database.port": int})
+    assert conf == {"database": {"port": 1, "host": "@int:2", "opts": {"a": "@int:3"}}}
+
+
+async def test_a_load_with_schema(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text("port=8080\n")
+    conf = await Config.a_load(env, schema={"port": int})
+    assert conf.port == 8080
+    conf = await Config.a_load_one(env, schema={"port": int})
+    assert conf.port == 8080
+
+
+def test_profiles_with_schema(tmp_path, monkeypatch):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nport = 80\n[dev]\nport = 8080\ndebug = on\n")
+    env = tmp_path / "config.env"
+    env.write_text("DEV_limits={\"cpu\": 1, \"memory\": 2}\n")
+    monkeypatch.setenv("SCHEMA_DEV_debug", "off")
+
+    schema = {"port": int, "debug": bool, "limits": Limits}
+    conf = ProfileConfig.load(ini, env, "SCHEMA.osenv", schema=schema)
+    assert conf.port == 80
+    ProfileConfig.use_profile(conf, "dev")
+    assert ProfileConfig.detach(conf) == {
+        "port": 8080,
+        "debug": False,
+        "limits": {"cpu": 1, "memory": 2},
+    }
+
+    conf = ProfileConfig.load_one(ini, schema=schema)
+    assert conf.port == 80
+
+    with pytest.raises(ValueError, match="'dev.debug'"):
+        ProfileConfig.load(ini, "SCHEMA.osenv", schema={"debug": int})
+
+
+async def test_a_profiles_with_schema(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nport = 80\n")
+    conf = await ProfileConfig.a_load(ini, schema={"port": int})
+    assert conf.port == 80
+    conf = await ProfileConfig.a_load_one(ini, schema={"port": int})
+    assert conf.port == 80
+
+
+def test_schema_cached_separately(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text("port=8080\n")
+    load_cache.enable()
+    try:
+        assert Config.load(env).port == "8080"
+        assert Config.load(env, schema={"port": int}).port == 8080
+        assert Config.load(env, schema={"port": float}).port == 8080.0
+        assert Config.load(env, schema={"port": int}).port == 8080
+        assert load_cache.info().currsize == 3
+    finally:
+        load_cache.disable()
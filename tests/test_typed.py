@@ -0,0 +1,228 @@
+import sys
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import pytest
+from diot import Diot
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.exceptions import NoSuchProfile, ValidationError
+from simpleconf.typed import build, compile_builder, field_paths
+
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**SLOTS)
+class Database:
+    host: str
+    port: int = 5432
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class Server(NamedTuple):
+    name: str
+    port: int = 80
+
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+@dataclass(**SLOTS)
+class AppConfig:
+    debug: bool
+    database: Database
+    servers: List[Server] = field(default_factory=list)
+    caches: Dict[str, Database] = field(default_factory=dict)
+    replica: Optional[Database] = None
+    point: Optional[Point] = None
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Node:
+    name: str
+    child: Optional["Node"] = None
+
+
+def test_build():
+    layers = [
+        Diot(
+            debug=True,
+            database={"host": "db", "options": {"a": 1, "b": {"c": 2}}},
+            servers=[{"name": "s1"}, {"name": "s2", "port": 8080}],
+            caches={"redis": {"host": "r"}},
+            point={"x": 1, "y": 2},
+            tags=["a"],
+            other=1,
+        ),
+        Diot(database={"port": 5433, "options": {"b": {"d": 3}}}, tags=["b"]),
+    ]
+    conf = build(AppConfig, layers)
+    assert conf == AppConfig(
+        debug=True,
+        database=Database("db", 5433, {"a": 1, "b": {"c": 2, "d": 3}}),
+        servers=[Server("s1"), Server("s2", 8080)],
+        caches={"redis": Database("r")},
+        point=Point(1, 2),
+        tags=["b"],
+    )
+    assert type(conf.database.options) is dict
+    assert type(conf.database.options["b"]) is dict
+    assert not hasattr(conf, "other")
+
+    # overridden by a value that is not a mapping, and merged after that
+    conf = build(
+        AppConfig,
+        [
+            {"debug": False, "database": {"host": "x", "port": 1}},
+            {"database": None},
+            {"database": {"host": "y"}, "replica": None, "servers": None},
+        ],
+    )
+    assert conf.database == Database("y")
+    assert conf.replica is None
+    assert conf.servers is None
+
+
+def test_build_missing():
+    with pytest.raises(ValidationError, match="^<root>: missing .*: debug$"):
+        build(AppConfig, [{"database": {"host": "x"}}])
+    with pytest.raises(ValidationError, match="^caches.redis: missing .*: host$"):
+        build(
+            AppConfig,
+            [
+                {"debug": True, "database": {"host": "x"}},
+                {"caches": {"redis": {"port": 1}}},
+            ],
+        )
+    with pytest.raises(ValidationError, match="^servers.1: missing .*: name$"):
+        build(
+            AppConfig,
+            [
+                {
+                    "debug": True,
+                    "database": {"host": "x"},
+                    "servers": [{"name": "a"}, {}],
+                }
+            ],
+        )
+
+
+def test_build_recursive():
+    layers = [{"name": "a", "child": {"name": "b"}}, {"child": {"child": None}}]
+    conf = build(Node, layers)
+    assert conf == Node("a", Node("b"))
+
+
+def test_compile_builder():
+    assert compile_builder(AppConfig) is compile_builder(AppConfig)
+    with pytest.raises(TypeError):
+        compile_builder(dict)
+    with pytest.raises(TypeError):
+        field_paths(dict)
+
+
+def test_field_paths():
+    assert field_paths(AppConfig) == [
+        "debug",
+        "database.host",
+        "database.port",
+        "database.options",
+        "servers",
+        "caches",
+        "replica.host",
+        "replica.port",
+        "replica.options",
+        "point.x",
+        "point.y",
+        "tags",
+    ]
+    assert field_paths(Node) == ["name", "child"]
+
+    @dataclass
+    class Empty:
+        pass
+
+    @dataclass
+    class WithEmpty:
+        empty: Empty
+
+    assert field_paths(WithEmpty) == ["empty"]
+
+
+def test_load_as(tmp_path):
+    toml = tmp_path / "config.toml"
+    toml.write_text(
+        "debug = true\n"
+        "tags = ['a']\n"
+        "[database]\nhost = 'db'\n"
+        "[database.options]\na = 1\n"
+        "[[servers]]\nname = 's1'\n"
+        "[other]\na = 1\n"
+    )
+    env = tmp_path / "config.env"
+    env.write_text(
+        "debug=off\n"
+        'replica={"host": "r", "port": "1"}\n'
+        'point={"x": 1, "y": 2}\n'
+    )
+    conf = Config.load_as(AppConfig, toml, env)
+    assert conf == AppConfig(
+        debug=False,
+        database=Database("db", 5432, {"a": 1}),
+        servers=[Server("s1")],
+        replica=Database("r", 1),
+        point=Point(1, 2),
+        tags=["a"],
+    )
+
+    assert Config.load_as(Server, {"name": "s", "port": 1}) == Server("s", 1)
+
+    with pytest.raises(ValueError, match="Length of loader"):
+        Config.load_as(Server, toml, loader=["toml", "toml"])
+
+
+async def test_a_load_as(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text("name=s\nport=8080\n")
+    assert await Config.a_load_as(Server, env) == Server("s", 8080)
+
+    with pytest.raises(ValueError, match="Length of loader"):
+        await Config.a_load_as(Server, env, loader=["env", "env"])
+
+
+def test_profiles_load_as(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text(
+        "[default]\nname = s\nport = 80\n[dev]\nport = 8080\n[prod]\nname = p\n"
+    )
+    env = tmp_path / "config.env"
+    env.write_text("DEV_name=d\n")
+
+    assert ProfileConfig.load_as(Server, ini, env) == Server("s", 80)
+    assert ProfileConfig.load_as(Server, ini, env, profile="dev") == Server("d", 8080)
+    assert ProfileConfig.load_as(Server, ini, profile="prod", base="dev") == Server(
+        "p", 8080
+    )
+
+    with pytest.raises(NoSuchProfile):
+        ProfileConfig.load_as(Server, ini, profile="test")
+    with pytest.raises(ValueError, match="Base profile 'x' not found"):
+        ProfileConfig.load_as(Server, ini, base="x")
+    with pytest.raises(ValidationError, match="missing .*: name$"):
+        ProfileConfig.load_as(
+            Server, {"dev": {"port": 1}}, profile="dev", allow_missing_base=True
+        )
+    with pytest.raises(ValueError, match="Length of loader"):
+        ProfileConfig.load_as(Server, ini, loader=["ini", "ini"])
+
+
+async def test_a_profiles_load_as(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nname = s\n[dev]\nport = 8080\n")
+    conf = await ProfileConfig.a_load_as(Server, ini, profile="dev")
+    assert conf == Server("s", 8080)
+
+    with pytest.raises(ValueError, match="Length of loader"):
+        await ProfileConfig.a_load_as(Server, ini, loader=["ini", "ini"])
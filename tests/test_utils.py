@@ -1,10 +1,14 @@
 import sys
+from copy import deepcopy
 import pytest
 from simpleconf.exceptions import FormatNotSupported
 from simpleconf.utils import (
     config_to_ext,
     detect_loader_directive,
+    gather_limited,
     get_loader,
+    merge_layers,
+    register_loader,
     require_package,
 )
 
@@ -174,9 +178,154 @@ def test_detect_loader_directive_read_error(tmp_path, monkeypatch):
 
     import pathlib
 
-    def bad_read_text(self, *args, **kwargs):
+    def bad_open(self, *args, **kwargs):
         raise OSError("simulated read error")
 
-    monkeypatch.setattr(pathlib.Path, "read_text", bad_read_text)
+    monkeypatch.setattr(pathlib.Path, "open", bad_open)
     result = detect_loader_directive(f, "toml")
     assert result == "toml"
+
+
+async def test_gather_limited():
+    import asyncio
+
+    order = []
+
+    def make(i):
+        async def func():
+            await asyncio.sleep(0.01 * (5 - i))
+            order.append(i)
+            return i
+
+        return func
+
+    assert await gather_limited([make(i) for i in range(5)], 2) == list(range(5))
+    assert order != list(range(5))
+    assert await gather_limited([]) == []
+
+    started = []
+
+    async def fail():
+        raise RuntimeError("failed")
+
+    async def slow():
+        started.append(1)
+        await asyncio.sleep(10)
+
+    with pytest.raises(RuntimeError):
+        await gather_limited([slow, fail, slow])
+    assert len(started) == 2
+
+
+def test_config_to_ext_pathlike(tmp_path):
+    class PathLike:
+        def __fspath__(self):
+            return "x.toml.j2"
+
+    assert config_to_ext(PathLike()) == "toml.j2"
+    assert config_to_ext(tmp_path / "x.yml") == "yaml"
+
+
+def test_get_loader_cached():
+    assert get_loader("toml") is get_loader("toml")
+    assert get_loader("toml") is not get_loader("tomls")
+
+
+def test_register_loader(monkeypatch):
+    import simpleconf.utils as utils
+    from simpleconf.loaders.dict import DictLoader
+
+    class MyLoader(DictLoader):
+        ...
+
+    monkeypatch.setattr(utils, "_LOADER_INSTANCES", {})
+    monkeypatch.setitem(utils.LOADERS, "my", MyLoader)
+    assert isinstance(get_loader("my"), MyLoader)
+
+    register_loader("my", "simpleconf.loaders.dict:DictsLoader")
+    assert get_loader("my").__class__.__name__ == "DictsLoader"
+    assert get_loader("my").load("{'a': 1}") == {"a": 1}
+
+
+def test_loader_entry_points(monkeypatch):
+    import simpleconf.utils as utils
+    from importlib.metadata import EntryPoint
+
+    eps = [
+        EntryPoint(
+            name="myd",
+            value="simpleconf.loaders.dict:DictLoader",
+            group=utils.LOADER_ENTRY_POINT_GROUP,
+        ),
+        EntryPoint(
+            name="toml",
+            value="simpleconf.loaders.dict:DictLoader",
+            group=utils.LOADER_ENTRY_POINT_GROUP,
+        ),
+    ]
+
+    class EntryPoints(list):
+        def select(self, group):
+            return [ep for ep in self if ep.group == group]
+
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points", lambda: EntryPoints(eps)
+    )
+    monkeypatch.setattr(utils, "_ENTRY_POINTS_LOADED", False)
+    monkeypatch.setattr(utils, "LOADERS", utils.LOADERS.copy())
+    monkeypatch.setattr(utils, "_LOADER_INSTANCES", {})
+
+    assert get_loader("myd").__class__.__name__ == "DictLoader"
+    # Does not override the built-in ones
+    assert get_loader("toml").__class__.__name__ == "TomlLoader"
+    with pytest.raises(FormatNotSupported):
+        get_loader("not_supported")
+
+
+def test_merge_layers():
+    layers = [
+        Diot(a=1, b={"c": 2, "d": {"e": 3}}, f={"g": 4}),
+        Diot(b={"d": {"h": 5}}, i=[6]),
+        Diot(b={"c": 7}, f=8),
+        Diot(f={"j": 9}, k={"l": 10}),
+        Diot(k={"m": {"n": 11}}),
+    ]
+    expected = Diot()
+    for layer in deepcopy(layers):
+        expected.update_recursively(layer)
+    assert expected == {
+        "a": 1,
+        "b": {"c": 7, "d": {"e": 3, "h": 5}},
+        "f": {"j": 9},
+        "i": [6],
+        "k": {"l": 10, "m": {"n": 11}},
+    }
+
+    copied = deepcopy(layers)
+    merged = merge_layers(layers, copy=True)
+    assert merged == expected
+    assert isinstance(merged.b.d, Diot)
+    assert merged.k.m.n == 11
+    # layers are not modified, and the subtrees not overridden are shared
+    assert layers == copied
+    assert merged.f is layers[3].f
+    assert merged.b.d is not layers[0].b.d
+
+    merged = merge_layers(layers)
+    assert merged == expected
+    assert merged is layers[0]
+
+
+def test_merge_layers_edge_cases():
+    layer = Diot(a={"b": 1})
+    assert merge_layers([layer]) is layer
+    assert merge_layers([layer], copy=True) is not layer
+    assert merge_layers([{"a": {"b": 1}}]).a.b == 1
+    assert merge_layers([]) == {}
+    merged = merge_layers([{"a": 1}, {"a": {"b": 1}}, {"a": {"c": 2}}])
+    assert merged == {"a": {"b": 1, "c": 2}}
+    assert merged.a.c == 2
+    merged = merge_layers([{"a": {"b": 1}}, {"a": 1}, {"a": [{"c": 2}]}])
+    assert merged.a[0].c == 2
+    copied = merge_layers([Diot({"a-b": 1})], copy=True)
+    assert copied.a_b == 1
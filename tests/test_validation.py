@@ -0,0 +1,389 @@
+import enum
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    NewType,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+import pytest
+
+from simpleconf import Config, ProfileConfig
+from simpleconf.exceptions import ValidationError
+from simpleconf.caster import cast
+from simpleconf.schema import compile_schema
+from simpleconf.validation import compile_validator, validate, validate_profiles
+
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass
+class Database:
+    host: str
+    port: int = 5432
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AppConfig:
+    debug: bool
+    database: Database
+    timeout: Optional[float] = None
+
+
+class Server(NamedTuple):
+    name: str
+    port: int = 80
+
+
+class Limits(TypedDict, total=False):
+    cpu: float
+    memory: int
+
+
+JSON_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+        "level": {"enum": ["debug", "info"]},
+        "hosts": {"type": "array", "items": {"type": "string"}},
+        "ratio": {"type": ["number", "null"]},
+        "db": {
+            "properties": {"name": {"type": "string"}},
+            "required": ["name"],
+            "additionalProperties": False,
+        },
+    },
+    "required": ["port"],
+    "additionalProperties": {"type": ["string", "integer", "object"]},
+}
+
+
+@pytest.mark.parametrize(
+    "tp,value,expected",
+    [
+        (int, 1, 1),
+        (int, "8080", 8080),
+        (float, 1, 1),
+        (float, "0.5", 0.5),
+        (str, "@int:1", "@int:1"),
+        (bool, False, False),
+        (bool, "Yes", True),
+        (None, "null", None),
+        (Any, object, object),
+        (Optional[Any], "x", "x"),
+        (Optional[int], None, None),
+        (Optional[int], "1", 1),
+        (Optional[str], "null", None),
+        (Union[int, str], "x", "x"),
+        (Literal["a", 1], "1", 1),
+        (List[int], ["1", 2], [1, 2]),
+        (List[int], "[1, 2]", [1, 2]),
+        (Tuple[int, str], ["1", "a"], [1, "a"]),
+        (Tuple[int, ...], (1,), (1,)),
+        (list, [1, "a"], [1, "a"]),
+        (List[Any], [1, "a"], [1, "a"]),
+        (List[Database], [{"host": "h", "port": "1"}], [{"host": "h", "port": 1}]),
+        (Union[int, List[Database]], "1", 1),
+        (Optional[Database], "null", None),
+        (Dict[str, int], {"a": "1"}, {"a": 1}),
+        (dict, '{"a": 1}', {"a": 1}),
+        (Limits, {"cpu": "1.5"}, {"cpu": 1.5}),
+        (Server, {"name": "s", "port": "1"}, {"name": "s", "port": 1}),
+        (Path, "/tmp", Path("/tmp")),
+        (Color, "red", Color.RED),
+        (Color, Color.BLUE, Color.BLUE),
+    ],
+)
+def test_check(tp, value, expected):
+    @dataclass
+    class Schema:
+        a: tp  # type: ignore[valid-type]
+
+    assert validate({"a": value, "b": "x"}, Schema) == {"a": expected, "b": "x"}
+
+
+@pytest.mark.parametrize(
+    "tp,value,path",
+    [
+        (int, True, "a"),
+        (int, "1.5", "a"),
+        (float, "x", "a"),
+        (str, 1, "a"),
+        (bool, "maybe", "a"),
+        (Optional[int], "x", "a"),
+        (Literal["a", 1], "b", "a"),
+        (List[int], [1, "x"], "a.1"),
+        (List[int], {"a": 1}, "a"),
+        (Dict[str, int], {"b": {"c": 1}}, "a.b"),
+        (Dict[str, int], [1], "a"),
+        (Database, {"port": 1}, "a"),
+        (Server, {"port": 1}, "a"),
+        (Database, {"host": "h", "port": "x"}, "a.port"),
+        (Color, "green", "a"),
+        (Optional[Database], {"port": 1}, "a"),
+        (List[Database], [{"host": "h"}, {"port": 1}], "a.1"),
+        (Dict[str, Database], {"x": {"port": 1}}, "a.x"),
+    ],
+)
+def test_check_error(tp, value, path):
+    @dataclass
+    class Schema:
+        a: tp  # type: ignore[valid-type]
+
+    with pytest.raises(ValidationError, match=rf"^{path}: ") as exc:
+        validate({"a": value}, Schema)
+    assert ".".join(map(str, exc.value.path)) == path
+
+
+@pytest.mark.parametrize(
+    "tp,value",
+    [
+        (bool, "yes"),
+        (bool, "Off"),
+        (None, "NULL"),
+        (Optional[str], "null"),
+        (Optional[int], "none"),
+        (Union[int, str], "x"),
+        (Literal["a", 1], "1"),
+        (List[int], "[1, 2]"),
+        (Server, '{"name": "s"}'),
+    ],
+)
+def test_check_same_as_schema(tp, value):
+    @dataclass
+    class Schema:
+        a: tp  # type: ignore[valid-type]
+
+    converted = cast({"a": value}, None, compile_schema({"a": tp}).nodes)
+    assert validate({"a": value}, Schema) == converted
+
+
+def test_validation_error():
+    err = ValidationError(("a", 0, "b"), "expect int, got 'x'")
+    assert isinstance(err, ValueError)
+    assert str(err) == "a.0.b: expect int, got 'x'"
+    assert str(ValidationError((), "missing")) == "<root>: missing"
+    assert str(pickle.loads(pickle.dumps(err))) == str(err)
+
+
+def test_json_schema():
+    conf = {
+        "port": "8080",
+        "level": "info",
+        "hosts": ["a", "b"],
+        "ratio": None,
+        "db": {"name": "x"},
+        "other": 1,
+    }
+    assert validate(conf, JSON_SCHEMA) is conf
+    assert conf["port"] == 8080
+
+    validate({"port": 1, "ratio": "0.5"}, JSON_SCHEMA)
+    assert validate("2", {"enum": [1, 2]}) == 2
+    assert validate(["a"], {"type": "array", "items": {}}) == ["a"]
+    assert validate({"a": "1"}, {}) == {"a": "1"}
+
+
+@pytest.mark.parametrize(
+    "conf,message",
+    [
+        ({}, "<root>: missing required key(s): port"),
+        ({"port": 0}, "port: expect >= 1, got 0"),
+        ({"port": 65536}, "port: expect <= 65535, got 65536"),
+        ({"port": 1, "level": "warn"}, "level: expect one of"),
+        ({"port": 1, "hosts": "a"}, "hosts: expect array, got 'a'"),
+        ({"port": 1, "hosts": [1]}, "hosts.0: expect string, got 1"),
+        ({"port": 1, "ratio": "x"}, "ratio: expect number or null, got 'x'"),
+        ({"port": 1, "db": {}}, "db: missing required key(s): name"),
+        ({"port": 1, "db": {"name": "x", "user": "u"}}, "db.user: unexpected key"),
+        ({"port": 1, "other": [1]}, "other: expect string or integer or object"),
+        ([], "<root>: expect object, got []"),
+    ],
+)
+def test_json_schema_error(conf, message):
+    with pytest.raises(ValidationError) as exc:
+        validate(conf, JSON_SCHEMA)
+    assert str(exc.value).startswith(message)
+
+
+def test_compile_validator():
+    assert compile_validator(AppConfig) is compile_validator(AppConfig)
+    assert compile_validator(JSON_SCHEMA) is compile_validator(dict(JSON_SCHEMA))
+    assert compile_validator({"type": "string"}) is not compile_validator(JSON_SCHEMA)
+
+    def _local():
+        class Port(int):
+            pass
+
+        @dataclass
+        class Local:
+            port: Port
+
+        return Local
+
+    first, second = _local(), _local()
+    assert compile_validator(first).fingerprint != (
+        compile_validator(second).fingerprint
+    )
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        int,
+        {"port": int},
+        {"type": "string", "pattern": "x"},
+        {"type": "tuple"},
+        {"properties": {"a": []}},
+    ],
+)
+def test_compile_validator_unsupported(schema):
+    with pytest.raises(TypeError):
+        compile_validator(schema)
+
+    @dataclass
+    class Schema:
+        a: Callable[[], int]
+
+    with pytest.raises(TypeError, match="Unsupported type"):
+        compile_validator(Schema)
+
+    @dataclass
+    class Other:
+        a: NewType("Port", int)  # type: ignore[valid-type]
+
+    with pytest.raises(TypeError, match="Unsupported type to validate"):
+        compile_validator(Other)
+
+
+def test_load_validate(tmp_path):
+    toml = tmp_path / "config.toml"
+    toml.write_text('debug = true\n[database]\nhost = "db"\nport = "5433"\n')
+    env = tmp_path / "config.env"
+    env.write_text('debug=off\n')
+
+    conf = Config.load(toml, env, validate=AppConfig)
+    assert conf == {
+        "debug": False,
+        "database": {"host": "db", "port": 5433},
+    }
+    assert Config.load(toml, env, validate=AppConfig, frozen=True).database.port == 5433
+
+    with pytest.raises(ValidationError, match="^<root>: missing .*: database$"):
+        Config.load(env, validate=AppConfig)
+
+    with pytest.raises(ValidationError, match="^database: expect Database"):
+        Config.load(toml, {"database": "db"}, validate=AppConfig)
+
+    # casted by the prefixes first
+    env.write_text("debug=@bool:false\n")
+    assert Config.load(toml, env, validate=AppConfig).debug is False
+    env.write_text("debug=@int:0\n")
+    with pytest.raises(ValidationError, match="^debug: expect bool, got '@int:0'"):
+        Config.load(toml, env, validate=AppConfig)
+
+    env.write_text("debug=maybe\n")
+    with pytest.raises(ValidationError, match="^debug: expect bool, got 'maybe'"):
+        Config.load(toml, env, validate=AppConfig)
+
+    # checked after the configurations are merged
+    assert Config.load(toml, env, {"debug": True}, validate=AppConfig).debug is True
+    env.write_text("debug=on\ndatabase=@json:{\"port\": \"x\"}\n")
+    conf = Config.load(toml, env, {"database": {"port": 1}}, validate=AppConfig)
+    assert conf.database.port == 1
+    with pytest.raises(ValidationError, match="^database.port: expect int, got 'x'"):
+        Config.load(toml, env, {"debug": True}, validate=AppConfig)
+
+
+def test_load_validate_with_schema(tmp_path):
+    toml = tmp_path / "config.toml"
+    toml.write_text('debug = false\n[database]\nhost = "db"\nextra = "1"\n')
+    env = tmp_path / "config.env"
+    env.write_text('debug=on\nflag=yes\ndatabase=@json:{"host": "h", "port": "2"}\n')
+
+    schema = {"database.extra": int, "flag": bool}
+    conf = Config.load(toml, validate=AppConfig, schema=schema, container=dict)
+    assert conf == {"debug": False, "database": {"host": "db", "extra": 1}}
+    conf = Config.load(toml, env, validate=AppConfig, schema=schema, container=dict)
+    assert conf == {
+        "debug": True,
+        "flag": True,
+        "database": {"host": "h", "port": 2, "extra": 1},
+    }
+
+
+async def test_a_load_validate(tmp_path):
+    env = tmp_path / "config.env"
+    env.write_text("port=8080\n")
+    conf = await Config.a_load(env, validate=JSON_SCHEMA)
+    assert conf.port == 8080
+
+    with pytest.raises(ValidationError, match="^port: "):
+        await Config.a_load({"port": "x"}, validate=JSON_SCHEMA)
+
+
+def test_profiles_validate(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nport = 80\n[dev]\nlevel = debug\n[prod]\nport = 443\n")
+
+    conf = ProfileConfig.load(ini, validate=JSON_SCHEMA)
+    assert conf.port == 80
+    # coerced in the pool, without the required keys, which are in the base
+    assert ProfileConfig.pool(conf) == {
+        "default": {"port": 80},
+        "dev": {"level": "debug"},
+        "prod": {"port": 443},
+    }
+    ProfileConfig.use_profile(conf, "dev")
+    assert ProfileConfig.detach(conf) == {"port": 80, "level": "debug"}
+
+    with pytest.raises(ValidationError, match="^dev.level: expect one of"):
+        ProfileConfig.load(ini, {"dev": {"level": "warn"}}, validate=JSON_SCHEMA)
+    conf = ProfileConfig.load(
+        ini,
+        {"dev": {"level": "warn"}},
+        {"dev": {"level": "info"}},
+        validate=JSON_SCHEMA,
+    )
+    assert ProfileConfig.pool(conf)["dev"] == {"level": "info"}
+
+    with pytest.raises(ValidationError, match="^dev: missing required key"):
+        ProfileConfig.load(
+            {"dev": {"level": "debug"}}, allow_missing_base=True, validate=JSON_SCHEMA
+        )
+
+
+def test_validate_profiles():
+    pool = {"default": {"port": "80"}, "dev": {"level": "debug"}}
+    validate_profiles(pool, "default", JSON_SCHEMA)
+    assert pool == {"default": {"port": 80}, "dev": {"level": "debug"}}
+
+    with pytest.raises(ValidationError, match="^dev: missing required key"):
+        validate_profiles(pool, None, JSON_SCHEMA)
+    with pytest.raises(ValidationError, match="^dev.level: expect one of"):
+        validate_profiles({"dev": {"level": "x"}}, "default", JSON_SCHEMA)
+
+
+async def test_a_profiles_validate(tmp_path):
+    ini = tmp_path / "config.ini"
+    ini.write_text("[default]\nport = 80\n")
+    conf = await ProfileConfig.a_load(ini, validate=JSON_SCHEMA)
+    assert conf.port == 80
+
+    with pytest.raises(ValidationError, match="^default.port: "):
+        await ProfileConfig.a_load({"default": {"port": 0}}, validate=JSON_SCHEMA)